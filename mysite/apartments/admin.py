@@ -1,14 +1,17 @@
 from django.contrib import admin
-from .models import Apartment, Booking
+from .models import Apartment, Booking, Favorite, Season
+from .tasks import schedule_image_variants
+from .search import search_apartments
+from .exports import booking_csv_response
+from .pricing import quote
 
 
 @admin.register(Apartment)
 class ApartmentAdmin(admin.ModelAdmin):
     list_display = ['id', 'title', 'apartment_type', 'price', 'square_meters', 
-                    'floor', 'is_available', 'created_at']
+                    'floor', 'is_available', 'next_booking_date', 'created_at']
     list_filter = ['is_available', 'apartment_type', 'created_at']
     search_fields = ['title', 'description', 'address']
-    list_editable = ['is_available']
     list_per_page = 20
     date_hierarchy = 'created_at'
     
@@ -20,7 +23,7 @@ class ApartmentAdmin(admin.ModelAdmin):
             'fields': ('price', 'square_meters', 'floor', 'address')
         }),
         ('Статус', {
-            'fields': ('is_available',)
+            'fields': ('is_available', 'next_booking_date')
         }),
         ('Дати', {
             'fields': ('created_at', 'updated_at'),
@@ -28,10 +31,20 @@ class ApartmentAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['is_available', 'next_booking_date', 'created_at', 'updated_at']
     
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=search_apartments(search_term, queryset=queryset)), False
+
     def save_model(self, request, obj, form, change):
+        image_changed = 'image' in form.changed_data
+        if image_changed:
+            obj.image_variants = {}
         super().save_model(request, obj, form, change)
+        if image_changed:
+            schedule_image_variants(obj)
         
     class Meta:
         verbose_name = 'Квартира'
@@ -43,6 +56,7 @@ class BookingAdmin(admin.ModelAdmin):
     list_display = ['id', 'apartment', 'user', 'start_date', 'end_date', 
                     'status', 'total_price', 'created_at']
     list_filter = ['status', 'created_at', 'start_date']
+    list_select_related = ['apartment', 'user']
     search_fields = ['apartment__title', 'user__username', 'user__email']
     list_editable = ['status']
     list_per_page = 20
@@ -62,9 +76,29 @@ class BookingAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ['created_at', 'total_price']
+    actions = ['export_csv']
+
+    @admin.action(description='Експортувати вибрані бронювання у CSV')
+    def export_csv(self, request, queryset):
+        return booking_csv_response(queryset)
     
     def save_model(self, request, obj, form, change):
         if not change:
-            days = (obj.end_date - obj.start_date).days
-            obj.total_price = obj.apartment.price * days
+            obj.total_price = quote(obj.apartment, obj.start_date, obj.end_date).total
         super().save_model(request, obj, form, change)
+
+
+@admin.register(Favorite)
+class FavoriteAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'apartment', 'created_at']
+    list_select_related = ['user', 'apartment']
+    search_fields = ['apartment__title', 'user__username']
+    raw_id_fields = ['apartment', 'user']
+    list_per_page = 20
+
+
+@admin.register(Season)
+class SeasonAdmin(admin.ModelAdmin):
+    list_display = ['name', 'apartment_type', 'start_date', 'end_date', 'multiplier']
+    list_filter = ['apartment_type']
+    date_hierarchy = 'start_date'
@@ -0,0 +1,245 @@
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from decimal import ROUND_DOWN, Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import Apartment, ApartmentDailyStats, Booking, TypeDailyStats
+
+CENT = Decimal('0.01')
+STATE_FIELDS = ('apartment_id', 'apartment__apartment_type', 'start_date', 'end_date', 'status', 'total_price')
+
+# Частина бронювання, що впливає на зведення; ночі рахуються за датою проживання.
+BookingState = namedtuple('BookingState', 'apartment_id apartment_type start_date end_date status total_price')
+
+
+def booking_state(booking):
+    return BookingState(
+        booking.apartment_id, booking.apartment.apartment_type, booking.start_date,
+        booking.end_date, booking.status, Decimal(str(booking.total_price)),
+    )
+
+
+def stored_booking_state(pk, snapshot=None):
+    values = Booking.objects.filter(pk=pk).values_list(*STATE_FIELDS).first()
+    if not values:
+        return None
+    state = BookingState(*values)
+    # Тип квартири береться зі знімка, з яким бронювання потрапило до зведень:
+    # квартира могла змінити тип відтоді, а віднімати треба з того самого типу.
+    if snapshot is not None and snapshot.apartment_id == state.apartment_id:
+        state = state._replace(apartment_type=snapshot.apartment_type)
+    return state
+
+
+def _nightly_revenue(state, nights):
+    # Дохід ділиться порівну між ночами, залишок від округлення — на першу ніч,
+    # щоб сума за днями точно дорівнювала total_price.
+    nightly = (state.total_price / nights).quantize(CENT, rounding=ROUND_DOWN)
+    return nightly, state.total_price - nightly * nights
+
+
+def _nights(state):
+    return [state.start_date + timedelta(days=offset) for offset in range((state.end_date - state.start_date).days)]
+
+
+def contributions(state):
+    dates = _nights(state)
+    if not dates:
+        return
+    if state.status == 'cancelled':
+        for day in dates:
+            yield day, 0, 1, Decimal(0)
+        return
+    nightly, remainder = _nightly_revenue(state, len(dates))
+    for day in dates:
+        yield day, 1, 0, nightly + (remainder if day == dates[0] else 0)
+
+
+def _apply(state, sign):
+    dates = _nights(state)
+    if not dates:
+        return
+    remainder = 0
+    if state.status == 'cancelled':
+        changes = {'cancelled_nights': F('cancelled_nights') + sign}
+    else:
+        nightly, remainder = _nightly_revenue(state, len(dates))
+        changes = {'booked_nights': F('booked_nights') + sign, 'revenue': F('revenue') + sign * nightly}
+
+    scopes = (
+        (ApartmentDailyStats, {'apartment_id': state.apartment_id}),
+        (TypeDailyStats, {'apartment_type': state.apartment_type}),
+    )
+    for model, scope in scopes:
+        # Спершу порожні рядки для відсутніх дат, далі одне UPDATE на весь діапазон:
+        # інкремент у БД не губить паралельні зміни.
+        model.objects.bulk_create([model(date=day, **scope) for day in dates], ignore_conflicts=True)
+        model.objects.filter(date__range=(dates[0], dates[-1]), **scope).update(**changes)
+        if remainder:
+            model.objects.filter(date=dates[0], **scope).update(revenue=F('revenue') + sign * remainder)
+
+
+def apply_booking_change(old, new):
+    if old == new:
+        return
+    with transaction.atomic():
+        if old is not None:
+            _apply(old, -1)
+        if new is not None:
+            _apply(new, 1)
+
+
+def _same_contributions(old, new):
+    # Завершення підтвердженого бронювання не змінює зведень: враховується лише,
+    # скасоване воно чи ні.
+    return old._replace(status=None) == new._replace(status=None) and (
+        (old.status == 'cancelled') == (new.status == 'cancelled')
+    )
+
+
+def _merge_deltas(model, scope_field, deltas):
+    # Пакетне злиття змін у зведення: поточні значення читаються одним запитом,
+    # а нові записуються одним upsert на пакет (bulk_update з CASE на тисячі
+    # рядків у рази повільніший).
+    if not deltas:
+        return
+    days = [day for scope, day in deltas]
+    window = model.objects.select_for_update().filter(
+        date__range=(min(days), max(days)),
+        **{f'{scope_field}__in': {scope for scope, day in deltas}},
+    )
+    current = {
+        (scope, day): values
+        for scope, day, *values in window.values_list(
+            scope_field, 'date', 'booked_nights', 'cancelled_nights', 'revenue'
+        ).iterator(chunk_size=2000)
+        if (scope, day) in deltas
+    }
+    rows = []
+    for (scope, day), (booked, cancelled, revenue) in deltas.items():
+        old_booked, old_cancelled, old_revenue = current.get((scope, day), (0, 0, Decimal(0)))
+        rows.append(model(
+            date=day, booked_nights=old_booked + booked, cancelled_nights=old_cancelled + cancelled,
+            revenue=old_revenue + revenue, **{scope_field: scope},
+        ))
+    model.objects.bulk_create(
+        rows,
+        batch_size=2000,
+        update_conflicts=True,
+        unique_fields=[scope_field, 'date'],
+        update_fields=['booked_nights', 'cancelled_nights', 'revenue'],
+    )
+
+
+def apply_booking_changes(changes):
+    # Те саме, що apply_booking_change для багатьох бронювань, але з сумарними
+    # змінами за кожен день замість окремих UPDATE на кожне бронювання.
+    apartments = defaultdict(lambda: [0, 0, Decimal(0)])
+    types = defaultdict(lambda: [0, 0, Decimal(0)])
+    for old, new in changes:
+        if old == new or (old and new and _same_contributions(old, new)):
+            continue
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            for day, booked, cancelled, revenue in contributions(state):
+                for cell in (apartments[state.apartment_id, day], types[state.apartment_type, day]):
+                    cell[0] += sign * booked
+                    cell[1] += sign * cancelled
+                    cell[2] += sign * revenue
+    with transaction.atomic():
+        for model, scope_field, deltas in (
+            (ApartmentDailyStats, 'apartment_id', apartments),
+            (TypeDailyStats, 'apartment_type', types),
+        ):
+            _merge_deltas(model, scope_field, {key: cell for key, cell in deltas.items() if any(cell)})
+
+
+def compute_rollups(start, end):
+    apartments = defaultdict(lambda: [0, 0, Decimal(0)])
+    types = defaultdict(lambda: [0, 0, Decimal(0)])
+    bookings = (
+        Booking.objects.filter(start_date__lte=end, end_date__gt=start)
+        .order_by()
+        .values_list(*STATE_FIELDS)
+        .iterator(chunk_size=2000)
+    )
+    for values in bookings:
+        state = BookingState(*values)
+        for day, booked, cancelled, revenue in contributions(state):
+            if not start <= day <= end:
+                continue
+            for cell in (apartments[state.apartment_id, day], types[state.apartment_type, day]):
+                cell[0] += booked
+                cell[1] += cancelled
+                cell[2] += revenue
+    return apartments, types
+
+
+def _replace(model, scope_field, cells, start, end):
+    existing = {
+        (getattr(row, scope_field), row.date): [row.booked_nights, row.cancelled_nights, row.revenue]
+        for row in model.objects.filter(date__range=(start, end)).iterator(chunk_size=2000)
+    }
+    empty = [0, 0, Decimal(0)]
+    drift = sum(
+        1 for key in existing.keys() | cells.keys()
+        if existing.get(key, empty) != cells.get(key, empty)
+    )
+    model.objects.filter(date__range=(start, end)).delete()
+    model.objects.bulk_create(
+        [
+            model(date=day, booked_nights=booked, cancelled_nights=cancelled, revenue=revenue,
+                  **{scope_field: scope})
+            for (scope, day), (booked, cancelled, revenue) in cells.items()
+        ],
+        batch_size=2000,
+    )
+    return drift
+
+
+def reconcile(start, end):
+    apartments, types = compute_rollups(start, end)
+    with transaction.atomic():
+        return (
+            _replace(ApartmentDailyStats, 'apartment_id', apartments, start, end),
+            _replace(TypeDailyStats, 'apartment_type', types, start, end),
+        )
+
+
+def _rates(row):
+    nights = row['booked_nights'] + row['cancelled_nights']
+    row['cancellation_rate'] = row['cancelled_nights'] / nights * 100 if nights else 0
+    row['average_rate'] = row['revenue'] / row['booked_nights'] if row['booked_nights'] else 0
+    return row
+
+
+def dashboard(start, end, top=10):
+    totals = {
+        'booked_nights': Sum('booked_nights'),
+        'cancelled_nights': Sum('cancelled_nights'),
+        'revenue': Sum('revenue'),
+    }
+    types = TypeDailyStats.objects.filter(date__range=(start, end)).order_by()
+    summary = {key: value or 0 for key, value in types.aggregate(**totals).items()}
+    labels = {code: Apartment(apartment_type=code).get_type_display_ua() for code, label in Apartment.TYPE_CHOICES}
+    by_type = [
+        _rates(dict(row, label=labels.get(row['apartment_type'], row['apartment_type'])))
+        for row in types.values('apartment_type').annotate(**totals).order_by('-revenue')
+    ]
+    by_day = [_rates(row) for row in types.values('date').annotate(**totals).order_by('date')]
+    top_apartments = [
+        _rates(row) for row in
+        ApartmentDailyStats.objects.filter(date__range=(start, end))
+        .values('apartment_id', 'apartment__title')
+        .annotate(**totals)
+        .order_by('-revenue')[:top]
+    ]
+    return {
+        'summary': _rates(summary),
+        'by_type': by_type,
+        'by_day': by_day,
+        'top_apartments': top_apartments,
+    }
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ApartmentsConfig(AppConfig):
     name = 'apartments'
+
+    def ready(self):
+        from . import signals  # noqa: F401
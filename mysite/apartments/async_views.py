@@ -0,0 +1,88 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.shortcuts import render
+
+from .cache import acached_last_modified, acached_page, acatalog_version, aget_apartment_or_404
+from .conditional import add_validators, apersonal_state, detail_validators, list_validators, not_modified
+from .favorites import aget_favorite_ids
+from .forms import ApartmentFilterForm
+from .models import Apartment
+from .occupancy import calendar_payload, occupancy_bits, parse_calendar_query
+from .pagination import akeyset_page, aranked_page, next_page_query, CURSOR_PARAM
+from .search import search_apartments
+from .stats import acatalog_stats, type_stats
+
+# Асинхронні версії читаючих view каталогу для ASGI-розгортання
+# (ASYNC_CATALOG=1). Дані збираються через async ORM і кеш, а рендеринг
+# шаблону з синхронними контекст-процесорами виконується в потоці.
+
+arender = sync_to_async(render)
+
+
+async def apartment_list(request):
+    filter_form = ApartmentFilterForm(request.GET)
+    queryset = filter_form.filter(Apartment.objects.for_table())
+    query = filter_form.search_query()
+    cursor = request.GET.get(CURSOR_PARAM)
+
+    version = await acatalog_version()
+    last_modified = await acached_last_modified('apartment_list', request, queryset, version)
+    etag, last_modified = list_validators(request, version, last_modified, await apersonal_state(request))
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return add_validators(request, response, etag, last_modified)
+
+    async def build_page():
+        if query:
+            ranked_ids = await sync_to_async(search_apartments)(query, queryset=queryset)
+            return await aranked_page(queryset, ranked_ids, cursor)
+        return await akeyset_page(queryset, cursor)
+
+    apartments, next_cursor = await acached_page('apartment_list', request, build_page)
+    stats = await acatalog_stats()
+    await aget_favorite_ids(request)
+    context = {
+        'apartments': apartments,
+        'filter_form': filter_form,
+        'next_query': next_page_query(request, next_cursor),
+        'is_first_page': CURSOR_PARAM not in request.GET,
+        'total_apartments': stats['total'],
+        'available_apartments': stats['available'],
+        'type_stats': await sync_to_async(type_stats)(),
+    }
+    response = await arender(request, 'apartments/apartment_list.html', context)
+    return add_validators(request, response, etag, last_modified)
+
+
+async def apartment_detail(request, pk):
+    apartment = await aget_apartment_or_404(pk)
+    etag, last_modified = detail_validators(apartment, await apersonal_state(request))
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        is_favorite = pk in await aget_favorite_ids(request)
+        response = await arender(request, 'apartments/apartment_detail.html', {
+            'apartment': apartment,
+            'is_favorite': is_favorite
+        })
+    return add_validators(request, response, etag, last_modified)
+
+
+async def favorites_list(request):
+    favorite_ids = await aget_favorite_ids(request)
+    apartments = [
+        apartment async for apartment in Apartment.objects.for_table().filter(pk__in=favorite_ids)
+    ]
+    return await arender(request, 'apartments/favorites_list.html', {
+        'apartments': apartments,
+    })
+
+
+async def availability_calendar(request):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        apartment_ids, start, end, encoding = parse_calendar_query(request.GET)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    bits = await sync_to_async(occupancy_bits)(apartment_ids, start, end)
+    return JsonResponse(calendar_payload(bits, start, end, encoding))
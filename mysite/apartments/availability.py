@@ -0,0 +1,158 @@
+import random
+import time
+from collections import defaultdict
+from datetime import date
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import Exists, F, Min, OuterRef, Q
+from django.utils import timezone
+
+from .cache import invalidate_apartments
+from .models import Apartment, Booking
+from .stats import invalidate_stats
+
+ACTIVE_STATUSES = ('pending', 'confirmed')
+REFRESH_CHUNK = 500
+# Назва обмеження (PostgreSQL) чи повідомлення тригера (SQLite) з міграції 0012.
+OVERLAP_GUARD = 'apartments_booking_no_overlap'
+RETRYABLE_ERRORS = ('database is locked', 'database table is locked', 'deadlock detected', 'could not serialize')
+
+
+class BookingConflict(ValidationError):
+    def __init__(self):
+        super().__init__('Квартира вже заброньована на обрані дати', code='booking_overlap')
+
+
+def active_bookings(queryset=None):
+    if queryset is None:
+        queryset = Booking.objects.all()
+    return queryset.filter(status__in=ACTIVE_STATUSES)
+
+
+def overlapping_bookings(queryset, start_date, end_date):
+    return active_bookings(queryset).filter(start_date__lt=end_date, end_date__gt=start_date)
+
+
+def available_between(queryset, start_date, end_date):
+    busy = overlapping_bookings(
+        Booking.objects.filter(apartment=OuterRef('pk')), start_date, end_date
+    )
+    return queryset.filter(~Exists(busy))
+
+
+def compute_availability(apartment_ids, today):
+    # Одне агреговане читання на пакет: найближчий початок активного бронювання,
+    # що ще не завершилось. Квартира вільна сьогодні, якщо він не настав.
+    nearest = dict(
+        active_bookings()
+        .filter(apartment_id__in=apartment_ids, end_date__gt=today)
+        .order_by()
+        .values_list('apartment_id')
+        .annotate(first=Min('start_date'))
+    )
+    return {
+        pk: (nearest.get(pk) is None or nearest[pk] > today, nearest.get(pk))
+        for pk in apartment_ids
+    }
+
+
+def _refresh_chunk(rows, today):
+    fresh = compute_availability([pk for pk, available, next_date in rows], today)
+    groups = defaultdict(list)
+    for pk, available, next_date in rows:
+        if fresh[pk] != (available, next_date):
+            groups[fresh[pk]].append(pk)
+    # Нове updated_at змінює ключі фрагментів та ETag сторінок квартири.
+    now = timezone.now()
+    for (available, next_date), pks in groups.items():
+        Apartment.objects.filter(pk__in=pks).update(is_available=available, next_booking_date=next_date, updated_at=now)
+    return [pk for pks in groups.values() for pk in pks]
+
+
+def _apartment_rows(apartment_ids, queryset):
+    fields = ('pk', 'is_available', 'next_booking_date')
+    if apartment_ids is not None:
+        ids = sorted(set(apartment_ids))
+        for offset in range(0, len(ids), REFRESH_CHUNK):
+            yield list(queryset.filter(pk__in=ids[offset:offset + REFRESH_CHUNK]).values_list(*fields))
+        return
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).values_list(*fields)[:REFRESH_CHUNK])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1][0]
+
+
+def refresh_availability(apartment_ids=None, today=None, stale_only=False):
+    # Без apartment_ids перераховуються всі квартири пакетами за pk; stale_only
+    # обмежує обхід тими, чий стан міг змінитися лише від плину часу.
+    today = today or date.today()
+    queryset = Apartment.objects.order_by('pk')
+    if stale_only:
+        queryset = queryset.filter(Q(is_available=False) | Q(next_booking_date__lte=today))
+    changed = []
+    for rows in _apartment_rows(apartment_ids, queryset):
+        if rows:
+            changed += _refresh_chunk(rows, today)
+    if changed:
+        invalidate_stats()
+        invalidate_apartments(changed)
+    return changed
+
+
+def is_retryable(error):
+    message = str(error)
+    return any(text in message for text in RETRYABLE_ERRORS)
+
+
+def with_retries(function, *args):
+    # Повтор можливий лише для власної транзакції: всередині зовнішнього atomic
+    # вона вже зламана помилкою, тож помилку віддаємо викликачу.
+    attempts = 1 if connection.in_atomic_block else settings.BOOKING_LOCK_RETRIES + 1
+    for attempt in range(attempts):
+        try:
+            return function(*args)
+        except OperationalError as error:
+            if attempt == attempts - 1 or not is_retryable(error):
+                raise
+            time.sleep(settings.BOOKING_LOCK_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5))
+
+
+def lock_apartment(apartment_id):
+    if connection.features.has_select_for_update:
+        list(Apartment.objects.select_for_update().filter(pk=apartment_id).values_list('pk'))
+    else:
+        # SQLite: порожній UPDATE першим оператором одразу бере блокування запису і
+        # чекає busy_timeout, замість помилки при спробі писати після читання.
+        Apartment.objects.filter(pk=apartment_id).update(id=F('id'))
+
+
+def _insert_booking(booking):
+    # Перевірка перетину та вставка атомарні: квартира заблокована до кінця
+    # транзакції, а обмеження в БД відхиляє все, що прослизнуло повз перевірку.
+    booking.pk = None
+    booking._state.adding = True
+    with transaction.atomic():
+        lock_apartment(booking.apartment_id)
+        conflict = overlapping_bookings(
+            Booking.objects.filter(apartment_id=booking.apartment_id),
+            booking.start_date,
+            booking.end_date,
+        )
+        if conflict.exists():
+            raise BookingConflict()
+        try:
+            booking.save()
+        except IntegrityError as error:
+            if OVERLAP_GUARD in str(error):
+                raise BookingConflict() from error
+            raise
+    return booking
+
+
+def create_booking(booking):
+    return with_retries(_insert_booking, booking)
@@ -0,0 +1,161 @@
+import csv
+import json
+import os
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from .cache import invalidate_apartments
+from .models import Apartment
+from .search import get_backend as get_search_backend
+from .stats import invalidate_stats
+from .validators import APARTMENT_RULES
+
+FORMATS = ('csv', 'jsonl')
+IMPORT_FIELDS = [
+    'external_id', 'title', 'description', 'apartment_type', 'price',
+    'square_meters', 'floor', 'address',
+]
+# Доступність обчислюється з бронювань, тому лише експортується.
+EXPORT_FIELDS = ['id'] + IMPORT_FIELDS + ['is_available', 'next_booking_date', 'created_at', 'updated_at']
+UPDATE_FIELDS = IMPORT_FIELDS[1:] + ['updated_at']
+
+
+def detect_format(path):
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(stream, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def _clean_value(field, raw):
+    if isinstance(raw, str):
+        raw = raw.strip()
+    if raw in (None, '') and field.has_default():
+        return field.get_default()
+    # Порядок як у ApartmentForm: спершу обов'язковість і вибір, далі правила
+    # форми, а валідатори моделі — лише для значень, що їх пройшли.
+    value = field.to_python(raw)
+    field.validate(value, None)
+    rule = APARTMENT_RULES.get(field.name)
+    if rule is not None:
+        rule(value)
+    field.run_validators(value)
+    return value
+
+
+def validate_batch(rows, first_number):
+    # Поля моделі визначаються один раз на пакет, а не для кожного рядка,
+    # як це робила б форма; повертає квартири без дублікатів за external_id.
+    fields = [Apartment._meta.get_field(name) for name in IMPORT_FIELDS]
+    apartments = {}
+    errors = []
+    for number, row in enumerate(rows, first_number):
+        if not isinstance(row, dict):
+            errors.append((number, None, 'Некоректний запис'))
+            continue
+        values = {}
+        row_errors = []
+        for field in fields:
+            try:
+                values[field.name] = _clean_value(field, row.get(field.name))
+            except ValidationError as exc:
+                row_errors.extend((number, field.name, message) for message in exc.messages)
+        if not values.get('external_id'):
+            row_errors.append((number, 'external_id', "Зовнішній ID обов'язковий"))
+        if row_errors:
+            errors.extend(row_errors)
+            continue
+        apartments[values['external_id']] = Apartment(**values)
+    return list(apartments.values()), errors
+
+
+def _key_chunks(keys):
+    # Великий --chunk-size не повинен перевищити ліміт параметрів запиту SQLite.
+    size = connection.ops.bulk_batch_size(['external_id'], keys)
+    for offset in range(0, len(keys), size):
+        yield keys[offset:offset + size]
+
+
+def upsert_batch(apartments, chunk_size):
+    keys = [apartment.external_id for apartment in apartments]
+    with transaction.atomic():
+        existing = {
+            external_id
+            for chunk in _key_chunks(keys)
+            for external_id in Apartment.objects.filter(external_id__in=chunk).values_list('external_id', flat=True)
+        }
+        Apartment.objects.bulk_create(
+            apartments,
+            batch_size=chunk_size,
+            update_conflicts=True,
+            unique_fields=['external_id'],
+            update_fields=UPDATE_FIELDS,
+        )
+        # bulk_create не надсилає post_save, тому пошуковий індекс
+        # оновлюється тут, а кеші — одним викликом на пакет.
+        saved = [
+            apartment
+            for chunk in _key_chunks(keys)
+            for apartment in Apartment.objects.filter(external_id__in=chunk).only('pk', 'title', 'description', 'address')
+        ]
+        get_search_backend().index_many(saved)
+    invalidate_stats()
+    invalidate_apartments([apartment.pk for apartment in saved])
+    created = len(set(keys) - existing)
+    return created, len(keys) - created
+
+
+def export_rows(queryset, chunk_size):
+    for values in queryset.order_by('pk').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size):
+        yield dict(zip(EXPORT_FIELDS, values))
+
+
+def write_rows(stream, rows, fmt):
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def source_signature(path):
+    stat = os.stat(path)
+    return {'source': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def load_checkpoint(path, signature):
+    try:
+        with open(path, encoding='utf-8') as stream:
+            state = json.load(stream)
+    except (OSError, ValueError):
+        return None
+    if any(state.get(key) != value for key, value in signature.items()):
+        return None
+    return state
+
+
+def save_checkpoint(path, state):
+    # Запис через тимчасовий файл, щоб обрив не залишив напівзаписаний чекпоінт.
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as stream:
+        json.dump(state, stream)
+    os.replace(temporary, path)
@@ -0,0 +1,141 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import Max
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from service.routers import note_write, refill
+
+from .models import Apartment
+
+PAGE_TIMEOUT = 60 * 5
+# Область вікна після запису (service.routers.note_write) для всіх кешів каталогу.
+CATALOG_SCOPE = 'catalog'
+OBJECT_TIMEOUT = 60 * 60
+CATALOG_VERSION_KEY = 'apartments:catalog_version'
+APARTMENT_FRAGMENTS = ('apartment_row', 'apartment_card', 'apartment_detail')
+
+
+def apartment_key(pk):
+    return f'apartments:apartment:{pk}'
+
+
+def initial_version():
+    # Якщо ключ версії витіснили, нова версія не збігається з жодною попередньою,
+    # тож записи, закешовані під старими версіями, вже не прочитаються.
+    return time.time_ns() // 1000
+
+
+def catalog_version():
+    return cache.get_or_set(CATALOG_VERSION_KEY, initial_version, None)
+
+
+async def acatalog_version():
+    return await cache.aget_or_set(CATALOG_VERSION_KEY, initial_version, None)
+
+
+def bump_catalog_version():
+    note_write(CATALOG_SCOPE)
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, initial_version(), None)
+
+
+def fragment_keys(pk, updated_at):
+    return [make_template_fragment_key(name, [pk, updated_at]) for name in APARTMENT_FRAGMENTS]
+
+
+def get_apartment_or_404(pk):
+    apartment = cache.get(apartment_key(pk))
+    if apartment is None:
+        with refill(CATALOG_SCOPE, OBJECT_TIMEOUT) as timeout:
+            apartment = get_object_or_404(Apartment, pk=pk)
+        cache.set(apartment_key(pk), apartment, timeout)
+    return apartment
+
+
+async def aget_apartment_or_404(pk):
+    apartment = await cache.aget(apartment_key(pk))
+    if apartment is None:
+        with refill(CATALOG_SCOPE, OBJECT_TIMEOUT) as timeout:
+            try:
+                apartment = await Apartment.objects.aget(pk=pk)
+            except Apartment.DoesNotExist:
+                raise Http404('No Apartment matches the given query.')
+        await cache.aset(apartment_key(pk), apartment, timeout)
+    return apartment
+
+
+def _page_key(name, request, version):
+    # Сторінка каталогу залежить лише від параметрів запиту та версії каталогу,
+    # тому будь-яка зміна квартири робить усі старі ключі недосяжними.
+    # Ключ будується з усього закодованого запиту: ручне з'єднання key=value
+    # збігалося для значень із & чи = усередині й губило повторювані параметри.
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    digest = hashlib.md5(query.encode()).hexdigest()
+    return f'apartments:page:{name}:{version}:{digest}'
+
+
+def cached_page(name, request, build):
+    key = _page_key(name, request, catalog_version())
+    page = cache.get(key)
+    if page is None:
+        with refill(CATALOG_SCOPE, PAGE_TIMEOUT) as timeout:
+            page = build()
+        cache.set(key, page, timeout)
+    return page
+
+
+async def acached_page(name, request, build):
+    key = _page_key(name, request, await acatalog_version())
+    page = await cache.aget(key)
+    if page is None:
+        with refill(CATALOG_SCOPE, PAGE_TIMEOUT) as timeout:
+            page = await build()
+        await cache.aset(key, page, timeout)
+    return page
+
+
+def cached_last_modified(name, request, queryset, version):
+    # max(updated_at) списку кешується за тими ж параметрами, що й сама сторінка.
+    key = _page_key(f'{name}:last_modified', request, version)
+    last_modified = cache.get(key)
+    if last_modified is None:
+        with refill(CATALOG_SCOPE, PAGE_TIMEOUT) as timeout:
+            last_modified = queryset.aggregate(last_modified=Max('updated_at'))['last_modified']
+        cache.set(key, last_modified, timeout)
+    return last_modified
+
+
+async def acached_last_modified(name, request, queryset, version):
+    key = _page_key(f'{name}:last_modified', request, version)
+    last_modified = await cache.aget(key)
+    if last_modified is None:
+        with refill(CATALOG_SCOPE, PAGE_TIMEOUT) as timeout:
+            last_modified = (await queryset.aaggregate(last_modified=Max('updated_at')))['last_modified']
+        await cache.aset(key, last_modified, timeout)
+    return last_modified
+
+
+def forget_cached_apartment(pk, updated_at=None):
+    # Фрагменти мають updated_at у ключі, тож після збереження нова версія
+    # рендериться заново; видаляємо лише те, що вже не може бути використане.
+    keys = [apartment_key(pk)]
+    if updated_at is not None:
+        keys += fragment_keys(pk, updated_at)
+    cache.delete_many(keys)
+
+
+def invalidate_apartment(pk, updated_at=None):
+    forget_cached_apartment(pk, updated_at)
+    bump_catalog_version()
+
+
+def invalidate_apartments(pks):
+    cache.delete_many([apartment_key(pk) for pk in pks])
+    bump_catalog_version()
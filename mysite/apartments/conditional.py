@@ -0,0 +1,62 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .favorites import get_favorite_ids
+
+
+def personal_state(request):
+    # Сторінки містять меню користувача та позначки обраного. Якщо є непоказані
+    # повідомлення, валідатори не видаються, щоб вони не загубились за 304.
+    if len(messages.get_messages(request)):
+        return None
+    favorites = ','.join(str(pk) for pk in sorted(get_favorite_ids(request)))
+    return f'{request.user.pk}:{request.user.is_staff}:{favorites}'
+
+
+apersonal_state = sync_to_async(personal_state)
+
+
+def make_etag(*parts):
+    # RELEASE у ключі скидає валідатори після викладки нових шаблонів.
+    value = ':'.join(str(part) for part in (settings.RELEASE,) + parts)
+    return f'"{hashlib.md5(value.encode()).hexdigest()}"'
+
+
+def detail_validators(apartment, state):
+    if state is None:
+        return None, None
+    last_modified = int(apartment.updated_at.timestamp())
+    return make_etag('detail', apartment.pk, apartment.updated_at.timestamp(), state), last_modified
+
+
+def list_validators(request, version, last_modified, state):
+    # Версія каталогу змінюється і при видаленні квартир, чого max(updated_at) не бачить,
+    # тож саме ETag гарантує свіжість; Last-Modified — для клієнтів без ETag.
+    if state is None:
+        return None, None
+    query = sorted(request.GET.items())
+    last_modified = int(last_modified.timestamp()) if last_modified else None
+    return make_etag('list', version, query, state), last_modified
+
+
+def not_modified(request, etag, last_modified):
+    if etag is None:
+        return None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def add_validators(request, response, etag, last_modified):
+    if etag is None or response.status_code not in (200, 304):
+        return response
+    response.headers.setdefault('ETag', etag)
+    if last_modified:
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    # Сторінку можна зберігати, але щоразу перевіряти; персональні — лише в браузері.
+    visibility = {'private': True} if request.user.is_authenticated else {'public': True}
+    patch_cache_control(response, no_cache=True, **visibility)
+    return response
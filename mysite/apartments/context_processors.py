@@ -1,9 +1,13 @@
-FAVORITE_APARTMENTS_KEY = 'favorite_apartments'
+from django.utils.functional import SimpleLazyObject
+
+from .favorites import get_favorite_ids
 
 
 def favorites_context(request):
-    favorite_ids = request.session.get(FAVORITE_APARTMENTS_KEY, [])
+    # Обидва значення ліниві й запам'ятовуються на запиті. Сторінки входу та
+    # реєстрації перевизначають меню (accounts/layout.html) і сесію не читають.
+    favorite_ids = SimpleLazyObject(lambda: get_favorite_ids(request))
     return {
-        'favorites_count': len(favorite_ids),
+        'favorites_count': SimpleLazyObject(lambda: len(favorite_ids)),
         'favorite_ids': favorite_ids,
     }
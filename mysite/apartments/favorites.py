@@ -0,0 +1,104 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from service.routers import note_write, refill
+
+from .models import Apartment, Favorite
+
+FAVORITE_APARTMENTS_KEY = 'favorite_apartments'
+FAVORITES_TIMEOUT = 60 * 60 * 24
+
+
+def favorites_cache_key(user_id):
+    return f'apartments:favorites:{user_id}'
+
+
+def _favorites_scope(user_id):
+    return f'favorites:{user_id}'
+
+
+def invalidate_favorites(user_id):
+    note_write(_favorites_scope(user_id))
+    cache.delete(favorites_cache_key(user_id))
+
+
+def _user_favorites_query(user_id):
+    return Favorite.objects.filter(user_id=user_id).order_by().values_list('apartment_id', flat=True)
+
+
+def get_favorite_ids(request):
+    # Результат запам'ятовується на запиті, тож контекст-процесор і view
+    # читають сесію чи кеш щонайбільше один раз.
+    if hasattr(request, '_favorite_ids'):
+        return request._favorite_ids
+    if request.user.is_authenticated:
+        key = favorites_cache_key(request.user.pk)
+        ids = cache.get(key)
+        if ids is None:
+            with refill(_favorites_scope(request.user.pk), FAVORITES_TIMEOUT) as timeout:
+                ids = set(_user_favorites_query(request.user.pk))
+            cache.set(key, ids, timeout)
+    else:
+        ids = set(request.session.get(FAVORITE_APARTMENTS_KEY, []))
+    request._favorite_ids = ids
+    return ids
+
+
+def _auth_state(request):
+    # Користувач і сесія в Django 4.2 завантажуються лише синхронно.
+    if request.user.is_authenticated:
+        return request.user.pk, None
+    return None, request.session.get(FAVORITE_APARTMENTS_KEY, [])
+
+
+async def aget_favorite_ids(request):
+    if hasattr(request, '_favorite_ids'):
+        return request._favorite_ids
+    user_id, session_ids = await sync_to_async(_auth_state)(request)
+    if user_id is not None:
+        key = favorites_cache_key(user_id)
+        ids = await cache.aget(key)
+        if ids is None:
+            with refill(_favorites_scope(user_id), FAVORITES_TIMEOUT) as timeout:
+                ids = {pk async for pk in _user_favorites_query(user_id)}
+            await cache.aset(key, ids, timeout)
+    else:
+        ids = set(session_ids)
+    request._favorite_ids = ids
+    return ids
+
+
+def add_favorite(request, apartment):
+    request.__dict__.pop('_favorite_ids', None)
+    if request.user.is_authenticated:
+        favorite, created = Favorite.objects.get_or_create(user=request.user, apartment=apartment)
+        return created
+    ids = request.session.get(FAVORITE_APARTMENTS_KEY, [])
+    if apartment.pk in ids:
+        return False
+    request.session[FAVORITE_APARTMENTS_KEY] = ids + [apartment.pk]
+    return True
+
+
+def remove_favorite(request, apartment):
+    request.__dict__.pop('_favorite_ids', None)
+    if request.user.is_authenticated:
+        deleted, _ = Favorite.objects.filter(user=request.user, apartment=apartment).delete()
+        return bool(deleted)
+    ids = request.session.get(FAVORITE_APARTMENTS_KEY, [])
+    if apartment.pk not in ids:
+        return False
+    request.session[FAVORITE_APARTMENTS_KEY] = [pk for pk in ids if pk != apartment.pk]
+    return True
+
+
+def merge_session_favorites(request, user):
+    ids = request.session.pop(FAVORITE_APARTMENTS_KEY, None)
+    if not ids:
+        return
+    existing = Apartment.objects.filter(pk__in=ids).values_list('pk', flat=True)
+    Favorite.objects.bulk_create(
+        [Favorite(user=user, apartment_id=pk) for pk in existing],
+        ignore_conflicts=True,
+    )
+    invalidate_favorites(user.pk)
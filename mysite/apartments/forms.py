@@ -1,14 +1,19 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from .models import Apartment, Booking
-from datetime import date
+from .availability import available_between
+from .validators import (
+    validate_address, validate_description, validate_floor, validate_price, validate_square_meters,
+    validate_title,
+)
+from datetime import date, timedelta
 
 
 class ApartmentForm(forms.ModelForm):
     class Meta:
         model = Apartment
         fields = ['title', 'description', 'apartment_type', 'price', 
-                  'square_meters', 'floor', 'address', 'image', 'is_available']
+                  'square_meters', 'floor', 'address', 'image']
         widgets = {
             'title': forms.TextInput(attrs={
                 'class': 'form-control',
@@ -42,9 +47,6 @@ class ApartmentForm(forms.ModelForm):
             }),
             'image': forms.FileInput(attrs={
                 'class': 'form-control'
-            }),
-            'is_available': forms.CheckboxInput(attrs={
-                'class': 'form-check-input'
             })
         }
         labels = {
@@ -55,50 +57,42 @@ class ApartmentForm(forms.ModelForm):
             'square_meters': 'Площа (м²)',
             'floor': 'Поверх',
             'address': 'Адреса',
-            'image': 'Фото квартири',
-            'is_available': 'Доступна для продажу'
+            'image': 'Фото квартири'
         }
 
+    def save(self, commit=True):
+        if 'image' in self.changed_data:
+            self.instance.image_variants = {}
+        return super().save(commit)
+
     def clean_title(self):
         title = self.cleaned_data.get('title')
-        if len(title) < 5:
-            raise ValidationError('Назва повинна містити мінімум 5 символів')
+        validate_title(title)
         return title
 
     def clean_price(self):
         price = self.cleaned_data.get('price')
-        if price <= 0:
-            raise ValidationError('Ціна повинна бути більше 0')
-        if price > 10000000:
-            raise ValidationError('Ціна не може перевищувати 10,000,000$')
+        validate_price(price)
         return price
 
     def clean_square_meters(self):
         square_meters = self.cleaned_data.get('square_meters')
-        if square_meters < 10:
-            raise ValidationError('Площа повинна бути мінімум 10 м²')
-        if square_meters > 1000:
-            raise ValidationError('Площа не може перевищувати 1000 м²')
+        validate_square_meters(square_meters)
         return square_meters
 
     def clean_floor(self):
         floor = self.cleaned_data.get('floor')
-        if floor < 1:
-            raise ValidationError('Поверх повинен бути мінімум 1')
-        if floor > 100:
-            raise ValidationError('Поверх не може перевищувати 100')
+        validate_floor(floor)
         return floor
 
     def clean_address(self):
         address = self.cleaned_data.get('address')
-        if len(address) < 10:
-            raise ValidationError('Адреса повинна містити мінімум 10 символів')
+        validate_address(address)
         return address
 
     def clean_description(self):
         description = self.cleaned_data.get('description')
-        if len(description) < 20:
-            raise ValidationError('Опис повинен містити мінімум 20 символів')
+        validate_description(description)
         return description
 
 
@@ -133,17 +127,150 @@ class BookingForm(forms.ModelForm):
             raise ValidationError('Дата початку не може бути в минулому')
         return start_date
 
+class ApartmentFilterForm(forms.Form):
+    # Значення — кількість ночей від сьогодні, протягом яких квартира має бути вільною;
+    # '0' — зайняті сьогодні.
+    AVAILABILITY_CHOICES = [
+        ('', 'Усі'),
+        ('1', 'Вільні сьогодні'),
+        ('7', 'Вільні 7 ночей'),
+        ('30', 'Вільні 30 ночей'),
+        ('0', 'Зайняті'),
+    ]
+
+    q = forms.CharField(
+        required=False,
+        max_length=200,
+        label='Пошук',
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Пошук квартир...'})
+    )
+    apartment_type = forms.ChoiceField(
+        choices=[('', 'Усі типи')] + Apartment.TYPE_CHOICES,
+        required=False,
+        label='Тип квартири',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    min_price = forms.DecimalField(
+        required=False,
+        min_value=0,
+        label='Ціна від',
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Ціна від'})
+    )
+    max_price = forms.DecimalField(
+        required=False,
+        min_value=0,
+        label='Ціна до',
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Ціна до'})
+    )
+    min_area = forms.FloatField(
+        required=False,
+        min_value=0,
+        label='Площа від',
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'м² від'})
+    )
+    max_area = forms.FloatField(
+        required=False,
+        min_value=0,
+        label='Площа до',
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'м² до'})
+    )
+    floor = forms.IntegerField(
+        required=False,
+        min_value=1,
+        label='Поверх',
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Поверх'})
+    )
+    is_available = forms.ChoiceField(
+        choices=AVAILABILITY_CHOICES,
+        required=False,
+        label='Статус',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    available_from = forms.DateField(
+        required=False,
+        label='Вільна з',
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    available_to = forms.DateField(
+        required=False,
+        label='Вільна до',
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+
     def clean(self):
         cleaned_data = super().clean()
-        start_date = cleaned_data.get('start_date')
-        end_date = cleaned_data.get('end_date')
+        for low, high in (('min_price', 'max_price'), ('min_area', 'max_area')):
+            low_value = cleaned_data.get(low)
+            high_value = cleaned_data.get(high)
+            if low_value is not None and high_value is not None and low_value > high_value:
+                raise ValidationError('Мінімальне значення не може перевищувати максимальне')
+        available_from = cleaned_data.get('available_from')
+        available_to = cleaned_data.get('available_to')
+        if bool(available_from) != bool(available_to):
+            raise ValidationError('Вкажіть обидві дати періоду')
+        if available_from and available_to and available_to <= available_from:
+            raise ValidationError('Дата закінчення повинна бути пізніше дати початку')
+        return cleaned_data
+
+    def search_query(self):
+        if not self.is_valid():
+            return ''
+        return self.cleaned_data.get('q', '').strip()
 
-        if start_date and end_date:
-            if end_date <= start_date:
-                raise ValidationError('Дата закінчення повинна бути пізніше дати початку')
-            
-            days = (end_date - start_date).days
-            if days < 1:
-                raise ValidationError('Мінімальний термін бронювання - 1 день')
+    def filter(self, queryset):
+        if not self.is_valid():
+            return queryset
+        data = self.cleaned_data
+        if data.get('apartment_type'):
+            queryset = queryset.filter(apartment_type=data['apartment_type'])
+        if data.get('is_available') == '0':
+            queryset = queryset.filter(is_available=False)
+        elif data.get('is_available'):
+            queryset = queryset.free_for(int(data['is_available']))
+        if data.get('min_price') is not None:
+            queryset = queryset.filter(price__gte=data['min_price'])
+        if data.get('max_price') is not None:
+            queryset = queryset.filter(price__lte=data['max_price'])
+        if data.get('min_area') is not None:
+            queryset = queryset.filter(square_meters__gte=data['min_area'])
+        if data.get('max_area') is not None:
+            queryset = queryset.filter(square_meters__lte=data['max_area'])
+        if data.get('floor') is not None:
+            queryset = queryset.filter(floor=data['floor'])
+        if data.get('available_from') and data.get('available_to'):
+            queryset = available_between(queryset, data['available_from'], data['available_to'])
+        return queryset
 
+
+class AnalyticsFilterForm(forms.Form):
+    DEFAULT_DAYS = 30
+    MAX_DAYS = 366
+
+    start = forms.DateField(
+        required=False,
+        label='З',
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    end = forms.DateField(
+        required=False,
+        label='По',
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        end = cleaned_data.get('end') or date.today()
+        start = cleaned_data.get('start') or end - timedelta(days=self.DEFAULT_DAYS - 1)
+        if start > end:
+            raise ValidationError('Початкова дата не може бути пізніше кінцевої')
+        if (end - start).days >= self.MAX_DAYS:
+            raise ValidationError(f'Період не може перевищувати {self.MAX_DAYS} днів')
+        cleaned_data['start'] = start
+        cleaned_data['end'] = end
         return cleaned_data
+
+    def window(self):
+        if self.is_valid():
+            return self.cleaned_data['start'], self.cleaned_data['end']
+        end = date.today()
+        return end - timedelta(days=self.DEFAULT_DAYS - 1), end
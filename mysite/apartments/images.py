@@ -0,0 +1,81 @@
+import base64
+import hashlib
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageFilter, ImageOps, features
+
+from .cache import invalidate_apartment
+from .models import Apartment
+
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = [
+    (extension, pil_format, quality)
+    for extension, pil_format, quality, feature in (
+        ('avif', 'AVIF', 50, 'avif'),
+        ('webp', 'WEBP', 75, 'webp'),
+        ('jpg', 'JPEG', 80, None),
+    )
+    if feature is None or features.check(feature)
+]
+PLACEHOLDER_WIDTH = 16
+DERIVED_ROOT = 'apartments/derived'
+
+
+def _encode(image, pil_format, quality):
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, quality=quality)
+    return buffer.getvalue()
+
+
+def _placeholder(image):
+    tiny = image.copy()
+    tiny.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+    tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+    data = base64.b64encode(_encode(tiny, 'JPEG', 60)).decode()
+    return f'data:image/jpeg;base64,{data}'
+
+
+def build_variants(image_file):
+    with image_file.open('rb') as source:
+        data = source.read()
+    digest = hashlib.sha256(data).hexdigest()
+    base_name = f'{DERIVED_ROOT}/{digest[:2]}/{digest}'
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data))).convert('RGB')
+    variants = []
+    for width in VARIANT_WIDTHS:
+        if width > image.width and variants:
+            break
+        resized = image.copy()
+        resized.thumbnail((width, image.height), Image.LANCZOS)
+        for extension, pil_format, quality in VARIANT_FORMATS:
+            # Імена похідних залежать лише від вмісту оригіналу, тож повторне
+            # завантаження того самого файлу не перекодовує його.
+            name = f'{base_name}/{resized.width}.{extension}'
+            if not default_storage.exists(name):
+                default_storage.save(name, ContentFile(_encode(resized, pil_format, quality)))
+            variants.append({'width': resized.width, 'format': extension, 'name': name})
+
+    return {
+        'hash': digest,
+        'width': image.width,
+        'height': image.height,
+        'placeholder': _placeholder(image),
+        'variants': variants,
+    }
+
+
+def process_apartment_image(apartment_id):
+    apartment = Apartment.objects.filter(pk=apartment_id).first()
+    if apartment is None or not apartment.image:
+        return
+    manifest = build_variants(apartment.image)
+    updated = Apartment.objects.filter(pk=apartment_id, image=apartment.image.name).update(
+        image_variants=manifest,
+        updated_at=timezone.now(),
+    )
+    if updated:
+        invalidate_apartment(apartment_id)
@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .analytics import STATE_FIELDS, BookingState, apply_booking_changes
+from .availability import refresh_availability, with_retries
+from .models import Booking
+from .occupancy import bump_occupancy_version
+
+BATCH_SIZE = 5000
+
+
+def expiry_cutoff(now=None):
+    return (now or timezone.now()) - timedelta(hours=settings.BOOKING_PENDING_EXPIRY_HOURS)
+
+
+def expired_pending(now=None, today=None):
+    # Непідтверджене бронювання скасовується через BOOKING_PENDING_EXPIRY_HOURS
+    # після створення або коли дати проживання вже минули.
+    return Booking.objects.filter(
+        Q(created_at__lte=expiry_cutoff(now)) | Q(end_date__lte=today or date.today()),
+        status='pending',
+    )
+
+
+def finished_confirmed(today=None):
+    return Booking.objects.filter(status='confirmed', end_date__lte=today or date.today())
+
+
+def _transition_batch(queryset, status, after_pk, batch_size):
+    # Перші batch_size рядків за pk займають суцільний діапазон, тож статус
+    # змінюється одним UPDATE по діапазону pk, без списку ідентифікаторів.
+    with transaction.atomic():
+        rows = list(
+            queryset.filter(pk__gt=after_pk).select_for_update(of=('self',)).order_by('pk')
+            .values_list('pk', *STATE_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return None
+        queryset.filter(pk__range=(rows[0][0], rows[-1][0])).update(status=status)
+        states = [BookingState(*row[1:]) for row in rows]
+        apply_booking_changes((state, state._replace(status=status)) for state in states)
+    return rows[-1][0], states
+
+
+def transition(queryset, status, batch_size=BATCH_SIZE):
+    # update() не надсилає сигналів, тож аналітика змінюється в тій самій транзакції
+    # пакета, а кеші квартир оновлюються один раз наприкінці.
+    moved = 0
+    apartment_ids = set()
+    after_pk = 0
+    while True:
+        result = with_retries(_transition_batch, queryset, status, after_pk, batch_size)
+        if result is None:
+            break
+        after_pk, states = result
+        moved += len(states)
+        apartment_ids.update(state.apartment_id for state in states)
+    if apartment_ids:
+        refresh_affected(apartment_ids)
+    return moved
+
+
+def refresh_affected(apartment_ids):
+    for apartment_id in apartment_ids:
+        bump_occupancy_version(apartment_id)
+    refresh_availability(apartment_ids)
+
+
+def next_expiry(now=None):
+    # Бронювання, створене після цього запиту, не сплине раніше, ніж через повний
+    # строк від зараз, тож найстаріше очікуюче визначає наступний запуск точно.
+    oldest = Booking.objects.filter(status='pending').aggregate(oldest=Min('created_at'))['oldest']
+    return (oldest or now or timezone.now()) + timedelta(hours=settings.BOOKING_PENDING_EXPIRY_HOURS)
@@ -0,0 +1,31 @@
+from django.urls import get_script_prefix, reverse
+
+APARTMENT_URLS = {
+    'detail': 'apartment_detail',
+    'update': 'apartment_update',
+    'delete': 'apartment_delete',
+    'book': 'booking_create',
+    'add_favorite': 'add_to_favorites',
+    'remove_favorite': 'remove_from_favorites',
+}
+PK_PLACEHOLDER = 987654321
+
+_templates = {}
+
+
+def _url_templates():
+    # reverse() виконується один раз на процес (і префікс скрипта), далі
+    # посилання квартири — це лише підстановка pk у готовий рядок.
+    prefix = get_script_prefix()
+    templates = _templates.get(prefix)
+    if templates is None:
+        templates = {
+            key: reverse(name, args=[PK_PLACEHOLDER]).replace(str(PK_PLACEHOLDER), '{pk}')
+            for key, name in APARTMENT_URLS.items()
+        }
+        _templates[prefix] = templates
+    return templates
+
+
+def apartment_urls(pk):
+    return {key: template.format(pk=pk) for key, template in _url_templates().items()}
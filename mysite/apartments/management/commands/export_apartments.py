@@ -0,0 +1,33 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from apartments.bulk import FORMATS, detect_format, export_rows, write_rows
+from apartments.models import Apartment
+
+
+class Command(BaseCommand):
+    help = 'Експортує квартири у CSV/JSONL потоково'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Шлях до файлу або '-' для stdout")
+        parser.add_argument('--format', choices=FORMATS, help='Формат файлу (за замовчуванням — за розширенням)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Розмір пакету читання з БД')
+        parser.add_argument('--type', dest='apartment_type', choices=[code for code, label in Apartment.TYPE_CHOICES],
+                            help='Експортувати лише квартири цього типу')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        queryset = Apartment.objects.all()
+        if options['apartment_type']:
+            queryset = queryset.filter(apartment_type=options['apartment_type'])
+
+        stream = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8', newline='')
+        try:
+            count = write_rows(stream, export_rows(queryset, options['chunk_size']), fmt)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        if path != '-':
+            self.stdout.write(self.style.SUCCESS(f'Експортовано квартир: {count}'))
@@ -0,0 +1,152 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from apartments.analytics import reconcile
+from apartments.availability import refresh_availability
+from apartments.cache import bump_catalog_version
+from apartments.models import Apartment, Booking, Favorite
+from apartments.occupancy import bump_occupancy_version
+from apartments.search import get_backend as get_search_backend
+from apartments.stats import invalidate_stats
+
+PREFIX = 'bench-'
+PASSWORD = 'bench-password'
+# Кількість бронювань; квартир — у 10 разів менше, користувачів — у 20.
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+ADJECTIVES = ['Світла', 'Затишна', 'Простора', 'Сучасна', 'Тиха', 'Panoramic', 'Cozy', 'Modern', 'Bright']
+NOUNS = ['квартира', 'студія', 'пентхаус', 'apartment', 'loft', 'flat']
+STREETS = ['вул. Шевченка', 'вул. Франка', 'просп. Свободи', 'Green Street', 'Maple Avenue', 'вул. Лесі Українки']
+CITIES = ['Київ', 'Львів', 'Одеса', 'Харків', 'Дніпро']
+FEATURES = ['з ремонтом', 'біля парку', 'з балконом', 'з видом на місто', 'near the metro', 'fully furnished']
+
+
+class Command(BaseCommand):
+    help = 'Генерує тестові дані для бенчмарків (квартири, користувачі, бронювання)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='10k', help='Кількість бронювань; квартир у 10, користувачів у 20 разів менше')
+        parser.add_argument('--apartments', type=int, help='Перевизначити кількість квартир')
+        parser.add_argument('--bookings', type=int, help='Перевизначити кількість бронювань')
+        parser.add_argument('--users', type=int, help='Перевизначити кількість користувачів')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Розмір пакету bulk_create')
+        parser.add_argument('--seed', type=int, default=42, help='Зерно генератора для відтворюваності')
+        parser.add_argument('--clear', action='store_true', help='Видалити попередньо згенеровані дані')
+
+    def handle(self, *args, **options):
+        bookings = options['bookings'] or SCALES[options['scale']]
+        apartments = options['apartments'] or max(bookings // 10, 1)
+        users = options['users'] or max(bookings // 20, 1)
+        self.chunk_size = options['chunk_size']
+        self.random = random.Random(options['seed'])
+
+        if options['clear']:
+            Apartment.objects.filter(external_id__startswith=PREFIX).delete()
+            User.objects.filter(username__startswith=PREFIX).delete()
+            self.stdout.write('Попередні дані видалено')
+
+        user_ids = self.create_users(users)
+        apartment_ids = self.create_apartments(apartments)
+        self.create_bookings(bookings, apartment_ids, user_ids)
+        self.create_favorites(user_ids, apartment_ids)
+        self.refresh_derived(apartment_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Згенеровано бронювань: {bookings}. Тестових користувачів: {len(user_ids)}, квартир: {len(apartment_ids)}'
+        ))
+
+    def _bulk(self, model, objects, **kwargs):
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.chunk_size:
+                model.objects.bulk_create(batch, **kwargs)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch, **kwargs)
+
+    def create_users(self, count):
+        start = User.objects.filter(username__startswith=PREFIX).count()
+        password = make_password(PASSWORD)
+        self._bulk(User, (
+            User(username=f'{PREFIX}{number}', email=f'{PREFIX}{number}@example.com', password=password)
+            for number in range(start, start + count)
+        ))
+        return list(User.objects.filter(username__startswith=PREFIX).values_list('pk', flat=True))
+
+    def create_apartments(self, count):
+        start = Apartment.objects.filter(external_id__startswith=PREFIX).count()
+        types = [code for code, label in Apartment.TYPE_CHOICES]
+        choice = self.random.choice
+
+        def build(number):
+            return Apartment(
+                external_id=f'{PREFIX}{number}',
+                title=f'{choice(ADJECTIVES)} {choice(NOUNS)} №{number}',
+                description=f'{choice(ADJECTIVES)} {choice(NOUNS)} {choice(FEATURES)}, {choice(FEATURES)}.',
+                apartment_type=choice(types),
+                price=Decimal(self.random.randint(300, 5000)),
+                square_meters=self.random.randint(20, 250),
+                floor=self.random.randint(1, 30),
+                address=f'{choice(STREETS)}, {self.random.randint(1, 200)}, {choice(CITIES)}',
+            )
+
+        self._bulk(Apartment, (build(number) for number in range(start, start + count)))
+        return list(Apartment.objects.filter(external_id__startswith=PREFIX).values_list('pk', flat=True))
+
+    def create_bookings(self, count, apartment_ids, user_ids):
+        # Бронювання однієї квартири йдуть одне за одним без перетинів,
+        # починаючи за рік до сьогодні.
+        today = date.today()
+        prices = dict(Apartment.objects.filter(external_id__startswith=PREFIX).values_list('pk', 'price'))
+        cursors = dict(
+            Booking.objects.filter(apartment__external_id__startswith=PREFIX)
+            .values_list('apartment_id').annotate(last=Max('end_date')).order_by()
+        )
+        first_day = today - timedelta(days=365)
+
+        def build():
+            apartment_id = self.random.choice(apartment_ids)
+            start = cursors.get(apartment_id, first_day) + timedelta(days=self.random.randint(0, 10))
+            end = start + timedelta(days=self.random.randint(1, 14))
+            cursors[apartment_id] = end
+            if self.random.random() < 0.1:
+                status = 'cancelled'
+            elif end < today:
+                status = 'completed'
+            else:
+                status = self.random.choice(['pending', 'confirmed'])
+            return Booking(
+                apartment_id=apartment_id,
+                user_id=self.random.choice(user_ids),
+                start_date=start,
+                end_date=end,
+                status=status,
+                total_price=prices[apartment_id] * (end - start).days,
+            )
+
+        self._bulk(Booking, (build() for _ in range(count)))
+
+    def create_favorites(self, user_ids, apartment_ids):
+        self._bulk(Favorite, (
+            Favorite(user_id=user_id, apartment_id=apartment_id)
+            for user_id in user_ids
+            for apartment_id in self.random.sample(apartment_ids, min(5, len(apartment_ids)))
+        ), ignore_conflicts=True)
+
+    def refresh_derived(self, apartment_ids):
+        # bulk_create не надсилає сигналів, тож кеші, пошук, доступність та аналітику оновлюємо явно.
+        invalidate_stats()
+        bump_catalog_version()
+        for apartment_id in apartment_ids:
+            bump_occupancy_version(apartment_id)
+        get_search_backend().rebuild(Apartment.objects.filter(external_id__startswith=PREFIX))
+        refresh_availability(apartment_ids)
+        span = Booking.objects.aggregate(start=Min('start_date'), end=Max('end_date'))
+        if span['start']:
+            reconcile(span['start'], span['end'])
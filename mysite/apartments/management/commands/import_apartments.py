@@ -0,0 +1,83 @@
+import sys
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apartments.bulk import (
+    FORMATS, detect_format, load_checkpoint, read_rows, save_checkpoint, source_signature,
+    upsert_batch, validate_batch,
+)
+
+
+class Command(BaseCommand):
+    help = 'Імпортує квартири з CSV/JSONL з оновленням за зовнішнім ID'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Шлях до файлу або '-' для stdin")
+        parser.add_argument('--format', choices=FORMATS, help='Формат файлу (за замовчуванням — за розширенням)')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Кількість записів в одному пакеті')
+        parser.add_argument('--checkpoint', help='Файл чекпоінту (за замовчуванням <path>.checkpoint)')
+        parser.add_argument('--restart', action='store_true', help='Ігнорувати наявний чекпоінт')
+        parser.add_argument('--dry-run', action='store_true', help='Лише перевірити записи без збереження')
+        parser.add_argument('--errors', help='Записати помилки валідації у CSV-файл')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size має бути більше 0')
+
+        use_checkpoint = path != '-' and not options['dry_run']
+        checkpoint_path = options['checkpoint'] or f'{path}.checkpoint'
+        state = {'rows': 0, 'created': 0, 'updated': 0, 'errors': 0}
+        if use_checkpoint:
+            signature = source_signature(path)
+            resumed = None if options['restart'] else load_checkpoint(checkpoint_path, signature)
+            if resumed:
+                state = resumed
+                self.stdout.write(f"Продовження з запису {state['rows'] + 1}")
+            state.update(signature)
+
+        errors_stream = open(options['errors'], 'w', encoding='utf-8') if options['errors'] else None
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8-sig', newline='')
+        try:
+            rows = islice(read_rows(stream, fmt), state['rows'], None)
+            while True:
+                batch = list(islice(rows, chunk_size))
+                if not batch:
+                    break
+                apartments, errors = validate_batch(batch, state['rows'] + 1)
+                if apartments and not options['dry_run']:
+                    created, updated = upsert_batch(apartments, chunk_size)
+                    state['created'] += created
+                    state['updated'] += updated
+                state['rows'] += len(batch)
+                state['errors'] += len({number for number, field, message in errors})
+                self._report_errors(errors, errors_stream)
+                if use_checkpoint:
+                    save_checkpoint(checkpoint_path, state)
+                self.stdout.write(f"Оброблено записів: {state['rows']}")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if errors_stream:
+                errors_stream.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Створено: {state['created']}, оновлено: {state['updated']}, "
+            f"відхилено: {state['errors']}"
+        ))
+        if use_checkpoint:
+            # Чекпоінт лишається з фінальним станом: повторний запуск нічого не зробить,
+            # а --restart імпортує файл заново.
+            save_checkpoint(checkpoint_path, state)
+
+    def _report_errors(self, errors, errors_stream):
+        for number, field, message in errors:
+            line = f'{number},{field or ""},{message}'
+            if errors_stream:
+                errors_stream.write(line + '\n')
+            else:
+                label = f'{field}: ' if field else ''
+                self.stderr.write(f'Запис {number}: {label}{message}')
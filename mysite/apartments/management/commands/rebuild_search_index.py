@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apartments.models import Apartment
+from apartments.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Перебудовує пошуковий індекс квартир'
+
+    def handle(self, *args, **options):
+        get_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Проіндексовано квартир: {Apartment.objects.count()}'))
@@ -0,0 +1,28 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apartments.analytics import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Перераховує денні зведення аналітики з таблиці бронювань'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days-back', type=int, default=90, help='Скільки днів до сьогодні перерахувати')
+        parser.add_argument('--days-ahead', type=int, default=365, help='Скільки днів після сьогодні перерахувати')
+        parser.add_argument('--start', type=date.fromisoformat, help='Початкова дата (YYYY-MM-DD)')
+        parser.add_argument('--end', type=date.fromisoformat, help='Кінцева дата (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        today = date.today()
+        start = options['start'] or today - timedelta(days=options['days_back'])
+        end = options['end'] or today + timedelta(days=options['days_ahead'])
+        if start > end:
+            raise CommandError('Початкова дата не може бути пізніше кінцевої')
+
+        apartment_drift, type_drift = reconcile(start, end)
+        self.stdout.write(self.style.SUCCESS(
+            f'Зведення за {start}—{end} перераховано. Розбіжностей: '
+            f'квартири — {apartment_drift}, типи — {type_drift}'
+        ))
@@ -0,0 +1,19 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apartments.availability import refresh_availability
+
+
+class Command(BaseCommand):
+    help = 'Оновлює доступність квартир, що змінилась із плином часу (запускати щодня після опівночі)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Перерахувати всі квартири, а не лише ті, що могли застаріти')
+        parser.add_argument('--date', type=date.fromisoformat, help='Дата, на яку рахувати доступність (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        # Без --all обходимо лише зайняті квартири та ті, чиє найближче бронювання
+        # вже почалося: решта не змінюється, доки не змінено бронювання.
+        changed = refresh_availability(today=options['date'], stale_only=not options['all'])
+        self.stdout.write(self.style.SUCCESS(f'Доступність оновлено. Змінено квартир: {len(changed)}'))
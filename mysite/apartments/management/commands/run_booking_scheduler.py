@@ -0,0 +1,70 @@
+import time
+import traceback
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apartments.availability import refresh_availability
+from apartments.lifecycle import expired_pending, finished_confirmed, next_expiry, transition
+from service.scheduler import TimeWheel
+
+
+def next_midnight():
+    return datetime.combine(date.today() + timedelta(days=1), datetime.min.time()).timestamp()
+
+
+class Command(BaseCommand):
+    help = 'Планувальник життєвого циклу бронювань: скасовує прострочені очікуючі та завершує минулі'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tick', type=float, default=60.0, help='Крок колеса таймерів (с)')
+        parser.add_argument('--slots', type=int, default=60, help='Кількість кошиків колеса')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Бронювань в одній транзакції')
+        parser.add_argument('--once', action='store_true', help='Виконати всі переходи зараз і завершитись (для cron)')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        jobs = {'expire': self.expire, 'daily': self.daily}
+        if options['once']:
+            for job in jobs.values():
+                job()
+            return
+
+        wheel = TimeWheel(tick=options['tick'], slots=options['slots'])
+        now = time.time()
+        for name, job in jobs.items():
+            wheel.schedule(name, now, job)
+        while True:
+            for name, job in wheel.advance():
+                wheel.schedule(name, self.run(name, job, options['tick']), job)
+            time.sleep(wheel.next_tick_in())
+
+    def run(self, name, job, retry_after):
+        # Задача повертає час наступного запуску; після помилки повторюємо через крок колеса.
+        try:
+            return job()
+        except Exception:
+            self.stderr.write(f'Задача {name} завершилась з помилкою:\n{traceback.format_exc()}')
+            return time.time() + retry_after
+        finally:
+            close_old_connections()
+
+    def report(self, label, count, started):
+        self.stdout.write(f'{label}: {count} ({time.perf_counter() - started:.2f} с)')
+
+    def expire(self):
+        started = time.perf_counter()
+        self.report('Скасовано прострочених', transition(expired_pending(), 'cancelled', self.batch_size), started)
+        return next_expiry().timestamp()
+
+    def daily(self):
+        # Після опівночі: завершення минулих проживань, очікуючі з датами, що минули,
+        # і доступність квартир, що змінилась лише від зміни дати.
+        started = time.perf_counter()
+        self.report('Завершено', transition(finished_confirmed(), 'completed', self.batch_size), started)
+        started = time.perf_counter()
+        self.report('Скасовано прострочених', transition(expired_pending(), 'cancelled', self.batch_size), started)
+        started = time.perf_counter()
+        self.report('Оновлено доступність квартир', len(refresh_availability(stale_only=True)), started)
+        return next_midnight()
@@ -0,0 +1,29 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .sessions import session_stats
+
+
+class SessionStatsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.record(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        self.record(request)
+        return response
+
+    def record(self, request):
+        session = getattr(request, 'session', None)
+        session_stats.record_request(session is not None and session.accessed)
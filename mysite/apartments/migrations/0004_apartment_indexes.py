@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0003_apartment_image_alter_apartment_id_booking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='apartment',
+            index=models.Index(fields=['-created_at', 'id'], name='apartment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apartment',
+            index=models.Index(fields=['apartment_type', '-created_at', 'id'], name='apartment_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apartment',
+            index=models.Index(fields=['is_available', '-created_at', 'id'], name='apartment_avail_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apartment',
+            index=models.Index(fields=['price'], name='apartment_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apartment',
+            index=models.Index(fields=['square_meters'], name='apartment_area_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apartment',
+            index=models.Index(fields=['floor'], name='apartment_floor_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0004_apartment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['apartment', 'start_date', 'end_date', 'status'], name='booking_apartment_dates_idx'),
+        ),
+    ]
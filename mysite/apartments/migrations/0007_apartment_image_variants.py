@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0006_favorite'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apartment',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Мініатюри, WebP/AVIF та плейсхолдер, згенеровані з фото', verbose_name='Варіанти фото'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+import re
+
+from django.db import OperationalError, migrations
+
+FTS_TABLE = 'apartments_apartment_fts'
+
+# Замороджена копія apartments.search.normalize на момент міграції: зміни стемера
+# не повинні змінювати те, що робить історична міграція. Після зміни стемера
+# індекс перебудовується командою rebuild_search_index.
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+CYRILLIC_RE = re.compile('[а-яіїєґ]')
+UK_SUFFIXES = sorted([
+    'ами', 'ями', 'ові', 'еві', 'ого', 'ому', 'ими', 'іми', 'ська', 'ський', 'ське', 'ські',
+    'ою', 'ею', 'єю', 'ій', 'ий', 'ої', 'ім', 'ам', 'ям', 'ах', 'ях', 'ів', 'их', 'ая', 'ую',
+    'юю', 'не', 'на', 'ні', 'ну', 'ня', 'а', 'я', 'о', 'е', 'є', 'и', 'і', 'у', 'ю', 'ь', 'ї', 'й',
+], key=len, reverse=True)
+EN_SUFFIXES = sorted([
+    'ations', 'ation', 'ments', 'ment', 'ness', 'ings', 'ing', 'ies', 'ied', 'ed', 'es', 'ly', 's',
+], key=len, reverse=True)
+MIN_STEM = 3
+
+
+def stem(word):
+    word = word.lower()
+    suffixes = UK_SUFFIXES if CYRILLIC_RE.search(word) else EN_SUFFIXES
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            return word[:-len(suffix)]
+    return word
+
+
+def normalize(text):
+    return ' '.join(stem(word) for word in WORD_RE.findall(text or ''))
+
+
+def fts5_available(connection):
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute('CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(value)')
+        except OperationalError:
+            return False
+        cursor.execute('DROP TABLE temp.fts5_probe')
+    return True
+
+
+def create_fts_table(apps, schema_editor):
+    # Без FTS5 таблиця не створюється, і пошук працює через DatabaseSearchBackend.
+    if schema_editor.connection.vendor != 'sqlite' or not fts5_available(schema_editor.connection):
+        return
+
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+        f'title, description, address, tokenize="unicode61 remove_diacritics 2")'
+    )
+    Apartment = apps.get_model('apartments', 'Apartment')
+    for apartment in Apartment.objects.only('pk', 'title', 'description', 'address').iterator():
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, description, address) VALUES (%s, %s, %s, %s)',
+            [apartment.pk, normalize(apartment.title), normalize(apartment.description),
+             normalize(apartment.address)],
+        )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0007_apartment_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0008_apartment_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apartment',
+            name='external_id',
+            field=models.CharField(blank=True, help_text='Ідентифікатор квартири у фіді партнера', max_length=100, null=True, unique=True, verbose_name='Зовнішній ID'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0009_apartment_external_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApartmentDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('booked_nights', models.IntegerField(default=0, verbose_name='Заброньовані ночі')),
+                ('cancelled_nights', models.IntegerField(default=0, verbose_name='Скасовані ночі')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Дохід')),
+            ],
+            options={
+                'verbose_name': 'Денна статистика квартири',
+                'verbose_name_plural': 'Денна статистика квартир',
+            },
+        ),
+        migrations.CreateModel(
+            name='TypeDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('apartment_type', models.CharField(choices=[('ST', 'Studio'), ('1B', '1 Bedroom'), ('2B', '2 Bedrooms'), ('3B', '3 Bedrooms'), ('PH', 'Penthouse')], max_length=2, verbose_name='Тип квартири')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('booked_nights', models.IntegerField(default=0, verbose_name='Заброньовані ночі')),
+                ('cancelled_nights', models.IntegerField(default=0, verbose_name='Скасовані ночі')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Дохід')),
+            ],
+            options={
+                'verbose_name': 'Денна статистика типу',
+                'verbose_name_plural': 'Денна статистика типів',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='typedailystats',
+            constraint=models.UniqueConstraint(fields=('apartment_type', 'date'), name='type_daily_stats_unique'),
+        ),
+        migrations.AddField(
+            model_name='apartmentdailystats',
+            name='apartment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='apartments.apartment', verbose_name='Квартира'),
+        ),
+        migrations.AddIndex(
+            model_name='apartmentdailystats',
+            index=models.Index(fields=['date'], name='apartment_daily_stats_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='apartmentdailystats',
+            constraint=models.UniqueConstraint(fields=('apartment', 'date'), name='apartment_daily_stats_unique'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:04
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0010_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Season',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Назва')),
+                ('apartment_type', models.CharField(blank=True, choices=[('ST', 'Studio'), ('1B', '1 Bedroom'), ('2B', '2 Bedrooms'), ('3B', '3 Bedrooms'), ('PH', 'Penthouse')], help_text='Порожнє значення — сезон діє для всіх типів', max_length=2, verbose_name='Тип квартири')),
+                ('start_date', models.DateField(verbose_name='Перша ніч')),
+                ('end_date', models.DateField(verbose_name='Остання ніч')),
+                ('multiplier', models.DecimalField(decimal_places=2, help_text='Множник базової ціни, наприклад 1.25 або 0.80', max_digits=4, validators=[django.core.validators.MinValueValidator(0.1), django.core.validators.MaxValueValidator(10)], verbose_name='Коефіцієнт')),
+            ],
+            options={
+                'verbose_name': 'Сезон',
+                'verbose_name_plural': 'Сезони',
+                'ordering': ['start_date'],
+            },
+        ),
+    ]
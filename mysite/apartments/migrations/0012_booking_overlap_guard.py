@@ -0,0 +1,62 @@
+from django.db import migrations
+
+GUARD = 'apartments_booking_no_overlap'
+ACTIVE = "('pending', 'confirmed')"
+
+# SQLite не має exclusion-обмежень, тому перетин перевіряють тригери. Увага: якщо
+# майбутня міграція перебудовує таблицю бронювань на SQLite (AlterField тощо),
+# тригери зникають разом зі старою таблицею і їх треба створити знову.
+SQLITE_TRIGGER = f'''
+CREATE TRIGGER IF NOT EXISTS {GUARD}_{{event}}
+BEFORE {{clause}} ON apartments_booking
+WHEN NEW.status IN {ACTIVE}
+BEGIN
+    SELECT RAISE(ABORT, '{GUARD}')
+    WHERE EXISTS (
+        SELECT 1 FROM apartments_booking
+        WHERE apartment_id = NEW.apartment_id
+          AND status IN {ACTIVE}
+          AND start_date < NEW.end_date
+          AND end_date > NEW.start_date
+          {{exclude_self}}
+    );
+END
+'''
+SQLITE_EVENTS = {
+    'insert': ('INSERT', ''),
+    'update': ('UPDATE OF apartment_id, start_date, end_date, status', 'AND id != OLD.id'),
+}
+
+
+def create_guard(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for event, (clause, exclude_self) in SQLITE_EVENTS.items():
+            schema_editor.execute(SQLITE_TRIGGER.format(event=event, clause=clause, exclude_self=exclude_self))
+    elif vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        schema_editor.execute(
+            f'ALTER TABLE apartments_booking ADD CONSTRAINT {GUARD} EXCLUDE USING gist '
+            f'(apartment_id WITH =, daterange(start_date, end_date) WITH &&) '
+            f'WHERE (status IN {ACTIVE})'
+        )
+
+
+def drop_guard(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for event in SQLITE_EVENTS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {GUARD}_{event}')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'ALTER TABLE apartments_booking DROP CONSTRAINT IF EXISTS {GUARD}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0011_season'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_guard, drop_guard),
+    ]
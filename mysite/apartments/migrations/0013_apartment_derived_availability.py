@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:19
+
+from collections import defaultdict
+from datetime import date
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def derive_availability(apps, schema_editor):
+    # Ручні позначки замінюються станом, обчисленим з активних бронювань.
+    Apartment = apps.get_model('apartments', 'Apartment')
+    Booking = apps.get_model('apartments', 'Booking')
+    today = date.today()
+    nearest = (
+        Booking.objects.filter(status__in=('pending', 'confirmed'), end_date__gt=today)
+        .order_by()
+        .values_list('apartment_id')
+        .annotate(first=Min('start_date'))
+    )
+    groups = defaultdict(list)
+    for apartment_id, first in nearest:
+        groups[first].append(apartment_id)
+    Apartment.objects.update(is_available=True, next_booking_date=None)
+    for first, pks in groups.items():
+        for offset in range(0, len(pks), 500):
+            Apartment.objects.filter(pk__in=pks[offset:offset + 500]).update(
+                is_available=first > today, next_booking_date=first,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0012_booking_overlap_guard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apartment',
+            name='next_booking_date',
+            field=models.DateField(blank=True, editable=False, help_text='Початок найближчого активного бронювання, що ще не завершилось', null=True, verbose_name='Найближче бронювання'),
+        ),
+        migrations.AlterField(
+            model_name='apartment',
+            name='is_available',
+            field=models.BooleanField(default=True, editable=False, help_text='Обчислюється з активних бронювань, вручну не редагується', verbose_name='Вільна сьогодні'),
+        ),
+        migrations.AddIndex(
+            model_name='apartment',
+            index=models.Index(fields=['next_booking_date'], name='apartment_next_booking_idx'),
+        ),
+        migrations.RunPython(derive_availability, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,12 @@
+from datetime import date, timedelta
+
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
+from django.utils.functional import cached_property
+
+from .links import apartment_urls
 
 
 def validate_positive(value):
@@ -9,6 +14,28 @@ def validate_positive(value):
         raise ValidationError('Значення повинно бути більше 0')
 
 
+class ApartmentQuerySet(models.QuerySet):
+    def for_table(self):
+        return self.defer('description', 'image_variants')
+
+    def free_for(self, nights, today=None):
+        # Вільна сьогодні та ще щонайменше nights ночей поспіль: лише збережені стовпці,
+        # без підзапиту до бронювань.
+        today = today or date.today()
+        return self.filter(
+            models.Q(next_booking_date__isnull=True) | models.Q(next_booking_date__gte=today + timedelta(days=nights)),
+            is_available=True,
+        )
+
+
+class BookingQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related('apartment', 'user')
+
+    def for_user(self, user):
+        return self.filter(user=user).select_related('apartment')
+
+
 class Apartment(models.Model):
     TYPE_CHOICES = [
         ('ST', 'Studio'),
@@ -18,6 +45,14 @@ class Apartment(models.Model):
         ('PH', 'Penthouse'),
     ]
 
+    external_id = models.CharField(
+        max_length=100,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name='Зовнішній ID',
+        help_text='Ідентифікатор квартири у фіді партнера'
+    )
     title = models.CharField(
         max_length=200,
         verbose_name='Назва',
@@ -61,10 +96,25 @@ class Apartment(models.Model):
         blank=True,
         null=True
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Варіанти фото',
+        help_text='Мініатюри, WebP/AVIF та плейсхолдер, згенеровані з фото'
+    )
     is_available = models.BooleanField(
         default=True,
-        verbose_name='Доступна',
-        help_text='Чи вільна квартира для продажу'
+        editable=False,
+        verbose_name='Вільна сьогодні',
+        help_text='Обчислюється з активних бронювань, вручну не редагується'
+    )
+    next_booking_date = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Найближче бронювання',
+        help_text='Початок найближчого активного бронювання, що ще не завершилось'
     )
     created_at = models.DateTimeField(
         auto_now_add=True,
@@ -75,14 +125,29 @@ class Apartment(models.Model):
         verbose_name='Дата оновлення'
     )
 
+    objects = ApartmentQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Квартира'
         verbose_name_plural = 'Квартири'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='apartment_created_idx'),
+            models.Index(fields=['apartment_type', '-created_at', 'id'], name='apartment_type_created_idx'),
+            models.Index(fields=['is_available', '-created_at', 'id'], name='apartment_avail_created_idx'),
+            models.Index(fields=['next_booking_date'], name='apartment_next_booking_idx'),
+            models.Index(fields=['price'], name='apartment_price_idx'),
+            models.Index(fields=['square_meters'], name='apartment_area_idx'),
+            models.Index(fields=['floor'], name='apartment_floor_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.price}$"
 
+    @cached_property
+    def urls(self):
+        return apartment_urls(self.pk)
+
     def get_type_display_ua(self):
         type_dict = {
             'ST': 'Студія',
@@ -140,13 +205,179 @@ class Booking(models.Model):
         verbose_name='Примітки'
     )
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Бронювання'
         verbose_name_plural = 'Бронювання'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['apartment', 'start_date', 'end_date', 'status'],
+                name='booking_apartment_dates_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Бронювання {self.apartment.title} - {self.user.username}"
 
     def calculate_days(self):
         return (self.end_date - self.start_date).days
+
+    def clean(self):
+        # Перевірка на рівні моделі, щоб її отримували і форма бронювання, і адмінка.
+        if self.start_date and self.end_date and self.end_date <= self.start_date:
+            raise ValidationError('Дата закінчення повинна бути пізніше дати початку')
+        # Те саме правило, що й обмеження в БД: інакше зміна в адмінці завершилась би помилкою 500.
+        if self.apartment_id and self.start_date and self.end_date and self.status in ('pending', 'confirmed'):
+            overlapping = Booking.objects.filter(
+                apartment_id=self.apartment_id,
+                status__in=('pending', 'confirmed'),
+                start_date__lt=self.end_date,
+                end_date__gt=self.start_date,
+            ).exclude(pk=self.pk)
+            if overlapping.exists():
+                raise ValidationError('Квартира вже заброньована на обрані дати', code='booking_overlap')
+
+
+class Favorite(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='favorites',
+        verbose_name='Користувач'
+    )
+    apartment = models.ForeignKey(
+        Apartment,
+        on_delete=models.CASCADE,
+        related_name='favorited_by',
+        verbose_name='Квартира'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата додавання'
+    )
+
+    class Meta:
+        verbose_name = 'Улюблена квартира'
+        verbose_name_plural = 'Улюблені квартири'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'apartment'], name='favorite_user_apartment_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.apartment.title}"
+
+
+class ApartmentDailyStats(models.Model):
+    apartment = models.ForeignKey(
+        Apartment,
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        verbose_name='Квартира'
+    )
+    date = models.DateField(
+        verbose_name='Дата'
+    )
+    booked_nights = models.IntegerField(
+        default=0,
+        verbose_name='Заброньовані ночі'
+    )
+    cancelled_nights = models.IntegerField(
+        default=0,
+        verbose_name='Скасовані ночі'
+    )
+    revenue = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name='Дохід'
+    )
+
+    class Meta:
+        verbose_name = 'Денна статистика квартири'
+        verbose_name_plural = 'Денна статистика квартир'
+        constraints = [
+            models.UniqueConstraint(fields=['apartment', 'date'], name='apartment_daily_stats_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='apartment_daily_stats_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.apartment_id} - {self.date}"
+
+
+class TypeDailyStats(models.Model):
+    apartment_type = models.CharField(
+        max_length=2,
+        choices=Apartment.TYPE_CHOICES,
+        verbose_name='Тип квартири'
+    )
+    date = models.DateField(
+        verbose_name='Дата'
+    )
+    booked_nights = models.IntegerField(
+        default=0,
+        verbose_name='Заброньовані ночі'
+    )
+    cancelled_nights = models.IntegerField(
+        default=0,
+        verbose_name='Скасовані ночі'
+    )
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Дохід'
+    )
+
+    class Meta:
+        verbose_name = 'Денна статистика типу'
+        verbose_name_plural = 'Денна статистика типів'
+        constraints = [
+            models.UniqueConstraint(fields=['apartment_type', 'date'], name='type_daily_stats_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.apartment_type} - {self.date}"
+
+
+class Season(models.Model):
+    name = models.CharField(
+        max_length=100,
+        verbose_name='Назва'
+    )
+    apartment_type = models.CharField(
+        max_length=2,
+        choices=Apartment.TYPE_CHOICES,
+        blank=True,
+        verbose_name='Тип квартири',
+        help_text='Порожнє значення — сезон діє для всіх типів'
+    )
+    start_date = models.DateField(
+        verbose_name='Перша ніч'
+    )
+    end_date = models.DateField(
+        verbose_name='Остання ніч'
+    )
+    multiplier = models.DecimalField(
+        max_digits=4,
+        decimal_places=2,
+        validators=[MinValueValidator(0.1), MaxValueValidator(10)],
+        verbose_name='Коефіцієнт',
+        help_text='Множник базової ціни, наприклад 1.25 або 0.80'
+    )
+
+    class Meta:
+        verbose_name = 'Сезон'
+        verbose_name_plural = 'Сезони'
+        ordering = ['start_date']
+
+    def __str__(self):
+        return f"{self.name} ({self.start_date} - {self.end_date}) x{self.multiplier}"
+
+    def clean(self):
+        if self.start_date and self.end_date and self.end_date < self.start_date:
+            raise ValidationError('Остання ніч не може бути раніше першої')
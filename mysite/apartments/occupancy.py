@@ -0,0 +1,172 @@
+import base64
+import calendar
+from datetime import date, timedelta
+
+from django.core.cache import cache
+
+from .availability import active_bookings
+from .cache import initial_version
+from .pagination import MAX_PK
+
+OCCUPANCY_TIMEOUT = 60 * 60 * 24
+MAX_APARTMENTS = 500
+MAX_DAYS = 366
+
+
+def _version_key(apartment_id):
+    return f'apartments:occupancy_version:{apartment_id}'
+
+
+def _month_key(apartment_id, version, month):
+    return f'apartments:occupancy:{apartment_id}:{version}:{month:%Y-%m}'
+
+
+def _months(start, end):
+    month = start.replace(day=1)
+    while month < end:
+        yield month
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+def _month_length(month):
+    return calendar.monthrange(month.year, month.month)[1]
+
+
+def _versions(apartment_ids):
+    keys = [_version_key(apartment_id) for apartment_id in apartment_ids]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = cache.get_or_set(key, initial_version, None)
+    return versions
+
+
+def bump_occupancy_version(apartment_id):
+    try:
+        cache.incr(_version_key(apartment_id))
+    except ValueError:
+        cache.add(_version_key(apartment_id), initial_version(), None)
+
+
+def _mark(bits, base, length, start_date, end_date):
+    # Встановлює біти днів [start_date, end_date) у межах [base, base + length).
+    first = max((start_date - base).days, 0)
+    last = min((end_date - base).days, length)
+    if first < last:
+        bits |= ((1 << (last - first)) - 1) << first
+    return bits
+
+
+def _compute_month_bits(pairs):
+    apartment_ids = {apartment_id for apartment_id, month in pairs}
+    first_month = min(month for apartment_id, month in pairs)
+    last_month = max(month for apartment_id, month in pairs)
+    window_end = last_month + timedelta(days=_month_length(last_month))
+    months_by_apartment = {}
+    for apartment_id, month in pairs:
+        months_by_apartment.setdefault(apartment_id, []).append(month)
+
+    bits = dict.fromkeys(pairs, 0)
+    bookings = active_bookings().filter(
+        apartment_id__in=apartment_ids,
+        start_date__lt=window_end,
+        end_date__gt=first_month,
+    ).values_list('apartment_id', 'start_date', 'end_date')
+    for apartment_id, start_date, end_date in bookings:
+        for month in months_by_apartment[apartment_id]:
+            bits[apartment_id, month] = _mark(
+                bits[apartment_id, month], month, _month_length(month), start_date, end_date
+            )
+    return bits
+
+
+def occupancy_bits(apartment_ids, start, end):
+    # Повертає {apartment_id: int}, де біт i означає, що день start + i зайнятий.
+    months = list(_months(start, end))
+    versions = _versions(apartment_ids)
+    keys = {
+        (apartment_id, month): _month_key(apartment_id, versions[_version_key(apartment_id)], month)
+        for apartment_id in apartment_ids
+        for month in months
+    }
+    cached = cache.get_many(keys.values())
+    missing = [pair for pair, key in keys.items() if key not in cached]
+    if missing:
+        computed = _compute_month_bits(missing)
+        fresh = {keys[pair]: value for pair, value in computed.items()}
+        cache.set_many(fresh, OCCUPANCY_TIMEOUT)
+        cached.update(fresh)
+
+    length = (end - start).days
+    mask = (1 << length) - 1
+    result = {}
+    for apartment_id in apartment_ids:
+        window = 0
+        for month in months:
+            month_bits = cached[keys[apartment_id, month]]
+            offset = (month - start).days
+            window |= month_bits << offset if offset >= 0 else month_bits >> -offset
+        result[apartment_id] = window & mask
+    return result
+
+
+def encode_base64(bits, length):
+    return base64.b64encode(bits.to_bytes((length + 7) // 8, 'little')).decode()
+
+
+def encode_runs(bits, length):
+    runs = []
+    day = 0
+    while day < length:
+        if bits >> day & 1:
+            run_start = day
+            while day < length and bits >> day & 1:
+                day += 1
+            runs.append([run_start, day - run_start])
+        else:
+            day += 1
+    return runs
+
+
+ENCODERS = {
+    'base64': encode_base64,
+    'rle': encode_runs,
+}
+
+
+def parse_window(start, end):
+    start = date.fromisoformat(start)
+    end = date.fromisoformat(end)
+    if end <= start:
+        raise ValueError('end must be after start')
+    if (end - start).days > MAX_DAYS:
+        raise ValueError(f'window must not exceed {MAX_DAYS} days')
+    return start, end
+
+
+def parse_calendar_query(params):
+    encoding = params.get('encoding', 'base64')
+    if encoding not in ENCODERS:
+        raise ValueError('Невідоме кодування')
+    try:
+        start, end = parse_window(params.get('start', ''), params.get('end', ''))
+        apartment_ids = sorted({int(value) for value in params.get('ids', '').split(',') if value})
+        if any(not 0 < pk <= MAX_PK for pk in apartment_ids):
+            raise ValueError('id поза межами')
+    except ValueError:
+        raise ValueError('Некоректні параметри запиту')
+    if not apartment_ids or len(apartment_ids) > MAX_APARTMENTS:
+        raise ValueError(f'Вкажіть від 1 до {MAX_APARTMENTS} квартир')
+    return apartment_ids, start, end, encoding
+
+
+def calendar_payload(bits, start, end, encoding):
+    days = (end - start).days
+    encode = ENCODERS[encoding]
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'days': days,
+        'encoding': encoding,
+        'apartments': {str(pk): encode(value, days) for pk, value in bits.items()},
+    }
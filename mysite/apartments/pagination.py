@@ -0,0 +1,98 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+PAGE_SIZE = 20
+CURSOR_PARAM = 'cursor'
+MAX_PK = 2 ** 63 - 1
+
+
+def encode_cursor(apartment):
+    raw = f'{apartment.created_at.isoformat()}|{apartment.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (ValueError, UnicodeError, binascii.Error):
+        return None
+    # Курсор приходить від клієнта: поза межами BIGINT чи без часового поясу
+    # він дав би помилку БД, тож такий курсор означає першу сторінку.
+    if created_at is None or created_at.tzinfo is None or not 0 < pk <= MAX_PK:
+        return None
+    return created_at, pk
+
+
+def keyset_queryset(queryset, cursor=None):
+    # Сортування (-created_at, id) збігається з композитними індексами Apartment,
+    # тому кожна сторінка - це пошук по індексу, а не OFFSET.
+    queryset = queryset.order_by('-created_at', 'id')
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__gt=pk)
+        )
+    return queryset
+
+
+def _split_keyset_page(items, page_size):
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1])
+    return items, next_cursor
+
+
+def keyset_page(queryset, cursor=None, page_size=PAGE_SIZE):
+    items = list(keyset_queryset(queryset, cursor)[:page_size + 1])
+    return _split_keyset_page(items, page_size)
+
+
+async def akeyset_page(queryset, cursor=None, page_size=PAGE_SIZE):
+    items = [item async for item in keyset_queryset(queryset, cursor)[:page_size + 1]]
+    return _split_keyset_page(items, page_size)
+
+
+def _offset(cursor):
+    # Для результатів пошуку порядок задає релевантність, тому курсор - це
+    # зсув у списку ранжованих id, уже відфільтрованих рештою умов.
+    try:
+        return max(int(cursor or 0), 0)
+    except ValueError:
+        return 0
+
+
+def _ranked_slice(ranked_ids, allowed, offset, page_size):
+    ordered = [pk for pk in ranked_ids if pk in allowed]
+    page_ids = ordered[offset:offset + page_size]
+    next_cursor = str(offset + page_size) if len(ordered) > offset + page_size else None
+    return page_ids, next_cursor
+
+
+def ranked_page(queryset, ranked_ids, cursor=None, page_size=PAGE_SIZE):
+    allowed = set(queryset.filter(pk__in=ranked_ids).values_list('pk', flat=True))
+    page_ids, next_cursor = _ranked_slice(ranked_ids, allowed, _offset(cursor), page_size)
+    objects = queryset.in_bulk(page_ids)
+    return [objects[pk] for pk in page_ids if pk in objects], next_cursor
+
+
+async def aranked_page(queryset, ranked_ids, cursor=None, page_size=PAGE_SIZE):
+    allowed = {pk async for pk in queryset.filter(pk__in=ranked_ids).values_list('pk', flat=True)}
+    page_ids, next_cursor = _ranked_slice(ranked_ids, allowed, _offset(cursor), page_size)
+    objects = await queryset.ain_bulk(page_ids)
+    return [objects[pk] for pk in page_ids if pk in objects], next_cursor
+
+
+def next_page_query(request, next_cursor):
+    if not next_cursor:
+        return ''
+    params = request.GET.copy()
+    params[CURSOR_PARAM] = next_cursor
+    return params.urlencode()
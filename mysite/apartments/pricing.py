@@ -0,0 +1,130 @@
+from collections import namedtuple
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import accumulate
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import initial_version
+from .models import Season
+from .pagination import MAX_PK
+
+PRICING_VERSION_KEY = 'apartments:pricing_version'
+PRICING_TIMEOUT = 60 * 60 * 24
+MAX_NIGHTS = 366
+CENT = Decimal('0.01')
+
+Quote = namedtuple('Quote', 'nights subtotal discount_percent discount total nightly')
+
+
+def pricing_version():
+    return cache.get_or_set(PRICING_VERSION_KEY, initial_version, None)
+
+
+def bump_pricing_version():
+    try:
+        cache.incr(PRICING_VERSION_KEY)
+    except ValueError:
+        cache.add(PRICING_VERSION_KEY, initial_version(), None)
+
+
+def _seasons(version):
+    return cache.get_or_set(
+        f'apartments:seasons:{version}',
+        lambda: list(Season.objects.values_list('apartment_type', 'start_date', 'end_date', 'multiplier')),
+        PRICING_TIMEOUT,
+    )
+
+
+def compile_prices(apartment, start, days, seasons):
+    # Ціни ночей у центах. Якщо сезони перетинаються, діє найбільший коефіцієнт.
+    seasons = [
+        (first, last, multiplier) for apartment_type, first, last, multiplier in seasons
+        if not apartment_type or apartment_type == apartment.apartment_type
+    ]
+    base = Decimal(apartment.price) * 100
+    prices = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        multiplier = max((value for first, last, value in seasons if first <= day <= last), default=Decimal(1))
+        if day.weekday() in settings.PRICING_WEEKEND_DAYS:
+            multiplier *= settings.PRICING_WEEKEND_MULTIPLIER
+        prices.append(int((base * multiplier).quantize(Decimal(1), rounding=ROUND_HALF_UP)))
+    return prices
+
+
+def price_calendar(apartment):
+    # Префіксні суми цін на PRICING_HORIZON_DAYS ночей від сьогодні: вартість будь-якого
+    # проживання всередині горизонту — різниця двох елементів, без обходу правил.
+    origin = date.today()
+    version = pricing_version()
+    key = f'apartments:prices:{apartment.pk}:{apartment.updated_at.timestamp()}:{version}:{origin}'
+
+    def build():
+        prices = compile_prices(apartment, origin, settings.PRICING_HORIZON_DAYS, _seasons(version))
+        return origin, list(accumulate(prices, initial=0))
+
+    return cache.get_or_set(key, build, PRICING_TIMEOUT)
+
+
+def _prefix(apartment, start, nights):
+    origin, prefix = price_calendar(apartment)
+    first = (start - origin).days
+    if first >= 0 and first + nights < len(prefix):
+        return prefix, first
+    # Минулі дати (адмінка) чи далекі бронювання компілюються лише для потрібного вікна.
+    prices = compile_prices(apartment, start, nights, _seasons(pricing_version()))
+    return list(accumulate(prices, initial=0)), 0
+
+
+def long_stay_discount(nights):
+    return max((percent for minimum, percent in settings.PRICING_LONG_STAY_DISCOUNTS if nights >= minimum), default=0)
+
+
+def quote(apartment, start, end, breakdown=False):
+    nights = (end - start).days
+    if nights < 1:
+        raise ValueError('Мінімальний термін бронювання - 1 день')
+    prefix, first = _prefix(apartment, start, nights)
+    subtotal = Decimal(prefix[first + nights] - prefix[first]).scaleb(-2)
+    percent = long_stay_discount(nights)
+    discount = (subtotal * percent / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+    nightly = None
+    if breakdown:
+        nightly = [
+            Decimal(prefix[index + 1] - prefix[index]).scaleb(-2) for index in range(first, first + nights)
+        ]
+    return Quote(nights, subtotal, percent, discount, subtotal - discount, nightly)
+
+
+def parse_quote_query(params):
+    try:
+        apartment_id = int(params.get('apartment') or '')
+        if not 0 < apartment_id <= MAX_PK:
+            raise ValueError('id поза межами')
+        start = date.fromisoformat(params.get('start') or '')
+        end = date.fromisoformat(params.get('end') or '')
+    except ValueError:
+        raise ValueError('Некоректні параметри запиту')
+    if end <= start:
+        raise ValueError('Дата закінчення повинна бути пізніше дати початку')
+    if (end - start).days > MAX_NIGHTS:
+        raise ValueError(f'Термін бронювання не може перевищувати {MAX_NIGHTS} ночей')
+    return apartment_id, start, end
+
+
+def quote_payload(apartment, start, end, result):
+    payload = {
+        'apartment': apartment.pk,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'nights': result.nights,
+        'subtotal': str(result.subtotal),
+        'discount_percent': result.discount_percent,
+        'discount': str(result.discount),
+        'total': str(result.total),
+    }
+    if result.nightly is not None:
+        payload['nightly'] = [str(price) for price in result.nightly]
+    return payload
@@ -0,0 +1,171 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Apartment
+
+SEARCH_LIMIT = 1000
+FTS_TABLE = 'apartments_apartment_fts'
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+CYRILLIC_RE = re.compile('[а-яіїєґ]')
+
+# Легкий суфіксний стемер: відкидає найдовше відоме закінчення, залишаючи
+# основу щонайменше з трьох літер. Однаково застосовується до тексту в індексі
+# та до запиту, тому "квартира", "квартири" й "квартирою" дають одну основу.
+UK_SUFFIXES = sorted([
+    'ами', 'ями', 'ові', 'еві', 'ого', 'ому', 'ими', 'іми', 'ська', 'ський', 'ське', 'ські',
+    'ою', 'ею', 'єю', 'ій', 'ий', 'ої', 'ім', 'ам', 'ям', 'ах', 'ях', 'ів', 'их', 'ая', 'ую',
+    'юю', 'не', 'на', 'ні', 'ну', 'ня', 'а', 'я', 'о', 'е', 'є', 'и', 'і', 'у', 'ю', 'ь', 'ї', 'й',
+], key=len, reverse=True)
+EN_SUFFIXES = sorted([
+    'ations', 'ation', 'ments', 'ment', 'ness', 'ings', 'ing', 'ies', 'ied', 'ed', 'es', 'ly', 's',
+], key=len, reverse=True)
+MIN_STEM = 3
+
+
+def stem(word):
+    word = word.lower()
+    suffixes = UK_SUFFIXES if CYRILLIC_RE.search(word) else EN_SUFFIXES
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text):
+    return [stem(word) for word in WORD_RE.findall(text or '')]
+
+
+def normalize(text):
+    return ' '.join(tokenize(text))
+
+
+class BaseSearchBackend:
+    def index(self, apartment):
+        raise NotImplementedError
+
+    def remove(self, apartment_id):
+        raise NotImplementedError
+
+    def index_many(self, apartments):
+        for apartment in apartments:
+            self.index(apartment)
+
+    def search(self, query, limit=SEARCH_LIMIT, queryset=None):
+        raise NotImplementedError
+
+    def rebuild(self, queryset=None):
+        if queryset is None:
+            queryset = Apartment.objects.all()
+        batch = []
+        for apartment in queryset.only('pk', 'title', 'description', 'address').iterator(chunk_size=2000):
+            batch.append(apartment)
+            if len(batch) == 2000:
+                self.index_many(batch)
+                batch = []
+        self.index_many(batch)
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    # Запасний бекенд без окремого індексу: LIKE по полях, без ранжування.
+    def index(self, apartment):
+        pass
+
+    def remove(self, apartment_id):
+        pass
+
+    def search(self, query, limit=SEARCH_LIMIT, queryset=None):
+        if queryset is None:
+            queryset = Apartment.objects.all()
+        for word in WORD_RE.findall(query):
+            term = stem(word)
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(description__icontains=term) | Q(address__icontains=term)
+            )
+        return list(queryset.order_by().values_list('pk', flat=True)[:limit])
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    # Вагові коефіцієнти BM25 для стовпців (title, description, address).
+    WEIGHTS = (10.0, 1.0, 3.0)
+
+    def index(self, apartment):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [apartment.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, description, address) VALUES (%s, %s, %s, %s)',
+                [apartment.pk, normalize(apartment.title), normalize(apartment.description),
+                 normalize(apartment.address)],
+            )
+
+    def remove(self, apartment_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [apartment_id])
+
+    def index_many(self, apartments):
+        rows = [
+            (apartment.pk, normalize(apartment.title), normalize(apartment.description),
+             normalize(apartment.address))
+            for apartment in apartments
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, description, address) VALUES (%s, %s, %s, %s)',
+                rows,
+            )
+
+    def rebuild(self, queryset=None):
+        if queryset is None:
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        super().rebuild(queryset)
+
+    def search(self, query, limit=SEARCH_LIMIT, queryset=None):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in self.WEIGHTS)
+        # Фільтри каталогу застосовуються всередині запиту до індексу, тож ліміт
+        # обрізає вже відфільтровані збіги, а не загальний топ.
+        restrict, params = '', []
+        if queryset is not None:
+            sql, params = queryset.order_by().values('pk').query.sql_with_params()
+            restrict = f'AND rowid IN ({sql}) '
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s {restrict}'
+                f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s',
+                [match, *params, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+_backend = None
+
+
+def fts_available():
+    # Міграція 0008 не створює таблицю, якщо SQLite зібрано без FTS5.
+    return connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'SEARCH_BACKEND', None)
+        if path is None:
+            path = (
+                'apartments.search.SQLiteFTSBackend' if fts_available()
+                else 'apartments.search.DatabaseSearchBackend'
+            )
+        _backend = import_string(path)()
+    return _backend
+
+
+def search_apartments(query, limit=SEARCH_LIMIT, queryset=None):
+    return get_backend().search(query, limit, queryset)
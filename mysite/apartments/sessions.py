@@ -0,0 +1,42 @@
+import threading
+
+from django.contrib.sessions.backends.db import SessionStore as DBSessionStore
+
+
+class SessionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.accessed = 0
+            self.loads = 0
+
+    def record_request(self, accessed):
+        with self._lock:
+            self.requests += 1
+            if accessed:
+                self.accessed += 1
+
+    def record_load(self):
+        with self._lock:
+            self.loads += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'session_accessed': self.accessed,
+                'session_store_loads': self.loads,
+            }
+
+
+session_stats = SessionStats()
+
+
+class SessionStore(DBSessionStore):
+    def load(self):
+        session_stats.record_load()
+        return super().load()
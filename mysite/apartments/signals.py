@@ -0,0 +1,69 @@
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .analytics import apply_booking_change, booking_state, stored_booking_state
+from .availability import refresh_availability
+from .cache import forget_cached_apartment, invalidate_apartment
+from .favorites import invalidate_favorites, merge_session_favorites
+from .models import Apartment, Booking, Favorite, Season
+from .occupancy import bump_occupancy_version
+from .pricing import bump_pricing_version
+from .search import get_backend as get_search_backend
+from .stats import invalidate_stats
+
+
+@receiver(post_save, sender=Apartment)
+def apartment_saved(sender, instance, **kwargs):
+    invalidate_stats()
+    invalidate_apartment(instance.pk)
+    get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Apartment)
+def apartment_deleted(sender, instance, **kwargs):
+    invalidate_stats()
+    invalidate_apartment(instance.pk, instance.updated_at)
+    get_search_backend().remove(instance.pk)
+
+
+@receiver(pre_save, sender=Booking)
+@receiver(pre_delete, sender=Booking)
+def remember_booking_state(sender, instance, **kwargs):
+    previous = getattr(instance, '_analytics_state', None)
+    instance._analytics_state = stored_booking_state(instance.pk, previous) if instance.pk else None
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def booking_changed(sender, instance, signal, **kwargs):
+    # Єдиний обробник, тож порядок явний: попередній стан потрібен і аналітиці,
+    # і перерахунку доступності, а знімок оновлюється лише наприкінці.
+    previous = getattr(instance, '_analytics_state', None)
+    current = booking_state(instance) if signal is post_save else None
+    apply_booking_change(previous, current)
+    # Бронювання не змінює полів квартири, окрім похідної доступності: якщо вона
+    # змінилась, refresh_availability сам скидає кеш каталогу для цих квартир.
+    forget_cached_apartment(instance.apartment_id)
+    bump_occupancy_version(instance.apartment_id)
+    # Якщо бронювання перенесли на іншу квартиру, оновлюємо обидві.
+    refresh_availability({instance.apartment_id, previous.apartment_id if previous else instance.apartment_id})
+    instance._analytics_state = current
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def favorite_changed(sender, instance, **kwargs):
+    invalidate_favorites(instance.user_id)
+
+
+@receiver(post_save, sender=Season)
+@receiver(post_delete, sender=Season)
+def season_changed(sender, **kwargs):
+    bump_pricing_version()
+
+
+@receiver(user_logged_in)
+def merge_favorites_on_login(sender, request, user, **kwargs):
+    if request is not None:
+        merge_session_favorites(request, user)
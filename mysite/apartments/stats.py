@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.db.models import Count, Max, Min, Q
+
+from service.routers import refill
+
+from .cache import CATALOG_SCOPE
+from .models import Apartment
+
+CATALOG_STATS_KEY = 'apartments:catalog_stats'
+TYPE_STATS_KEY = 'apartments:type_stats'
+STATS_TIMEOUT = 60 * 10
+
+
+def _median_price(queryset, count):
+    if not count:
+        return None
+    prices = list(
+        queryset.order_by('price').values_list('price', flat=True)[(count - 1) // 2:count // 2 + 1]
+    )
+    return sum(prices) / len(prices)
+
+
+def _catalog_aggregates():
+    return {
+        'total': Count('id'),
+        'available': Count('id', filter=Q(is_available=True)),
+        'min_price': Min('price'),
+        'max_price': Max('price'),
+    }
+
+
+def compute_catalog_stats():
+    return Apartment.objects.aggregate(**_catalog_aggregates())
+
+
+def compute_type_stats():
+    rows = (
+        Apartment.objects.order_by()
+        .values('apartment_type')
+        .annotate(
+            total=Count('id'),
+            available=Count('id', filter=Q(is_available=True)),
+            min_price=Min('price'),
+            max_price=Max('price'),
+        )
+    )
+    labels = dict(Apartment.TYPE_CHOICES)
+    stats = []
+    for row in rows:
+        apartment_type = row['apartment_type']
+        row['label'] = labels.get(apartment_type, apartment_type)
+        row['median_price'] = _median_price(
+            Apartment.objects.filter(apartment_type=apartment_type), row['total']
+        )
+        stats.append(row)
+    return sorted(stats, key=lambda row: row['apartment_type'])
+
+
+def _cached(key, compute):
+    stats = cache.get(key)
+    if stats is None:
+        with refill(CATALOG_SCOPE, STATS_TIMEOUT) as timeout:
+            stats = compute()
+        cache.set(key, stats, timeout)
+    return stats
+
+
+def catalog_stats():
+    return _cached(CATALOG_STATS_KEY, compute_catalog_stats)
+
+
+async def acatalog_stats():
+    stats = await cache.aget(CATALOG_STATS_KEY)
+    if stats is None:
+        with refill(CATALOG_SCOPE, STATS_TIMEOUT) as timeout:
+            stats = await Apartment.objects.aaggregate(**_catalog_aggregates())
+        await cache.aset(CATALOG_STATS_KEY, stats, timeout)
+    return stats
+
+
+def type_stats():
+    return _cached(TYPE_STATS_KEY, compute_type_stats)
+
+
+def invalidate_stats():
+    cache.delete_many([CATALOG_STATS_KEY, TYPE_STATS_KEY])
@@ -0,0 +1,13 @@
+from service.queue import task
+
+from .images import process_apartment_image
+
+
+@task(max_attempts=3)
+def generate_image_variants(apartment_id):
+    process_apartment_image(apartment_id)
+
+
+def schedule_image_variants(apartment):
+    if apartment.image:
+        generate_image_variants.delay(apartment.pk)
@@ -0,0 +1,54 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+SOURCE_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+}
+
+
+def _srcset(variants):
+    return ', '.join(f'{default_storage.url(variant["name"])} {variant["width"]}w' for variant in variants)
+
+
+@register.simple_tag
+def apartment_picture(apartment, sizes='100vw', css_class='', style=''):
+    if not apartment.image:
+        return ''
+    manifest = apartment.image_variants or {}
+    variants = manifest.get('variants')
+    if not variants:
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" style="{}" loading="lazy">',
+            apartment.image.url, css_class, apartment.title, style,
+        )
+
+    by_format = {}
+    for variant in variants:
+        by_format.setdefault(variant['format'], []).append(variant)
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (mime_type, _srcset(by_format[extension]), sizes)
+            for extension, mime_type in SOURCE_TYPES.items()
+            if extension in by_format
+        ),
+    )
+    fallback = by_format.get('jpg') or variants
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" class="{}" alt="{}" '
+        'style="{}background-image: url({}); background-size: cover;" loading="lazy" decoding="async"></picture>',
+        sources,
+        default_storage.url(fallback[0]['name']),
+        _srcset(fallback),
+        sizes,
+        manifest['width'],
+        manifest['height'],
+        css_class,
+        apartment.title,
+        style,
+        manifest['placeholder'],
+    )
@@ -0,0 +1,1176 @@
+import base64
+import csv
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.http import Http404
+from django.template import Context, Template
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+from home.views import HOME_PAGE_SIZE
+
+from . import async_views, search
+from .analytics import reconcile
+from .availability import BookingConflict, create_booking, refresh_availability
+from .bulk import IMPORT_FIELDS, upsert_batch
+from .cache import CATALOG_VERSION_KEY, apartment_key, catalog_version, get_apartment_or_404
+from .favorites import FAVORITE_APARTMENTS_KEY, favorites_cache_key
+from .forms import ApartmentForm
+from .images import VARIANT_FORMATS, process_apartment_image
+from .models import Apartment, Booking, Favorite, Season, TypeDailyStats
+from .pagination import PAGE_SIZE, decode_cursor, keyset_page
+from .occupancy import encode_base64, encode_runs, occupancy_bits
+from .pricing import MAX_NIGHTS, PRICING_VERSION_KEY, compile_prices, long_stay_discount, parse_quote_query, quote
+from .search import DatabaseSearchBackend, SQLiteFTSBackend, search_apartments
+from .search import get_backend as get_search_backend
+from .sessions import SessionStore, session_stats
+from .stats import acatalog_stats, catalog_stats, type_stats
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMixin:
+    @contextmanager
+    def assertMaxQueries(self, budget):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(
+                f'{number}. {query["sql"]}' for number, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f'Виконано {executed} запитів, бюджет {budget}:\n{queries}')
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    APARTMENTS = 30
+    BOOKINGS = 25
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('guest', password='guest-password')
+        cls.staff = User.objects.create_user('staff', password='staff-password', is_staff=True, is_superuser=True)
+        types = [code for code, label in Apartment.TYPE_CHOICES]
+        cls.apartments = Apartment.objects.bulk_create([
+            Apartment(
+                title=f'Квартира {number}',
+                description='Світла квартира з ремонтом та меблями',
+                apartment_type=types[number % len(types)],
+                price=500 + number,
+                square_meters=40,
+                floor=1 + number % 10,
+                address=f'вулиця Шевченка, {number}',
+            )
+            for number in range(cls.APARTMENTS)
+        ])
+        start = date.today() + timedelta(days=30)
+        Booking.objects.bulk_create([
+            Booking(
+                apartment=cls.apartments[number],
+                user=cls.user,
+                start_date=start,
+                end_date=start + timedelta(days=3),
+                total_price=1500,
+            )
+            for number in range(cls.BOOKINGS)
+        ])
+        Favorite.objects.bulk_create([
+            Favorite(user=cls.user, apartment=apartment) for apartment in cls.apartments[:10]
+        ])
+        cls.booking = Booking.objects.filter(user=cls.user).first()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_apartment_list(self):
+        # max(updated_at) для Last-Modified + сторінка + статистика
+        # + статистика за типами (з медіаною для кожного типу)
+        with self.assertMaxQueries(4 + len(Apartment.TYPE_CHOICES)):
+            self.client.get('/apartments/list/')
+        with self.assertMaxQueries(0):
+            self.client.get('/apartments/list/')
+
+    def test_home(self):
+        with self.assertMaxQueries(2):
+            self.client.get('/')
+
+    def test_apartment_detail(self):
+        with self.assertMaxQueries(1):
+            self.client.get(f'/apartments/{self.apartments[0].pk}/')
+
+    def test_favorites_list(self):
+        self.client.force_login(self.user)
+        with self.assertMaxQueries(4):
+            response = self.client.get('/apartments/favorites/')
+        self.assertEqual(len(response.context['apartments']), 10)
+
+    def test_booking_list(self):
+        self.client.force_login(self.user)
+        with self.assertMaxQueries(4):
+            response = self.client.get('/apartments/bookings/')
+        self.assertEqual(len(response.context['bookings']), self.BOOKINGS)
+
+    def test_booking_detail(self):
+        self.client.force_login(self.user)
+        with self.assertMaxQueries(4):
+            self.client.get(f'/apartments/bookings/{self.booking.pk}/')
+
+    def test_profile(self):
+        self.client.force_login(self.user)
+        with self.assertMaxQueries(4):
+            self.client.get('/accounts/profile/')
+
+    def test_booking_admin_changelist(self):
+        self.client.force_login(self.staff)
+        with self.assertMaxQueries(8):
+            response = self.client.get('/admin/apartments/booking/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_booking_export(self):
+        self.client.force_login(self.staff)
+        with self.assertMaxQueries(3):
+            response = self.client.get('/apartments/bookings/export/', {'status__exact': 'pending'})
+            content = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(content.splitlines()), self.BOOKINGS + 1)
+
+    def test_analytics_dashboard(self):
+        # сесія + користувач + обране в меню + підсумок, типи, дні та топ квартир лише зі зведень
+        self.client.force_login(self.staff)
+        with self.assertMaxQueries(7):
+            response = self.client.get('/apartments/analytics/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_apartment_detail_not_modified(self):
+        url = f'/apartments/{self.apartments[0].pk}/'
+        etag = self.client.get(url)['ETag']
+        with self.assertMaxQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_apartment_list_not_modified(self):
+        etag = self.client.get('/apartments/list/')['ETag']
+        with self.assertMaxQueries(0):
+            response = self.client.get('/apartments/list/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class DerivedAvailabilityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('guest', password='guest-password')
+        self.apartment = Apartment.objects.create(
+            title='Квартира', description='Опис квартири для тесту', apartment_type='ST',
+            price=500, square_meters=30, floor=1, address='вулиця Шевченка, 1',
+        )
+
+    def book(self, start_offset, nights):
+        start = date.today() + timedelta(days=start_offset)
+        return Booking.objects.create(
+            apartment=self.apartment, user=self.user, start_date=start,
+            end_date=start + timedelta(days=nights), total_price=500 * nights,
+        )
+
+    def test_booking_changes_refresh_availability(self):
+        upcoming = self.book(5, 3)
+        self.apartment.refresh_from_db()
+        self.assertTrue(self.apartment.is_available)
+        self.assertEqual(self.apartment.next_booking_date, upcoming.start_date)
+        self.assertFalse(Apartment.objects.free_for(7).exists())
+
+        updated_at = self.apartment.updated_at
+        current = self.book(0, 2)
+        self.apartment.refresh_from_db()
+        self.assertFalse(self.apartment.is_available)
+        self.assertGreater(self.apartment.updated_at, updated_at)
+
+        current.status = 'cancelled'
+        current.save()
+        self.apartment.refresh_from_db()
+        self.assertTrue(self.apartment.is_available)
+        self.assertTrue(Apartment.objects.free_for(5).exists())
+
+    def test_booking_keeps_catalog_cache_unless_availability_changes(self):
+        self.book(5, 3)
+        version = catalog_version()
+        get_apartment_or_404(self.apartment.pk)
+        later = self.book(20, 3)
+        self.assertEqual(catalog_version(), version)
+        self.assertIsNone(cache.get(apartment_key(self.apartment.pk)))
+        later.status = 'cancelled'
+        later.save()
+        self.assertEqual(catalog_version(), version)
+        self.book(1, 2)
+        self.assertGreater(catalog_version(), version)
+
+    def test_sweep_follows_the_calendar(self):
+        booking = self.book(2, 3)
+        self.assertEqual(refresh_availability(today=booking.start_date, stale_only=True), [self.apartment.pk])
+        self.assertFalse(Apartment.objects.get().is_available)
+        self.assertEqual(refresh_availability(today=booking.end_date, stale_only=True), [self.apartment.pk])
+        apartment = Apartment.objects.get()
+        self.assertTrue(apartment.is_available)
+        self.assertIsNone(apartment.next_booking_date)
+
+
+class BookingSchedulerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('guest', password='guest-password')
+        self.apartments = [
+            Apartment.objects.create(
+                title=f'Квартира {number}', description='Опис квартири для тесту', apartment_type='ST',
+                price=500, square_meters=30, floor=1, address=f'вулиця Шевченка, {number}',
+            )
+            for number in range(3)
+        ]
+
+    def book(self, apartment, start_offset, nights, status):
+        start = date.today() + timedelta(days=start_offset)
+        return Booking.objects.create(
+            apartment=apartment, user=self.user, start_date=start, status=status,
+            end_date=start + timedelta(days=nights), total_price=500 * nights,
+        )
+
+    def test_once_moves_due_bookings(self):
+        stale = self.book(self.apartments[0], -1, 3, 'pending')
+        Booking.objects.filter(pk=stale.pk).update(created_at=timezone.now() - timedelta(days=2))
+        fresh = self.book(self.apartments[1], 5, 2, 'pending')
+        finished = self.book(self.apartments[2], -5, 3, 'confirmed')
+        ongoing = self.book(self.apartments[2], 0, 2, 'confirmed')
+
+        call_command('run_booking_scheduler', once=True, stdout=StringIO())
+
+        statuses = dict(Booking.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[stale.pk], 'cancelled')
+        self.assertEqual(statuses[fresh.pk], 'pending')
+        self.assertEqual(statuses[finished.pk], 'completed')
+        self.assertEqual(statuses[ongoing.pk], 'confirmed')
+        self.assertTrue(Apartment.objects.get(pk=self.apartments[0].pk).is_available)
+        # Пакетні зміни зведень збігаються з повним перерахунком.
+        self.assertEqual(reconcile(date.today() - timedelta(days=10), date.today() + timedelta(days=10)), (0, 0))
+
+
+class GenerateDataTests(TestCase):
+    def test_repeated_runs_do_not_overlap(self):
+        options = {'apartments': 5, 'bookings': 60, 'users': 3, 'stdout': StringIO()}
+        call_command('generate_data', **options)
+        call_command('generate_data', **options)
+        self.assertEqual(Apartment.objects.filter(external_id__startswith='bench-').count(), 10)
+        self.assertEqual(Booking.objects.count(), 120)
+        previous = {}
+        for apartment_id, start, end in Booking.objects.order_by('apartment_id', 'start_date').values_list(
+            'apartment_id', 'start_date', 'end_date'
+        ):
+            self.assertGreaterEqual(start, previous.get(apartment_id, start))
+            previous[apartment_id] = end
+
+
+@override_settings(BOOKING_LOCK_RETRIES=12, BOOKING_LOCK_BACKOFF=0.01)
+class BookingContentionTests(TransactionTestCase):
+    ATTEMPTS = 300
+    WORKERS = 16
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('guest', password='guest-password')
+        self.apartment = Apartment.objects.create(
+            title='Квартира', description='Опис квартири для тесту', apartment_type='ST',
+            price=500, square_meters=30, floor=1, address='вулиця Шевченка, 1',
+        )
+
+    def attempt(self, number):
+        # Кожна третя спроба зсунута на день: перетин є, але не повний збіг дат.
+        start = date.today() + timedelta(days=30 + number % 3)
+        booking = Booking(
+            apartment_id=self.apartment.pk, user_id=self.user.pk,
+            start_date=start, end_date=start + timedelta(days=3), total_price=1500,
+        )
+        try:
+            create_booking(booking)
+            return True
+        except BookingConflict:
+            return False
+        finally:
+            connection.close()
+
+    def test_parallel_bookings_do_not_overlap(self):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            results = list(pool.map(self.attempt, range(self.ATTEMPTS)))
+        elapsed = time.perf_counter() - started
+        logger.info('%d спроб бронювання за %.2f с: %.0f/с', self.ATTEMPTS, elapsed, self.ATTEMPTS / elapsed)
+
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(Booking.objects.filter(apartment=self.apartment).count(), 1)
+
+
+class SessionLoadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.apartment = Apartment.objects.create(
+            title='Квартира', description='Опис квартири для тесту', apartment_type='ST',
+            price=500, square_meters=30, floor=1, address='вулиця Шевченка, 1',
+        )
+        session = self.client.session
+        session[FAVORITE_APARTMENTS_KEY] = [self.apartment.pk]
+        session.save()
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        session_stats.reset()
+
+    def test_auth_pages_do_not_load_session(self):
+        for url in ('/accounts/login/', '/accounts/register/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(session_stats.snapshot()['session_store_loads'], 0)
+
+    def test_badge_is_rendered_on_every_layout_page(self):
+        badge = '<span class="badge bg-danger rounded-pill">1</span>'
+        self.assertContains(self.client.get('/'), badge, html=True)
+        self.assertEqual(session_stats.snapshot()['session_store_loads'], 1)
+
+        user = User.objects.create_user('guest', password='guest-password')
+        Favorite.objects.create(user=user, apartment=self.apartment)
+        self.client.force_login(user)
+        # Ці view самі улюблених не читають: значок рахує контекст-процесор.
+        for url in ('/apartments/bookings/', '/accounts/profile/'):
+            self.assertContains(self.client.get(url), badge, html=True)
+
+
+class ApartmentImportExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def record(self, number, **overrides):
+        return dict({
+            'external_id': f'feed-{number}',
+            'title': f'Квартира {number}',
+            'description': 'Світла квартира з ремонтом та меблями',
+            'apartment_type': '1B',
+            'price': f'{1000 + number}.00',
+            'square_meters': '45.5',
+            'floor': '3',
+            'address': f'вулиця Шевченка, {number}',
+        }, **overrides)
+
+    def write_csv(self, name, records):
+        path = self.directory / name
+        with open(path, 'w', encoding='utf-8', newline='') as stream:
+            writer = csv.DictWriter(stream, fieldnames=IMPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+        return str(path)
+
+    def write_jsonl(self, name, records):
+        path = self.directory / name
+        path.write_text(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records), encoding='utf-8')
+        return str(path)
+
+    def run_import(self, path, **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_apartments', path, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_csv_and_jsonl_upsert_on_external_id(self):
+        self.run_import(self.write_csv('feed.csv', [self.record(1), self.record(2)]))
+        self.assertEqual(Apartment.objects.count(), 2)
+        original = Apartment.objects.get(external_id='feed-1')
+
+        output, _ = self.run_import(self.write_jsonl('feed.jsonl', [
+            self.record(1, title='Оновлена квартира', price='1500.00'), self.record(3),
+        ]))
+        self.assertIn('Створено: 1, оновлено: 1', output)
+        updated = Apartment.objects.get(external_id='feed-1')
+        self.assertEqual(updated.pk, original.pk)
+        self.assertEqual(updated.title, 'Оновлена квартира')
+        self.assertEqual(updated.price, Decimal('1500.00'))
+        self.assertEqual(Apartment.objects.count(), 3)
+
+    def test_export_round_trips_through_import(self):
+        self.run_import(self.write_csv('feed.csv', [self.record(number) for number in range(3)]))
+        for name in ('export.csv', 'export.jsonl'):
+            path = str(self.directory / name)
+            call_command('export_apartments', path, stdout=StringIO())
+            output, _ = self.run_import(path)
+            self.assertIn('Створено: 0, оновлено: 3, відхилено: 0', output)
+        self.assertEqual(Apartment.objects.count(), 3)
+
+    def test_resume_from_checkpoint_after_partial_run(self):
+        path = self.write_csv('feed.csv', [self.record(number) for number in range(5)])
+        calls = []
+
+        def failing_upsert(apartments, chunk_size):
+            calls.append(len(apartments))
+            if len(calls) == 2:
+                raise RuntimeError('обрив імпорту')
+            return upsert_batch(apartments, chunk_size)
+
+        with mock.patch('apartments.management.commands.import_apartments.upsert_batch', failing_upsert):
+            with self.assertRaises(RuntimeError):
+                self.run_import(path, chunk_size=2)
+        self.assertEqual(Apartment.objects.count(), 2)
+
+        output, _ = self.run_import(path, chunk_size=2)
+        self.assertIn('Продовження з запису 3', output)
+        self.assertEqual(Apartment.objects.count(), 5)
+        # Фінальний чекпоінт: повторний запуск нічого не імпортує, --restart — усе заново.
+        output, _ = self.run_import(path, chunk_size=2)
+        self.assertIn('Продовження з запису 6', output)
+        output, _ = self.run_import(path, chunk_size=2, restart=True)
+        self.assertNotIn('Продовження', output)
+        self.assertIn('Створено: 0, оновлено: 5', output)
+
+    def test_dry_run_does_not_write(self):
+        path = self.write_csv('feed.csv', [self.record(1), self.record(2)])
+        with CaptureQueriesContext(connection) as context:
+            self.run_import(path, dry_run=True)
+        self.assertFalse(Apartment.objects.exists())
+        self.assertFalse(any(query['sql'].startswith(('INSERT', 'UPDATE')) for query in context.captured_queries))
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_invalid_rows_are_rejected_with_form_rules(self):
+        path = self.write_csv('feed.csv', [
+            self.record(1),
+            self.record(2, title='Коро'),
+            self.record(3, description='Короткий опис'),
+            self.record(4, address='вул. 1'),
+            self.record(5, price='0'),
+            self.record(6, square_meters='5'),
+            self.record(7, floor='101'),
+            self.record(8, apartment_type='XX'),
+            self.record(9, external_id=''),
+        ])
+        output, errors = self.run_import(path)
+        self.assertEqual(list(Apartment.objects.values_list('external_id', flat=True)), ['feed-1'])
+        self.assertIn('Створено: 1, оновлено: 0, відхилено: 8', output)
+        self.assertIn('Назва повинна містити мінімум 5 символів', errors)
+        self.assertIn('Опис повинен містити мінімум 20 символів', errors)
+        self.assertIn('Адреса повинна містити мінімум 10 символів', errors)
+        self.assertIn('Ціна повинна бути більше 0', errors)
+        self.assertIn('Площа повинна бути мінімум 10 м²', errors)
+        self.assertIn('Поверх не може перевищувати 100', errors)
+        self.assertNotIn('Ensure this value', errors)
+
+    def test_large_chunks_stay_under_the_query_parameter_limit(self):
+        records = [self.record(number) for number in range(7)]
+        self.run_import(self.write_csv('first.csv', records[:3]))
+        # Ліміт у 2 параметри замість 999: ключі пакета шукаються частинами.
+        with mock.patch.object(connection.ops, 'bulk_batch_size', return_value=2):
+            with CaptureQueriesContext(connection) as context:
+                output, errors = self.run_import(self.write_csv('feed.csv', records), chunk_size=5000)
+        self.assertIn('Створено: 4, оновлено: 3, відхилено: 0', output)
+        self.assertEqual(Apartment.objects.count(), 7)
+        lookups = [query['sql'] for query in context.captured_queries if '"external_id" IN' in query['sql']]
+        self.assertTrue(lookups)
+        self.assertEqual(len(lookups), 8)
+        self.assertTrue(all(query.count("'feed-") <= 2 for query in lookups))
+
+
+@override_settings(
+    PRICING_WEEKEND_DAYS=(4, 5),
+    PRICING_WEEKEND_MULTIPLIER=Decimal('1.15'),
+    PRICING_LONG_STAY_DISCOUNTS=[(7, 5), (28, 15)],
+)
+class PricingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.apartment = Apartment.objects.create(
+            title='Квартира', description='Опис квартири для тесту', apartment_type='1B',
+            price=100, square_meters=30, floor=1, address='вулиця Шевченка, 1',
+        )
+        today = date.today()
+        # Понеділок щонайменше за тиждень: ночі пн-чт без вихідного коефіцієнта.
+        self.monday = today + timedelta(days=14 - today.weekday())
+
+    def day(self, offset):
+        return self.monday + timedelta(days=offset)
+
+    def test_season_starting_and_ending_mid_stay(self):
+        Season.objects.create(name='Літо', start_date=self.day(2), end_date=self.day(10), multiplier=Decimal('1.50'))
+        result = quote(self.apartment, self.day(0), self.day(4), breakdown=True)
+        self.assertEqual(result.nightly, [Decimal('100.00'), Decimal('100.00'), Decimal('150.00'), Decimal('150.00')])
+        self.assertEqual(result.total, Decimal('500.00'))
+
+        Season.objects.create(name='Зима', start_date=self.day(-10), end_date=self.day(1), multiplier=Decimal('0.80'))
+        result = quote(self.apartment, self.day(0), self.day(3), breakdown=True)
+        self.assertEqual(result.nightly, [Decimal('80.00'), Decimal('80.00'), Decimal('150.00')])
+
+    def test_season_for_other_type_is_ignored(self):
+        Season.objects.create(
+            name='Пентхауси', apartment_type='PH', start_date=self.day(0), end_date=self.day(3), multiplier=2,
+        )
+        self.assertEqual(quote(self.apartment, self.day(0), self.day(2)).total, Decimal('200.00'))
+
+    def test_weekend_nights(self):
+        result = quote(self.apartment, self.day(3), self.day(6), breakdown=True)
+        self.assertEqual(result.nightly, [Decimal('100.00'), Decimal('115.00'), Decimal('115.00')])
+        self.assertEqual(result.total, Decimal('330.00'))
+
+    def test_long_stay_discount_thresholds(self):
+        self.assertEqual([long_stay_discount(nights) for nights in (1, 6, 7, 27, 28, 60)], [0, 0, 5, 5, 15, 15])
+        result = quote(self.apartment, self.day(0), self.day(7))
+        self.assertEqual(result.subtotal, Decimal('730.00'))
+        self.assertEqual(result.discount_percent, 5)
+        self.assertEqual(result.discount, Decimal('36.50'))
+        self.assertEqual(result.total, Decimal('693.50'))
+
+    def test_stay_past_cached_horizon(self):
+        start, end = self.day(0), self.day(40)
+        with override_settings(PRICING_HORIZON_DAYS=400):
+            inside = quote(self.apartment, start, end)
+        cache.clear()
+        with override_settings(PRICING_HORIZON_DAYS=(start - date.today()).days + 10):
+            past = quote(self.apartment, start, end)
+        self.assertEqual(past, inside)
+        expected = Decimal(sum(compile_prices(self.apartment, start, 40, []))).scaleb(-2)
+        self.assertEqual(past.subtotal, expected)
+
+    def test_nights_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            quote(self.apartment, self.day(1), self.day(1))
+        with self.assertRaises(ValueError):
+            quote(self.apartment, self.day(1), self.day(0))
+
+    def test_parse_quote_query_limits_nights(self):
+        start = self.day(0)
+        params = {'apartment': str(self.apartment.pk), 'start': start.isoformat()}
+        end = start + timedelta(days=MAX_NIGHTS)
+        self.assertEqual(parse_quote_query(dict(params, end=end.isoformat())), (self.apartment.pk, start, end))
+        with self.assertRaisesMessage(ValueError, str(MAX_NIGHTS)):
+            parse_quote_query(dict(params, end=(end + timedelta(days=1)).isoformat()))
+        with self.assertRaises(ValueError):
+            parse_quote_query(dict(params, end='завтра'))
+        for apartment in ('99999999999999999999', '0', '-1', ''):
+            with self.assertRaises(ValueError):
+                parse_quote_query(dict(params, apartment=apartment, end=end.isoformat()))
+        with self.assertRaises(ValueError):
+            parse_quote_query({'start': start.isoformat(), 'end': end.isoformat()})
+        response = self.client.get('/apartments/api/quote/', {
+            'apartment': '99999999999999999999', 'start': start.isoformat(), 'end': end.isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/apartments/api/quote/', {'start': start.isoformat(), 'end': end.isoformat()})
+        self.assertEqual(response.status_code, 400)
+
+    def test_saving_a_season_invalidates_cached_prices(self):
+        self.assertEqual(quote(self.apartment, self.day(0), self.day(2)).total, Decimal('200.00'))
+        season = Season.objects.create(name='Свята', start_date=self.day(0), end_date=self.day(0), multiplier=2)
+        self.assertEqual(quote(self.apartment, self.day(0), self.day(2)).total, Decimal('300.00'))
+        season.multiplier = Decimal('1.50')
+        season.save()
+        self.assertEqual(quote(self.apartment, self.day(0), self.day(2)).total, Decimal('250.00'))
+        season.delete()
+        self.assertEqual(quote(self.apartment, self.day(0), self.day(2)).total, Decimal('200.00'))
+
+    def test_evicted_version_does_not_revive_old_prices(self):
+        self.assertEqual(quote(self.apartment, self.day(0), self.day(2)).total, Decimal('200.00'))
+        Season.objects.create(name='Свята', start_date=self.day(0), end_date=self.day(0), multiplier=2)
+        cache.delete(PRICING_VERSION_KEY)
+        self.assertEqual(quote(self.apartment, self.day(0), self.day(2)).total, Decimal('300.00'))
+
+    def test_booking_stores_the_quoted_total(self):
+        Season.objects.create(name='Літо', start_date=self.day(2), end_date=self.day(10), multiplier=Decimal('1.25'))
+        user = User.objects.create_user('guest', password='guest-password')
+        self.client.force_login(user)
+        start, end = self.day(0), self.day(9)
+        response = self.client.post(self.apartment.urls['book'], {
+            'start_date': start.isoformat(), 'end_date': end.isoformat(),
+        })
+        booking = Booking.objects.get()
+        self.assertRedirects(response, f'/apartments/bookings/{booking.pk}/', fetch_redirect_response=False)
+        self.assertEqual(booking.total_price, quote(self.apartment, start, end).total)
+
+
+class OccupancyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('guest', password='guest-password')
+        self.apartments = [
+            Apartment.objects.create(
+                title=f'Квартира {number}', description='Опис квартири для тесту', apartment_type='ST',
+                price=500, square_meters=30, floor=1, address=f'вулиця Шевченка, {number}',
+            )
+            for number in range(2)
+        ]
+
+    def book(self, apartment, start, end, status='confirmed'):
+        return Booking.objects.create(
+            apartment=apartment, user=self.user, start_date=start, end_date=end, status=status, total_price=1000,
+        )
+
+    def days(self, bits, length):
+        return [day for day in range(length) if bits >> day & 1]
+
+    def test_month_bitsets_across_boundaries(self):
+        first, second = self.apartments
+        self.book(first, date(2027, 1, 30), date(2027, 2, 2))
+        self.book(first, date(2027, 2, 27), date(2027, 3, 1))
+        self.book(second, date(2027, 1, 10), date(2027, 1, 12), status='cancelled')
+        start, end = date(2027, 1, 25), date(2027, 3, 5)
+        bits = occupancy_bits([first.pk, second.pk], start, end)
+        busy = [date(2027, 1, 30), date(2027, 1, 31), date(2027, 2, 1), date(2027, 2, 27), date(2027, 2, 28)]
+        self.assertEqual(self.days(bits[first.pk], 39), [(day - start).days for day in busy])
+        self.assertEqual(bits[second.pk], 0)
+        # Повторний запит читає лише кеш місяців.
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(occupancy_bits([first.pk, second.pk], start, end), bits)
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_leap_february(self):
+        apartment = self.apartments[0]
+        self.book(apartment, date(2028, 2, 28), date(2028, 3, 2))
+        start, end = date(2028, 2, 1), date(2028, 3, 1)
+        bits = occupancy_bits([apartment.pk], start, end)[apartment.pk]
+        self.assertEqual(self.days(bits, 29), [27, 28])
+        self.assertEqual(self.days(occupancy_bits([apartment.pk], date(2027, 2, 1), date(2027, 3, 1))[apartment.pk], 28), [])
+
+    def test_encoders_round_trip(self):
+        for length in (1, 7, 8, 28, 29, 31, 366):
+            for bits in (0, (1 << length) - 1, int('10' * length, 2) & ((1 << length) - 1), 1 << (length - 1)):
+                encoded = encode_base64(bits, length)
+                self.assertEqual(len(base64.b64decode(encoded)), (length + 7) // 8)
+                self.assertEqual(int.from_bytes(base64.b64decode(encoded), 'little'), bits)
+                decoded = 0
+                for run_start, run_length in encode_runs(bits, length):
+                    decoded |= ((1 << run_length) - 1) << run_start
+                self.assertEqual(decoded, bits)
+        self.assertEqual(encode_runs(0b0110_0111, 8), [[0, 3], [5, 2]])
+
+    def test_booking_save_invalidates_cached_months(self):
+        apartment = self.apartments[0]
+        start, end = date(2027, 5, 1), date(2027, 6, 1)
+        self.assertEqual(occupancy_bits([apartment.pk], start, end)[apartment.pk], 0)
+        booking = self.book(apartment, date(2027, 5, 10), date(2027, 5, 12))
+        self.assertEqual(self.days(occupancy_bits([apartment.pk], start, end)[apartment.pk], 31), [9, 10])
+        booking.status = 'cancelled'
+        booking.save()
+        self.assertEqual(occupancy_bits([apartment.pk], start, end)[apartment.pk], 0)
+
+    def test_evicted_version_does_not_revive_old_months(self):
+        apartment = self.apartments[0]
+        start, end = date(2027, 5, 1), date(2027, 6, 1)
+        occupancy_bits([apartment.pk], start, end)
+        self.book(apartment, date(2027, 5, 10), date(2027, 5, 12))
+        cache.delete(f'apartments:occupancy_version:{apartment.pk}')
+        self.assertEqual(self.days(occupancy_bits([apartment.pk], start, end)[apartment.pk], 31), [9, 10])
+
+    def test_calendar_endpoint(self):
+        apartment = self.apartments[0]
+        self.book(apartment, date(2027, 5, 10), date(2027, 5, 12))
+        response = self.client.get('/apartments/api/availability/', {
+            'ids': apartment.pk, 'start': '2027-05-01', 'end': '2027-05-15', 'encoding': 'rle',
+        })
+        self.assertEqual(response.json()['apartments'], {str(apartment.pk): [[9, 2]]})
+        response = self.client.get('/apartments/api/availability/', {'ids': apartment.pk, 'start': '2027-05-01', 'end': '2028-06-01'})
+        self.assertEqual(response.status_code, 400)
+        for ids in ('99999999999999999999', f'{apartment.pk},-5', '0', 'x'):
+            response = self.client.get('/apartments/api/availability/', {'ids': ids, 'start': '2027-05-01', 'end': '2027-05-15'})
+            self.assertEqual(response.status_code, 400, ids)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def create(self, title, description='Світла квартира з ремонтом та меблями', address='вулиця Шевченка, 1'):
+        return Apartment.objects.create(
+            title=title, description=description, apartment_type='ST',
+            price=500, square_meters=30, floor=1, address=address,
+        )
+
+    def test_title_match_outranks_description_match(self):
+        self.assertIsInstance(get_search_backend(), SQLiteFTSBackend)
+        self.assertEqual(SQLiteFTSBackend.WEIGHTS, (10.0, 1.0, 3.0))
+        in_description = self.create('Простора студія', 'Поруч пентхаус із терасою та видом на парк')
+        in_address = self.create('Затишна студія', address='провулок Пентхаусний, 5')
+        in_title = self.create('Пентхаус у центрі')
+        self.assertEqual(search_apartments('пентхаус'), [in_title.pk, in_address.pk, in_description.pk])
+
+    def test_stemmed_suffixes_match(self):
+        apartment = self.create('Квартира з балконом')
+        for query in ('квартири', 'квартирою', 'балкони', 'БАЛКОН'):
+            self.assertEqual(search_apartments(query), [apartment.pk], query)
+        self.assertEqual(search_apartments('будинок'), [])
+
+    def test_updates_and_deletes_keep_index_in_sync(self):
+        apartment = self.create('Квартира з балконом')
+        apartment.title = 'Квартира з терасою'
+        apartment.save()
+        self.assertEqual(search_apartments('балкон'), [])
+        self.assertEqual(search_apartments('тераса'), [apartment.pk])
+        apartment.delete()
+        self.assertEqual(search_apartments('тераса'), [])
+
+    def test_filters_apply_before_the_limit(self):
+        studios = [self.create(f'Студія з балконом {number}') for number in range(3)]
+        penthouse = self.create('Пентхаус', 'Пентхаус з балконом та терасою')
+        penthouse.apartment_type = 'PH'
+        penthouse.save()
+        # Студії ранжуються вище, але фільтр за типом відкидає їх до ліміту.
+        self.assertEqual(search_apartments('балкон', limit=2)[:2], [studio.pk for studio in studios[:2]])
+        queryset = Apartment.objects.filter(apartment_type='PH')
+        self.assertEqual(search_apartments('балкон', limit=2, queryset=queryset), [penthouse.pk])
+        with mock.patch.object(search, '_backend', DatabaseSearchBackend()):
+            self.assertEqual(search_apartments('балкон', limit=2, queryset=queryset), [penthouse.pk])
+        response = self.client.get('/apartments/list/', {'q': 'балкон', 'apartment_type': 'PH'})
+        self.assertEqual([apartment.pk for apartment in response.context['apartments']], [penthouse.pk])
+
+    def test_database_backend_when_fts5_is_unavailable(self):
+        self.addCleanup(setattr, search, '_backend', search._backend)
+        search._backend = None
+        with mock.patch.object(search, 'fts_available', return_value=False):
+            backend = get_search_backend()
+        self.assertIsInstance(backend, DatabaseSearchBackend)
+        apartment = self.create('Квартира з балконом')
+        self.create('Студія біля парку')
+        self.assertEqual(search_apartments('квартирою балкони'), [apartment.pk])
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.apartments = Apartment.objects.bulk_create([
+            Apartment(
+                title=f'Квартира {number}', description='Опис квартири для тесту', apartment_type='ST',
+                price=500, square_meters=30, floor=1, address=f'вулиця Шевченка, {number}',
+            )
+            for number in range(25)
+        ])
+        # Три групи з однаковим created_at: межі сторінок потрапляють усередину груп.
+        moments = [timezone.now() - timedelta(days=day) for day in range(3)]
+        for index, apartment in enumerate(cls.apartments):
+            Apartment.objects.filter(pk=apartment.pk).update(created_at=moments[index % 3])
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, page_size, cursor=None):
+        seen = []
+        while True:
+            items, cursor = keyset_page(Apartment.objects.all(), cursor, page_size=page_size)
+            seen += [item.pk for item in items]
+            if cursor is None:
+                return seen
+
+    def test_pages_do_not_skip_or_repeat_rows_with_equal_timestamps(self):
+        expected = list(Apartment.objects.order_by('-created_at', 'id').values_list('pk', flat=True))
+        for page_size in (1, 4, 7, 24, 25, 30):
+            self.assertEqual(self.walk(page_size), expected, page_size)
+
+    def test_cursor_is_stable_when_rows_are_added(self):
+        first, cursor = keyset_page(Apartment.objects.all(), page_size=10)
+        Apartment.objects.create(
+            title='Нова квартира', description='Опис квартири для тесту', apartment_type='ST',
+            price=500, square_meters=30, floor=1, address='вулиця Шевченка, 100',
+        )
+        rest = self.walk(10, cursor)
+        self.assertEqual(sorted([item.pk for item in first] + rest), sorted(item.pk for item in self.apartments))
+
+    def test_views_follow_cursors(self):
+        for url, page_size in (('/apartments/list/', PAGE_SIZE), ('/', HOME_PAGE_SIZE)):
+            seen, query = [], ''
+            while True:
+                response = self.client.get(f'{url}?{query}')
+                self.assertEqual(response.status_code, 200)
+                seen += [apartment.pk for apartment in response.context['apartments']]
+                query = response.context['next_query']
+                if not query:
+                    break
+            self.assertEqual(len(seen), len(self.apartments), url)
+            self.assertEqual(len(set(seen)), len(seen), url)
+
+    def test_malformed_cursor_returns_first_page(self):
+        def encode(raw):
+            return base64.urlsafe_b64encode(raw.encode()).decode()
+
+        cursors = [
+            'abc', '%%%', '=', encode('x|y'), encode('2027-13-45T00:00:00+00:00|5'),
+            encode('2027-01-01T00:00:00+00:00|99999999999999999999999'), encode('2027-01-01T00:00:00+00:00|-1'),
+            encode('\x00|5'), encode('2027-01-01T00:00:00|5'),
+        ]
+        first_page = [item.pk for item in keyset_page(Apartment.objects.all())[0]]
+        for cursor in cursors:
+            self.assertIsNone(decode_cursor(cursor), cursor)
+            for url in ('/apartments/list/', '/'):
+                response = self.client.get(url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 200, (url, cursor))
+            self.assertEqual([apartment.pk for apartment in response.context['apartments']], first_page[:HOME_PAGE_SIZE])
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.studio = self.create('Студія на другому', 'ST', 2)
+        self.penthouse = self.create('Пентхаус угорі', 'PH', 20)
+
+    def create(self, title, apartment_type, floor):
+        return Apartment.objects.create(
+            title=title, description='Опис квартири для тесту', apartment_type=apartment_type,
+            price=500, square_meters=30, floor=floor, address='вулиця Шевченка, 1',
+        )
+
+    def listed(self, url):
+        return [apartment.pk for apartment in self.client.get(url).context['apartments']]
+
+    def test_encoded_separators_do_not_share_a_page_key(self):
+        # Невалідний фільтр дає нефільтровану сторінку; вона не повинна потрапити
+        # під ключ справжнього запиту з тими самими символами після з'єднання.
+        self.assertCountEqual(self.listed('/apartments/list/?apartment_type=ST%26floor%3D2'),
+                              [self.studio.pk, self.penthouse.pk])
+        self.assertEqual(self.listed('/apartments/list/?apartment_type=ST&floor=2'), [self.studio.pk])
+
+    def test_evicted_version_does_not_revive_old_pages(self):
+        cache.clear()
+        self.client.get('/apartments/list/')
+        self.penthouse.title = 'Пентхаус перейменовано'
+        self.penthouse.save()
+        cache.delete(CATALOG_VERSION_KEY)
+        self.assertContains(self.client.get('/apartments/list/'), 'Пентхаус перейменовано')
+
+
+@override_settings(ASYNC_CATALOG=True)
+class AsyncCatalogTests(TestCase):
+    # Маршрути обираються під час імпорту urls, тож асинхронні view викликаються напряму.
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('guest', password='guest-password')
+        cls.apartments = [
+            Apartment.objects.create(
+                title=f'Квартира {number}', description='Опис квартири для тесту',
+                apartment_type='PH' if number % 2 else 'ST',
+                price=500, square_meters=30, floor=1, address=f'вулиця Шевченка, {number}',
+            )
+            for number in range(PAGE_SIZE + 4)
+        ]
+        cls.penthouse = Apartment.objects.create(
+            title='Пентхаус з терасою', description='Опис квартири для тесту', apartment_type='PH',
+            price=900, square_meters=90, floor=20, address='вулиця Шевченка, 100',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+
+    async def call(self, view, path, data=None, user=None, headers=None, **kwargs):
+        request = self.factory.get(path, data, headers=headers)
+        request.user = user or AnonymousUser()
+        request.session = SessionStore()
+        return await view(request, **kwargs)
+
+    def listed(self, response):
+        return {int(pk) for pk in re.findall(r'href="/apartments/(\d+)/"', response.content.decode())}
+
+    async def test_list_applies_filters_cursor_and_search(self):
+        response = await self.call(async_views.apartment_list, '/apartments/list/')
+        self.assertEqual(response.status_code, 200)
+        first, cursor = await sync_to_async(keyset_page)(Apartment.objects.for_table())
+        self.assertEqual(self.listed(response), {apartment.pk for apartment in first})
+
+        response = await self.call(async_views.apartment_list, '/apartments/list/', {'cursor': cursor})
+        seen = self.listed(response) | {apartment.pk for apartment in first}
+        self.assertEqual(seen, {apartment.pk for apartment in self.apartments} | {self.penthouse.pk})
+
+        response = await self.call(async_views.apartment_list, '/apartments/list/', {'apartment_type': 'ST'})
+        self.assertEqual(
+            self.listed(response), {apartment.pk for apartment in self.apartments if apartment.apartment_type == 'ST'},
+        )
+
+        response = await self.call(async_views.apartment_list, '/apartments/list/', {'q': 'тераса'})
+        self.assertEqual(self.listed(response), {self.penthouse.pk})
+        response = await self.call(async_views.apartment_list, '/apartments/list/', {'q': 'тераса', 'apartment_type': 'ST'})
+        self.assertEqual(self.listed(response), set())
+
+    async def test_detail_returns_404_and_304(self):
+        with self.assertRaises(Http404):
+            await self.call(async_views.apartment_detail, '/apartments/0/', pk=0)
+        path = self.penthouse.urls['detail']
+        response = await self.call(async_views.apartment_detail, path, pk=self.penthouse.pk)
+        self.assertContains(response, self.penthouse.title)
+        response = await self.call(
+            async_views.apartment_detail, path, headers={'If-None-Match': response['ETag']}, pk=self.penthouse.pk,
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_favorites_list(self):
+        await Favorite.objects.acreate(user=self.user, apartment=self.penthouse)
+        response = await self.call(async_views.favorites_list, '/apartments/favorites/', user=self.user)
+        self.assertEqual(self.listed(response), {self.penthouse.pk})
+        response = await self.call(async_views.favorites_list, '/apartments/favorites/')
+        self.assertEqual(self.listed(response), set())
+
+    async def test_calendar_validates_query(self):
+        apartment = self.apartments[0]
+        await Booking.objects.acreate(
+            apartment=apartment, user=self.user, start_date=date(2027, 5, 10), end_date=date(2027, 5, 12),
+            status='confirmed', total_price=1000,
+        )
+        path = '/apartments/api/availability/'
+        response = await self.call(async_views.availability_calendar, path, {
+            'ids': apartment.pk, 'start': '2027-05-01', 'end': '2027-05-15', 'encoding': 'rle',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['apartments'], {str(apartment.pk): [[9, 2]]})
+        for ids in ('99999999999999999999', '0', 'x'):
+            response = await self.call(async_views.availability_calendar, path, {
+                'ids': ids, 'start': '2027-05-01', 'end': '2027-05-15',
+            })
+            self.assertEqual(response.status_code, 400, ids)
+
+
+class ApartmentImageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        media = override_settings(MEDIA_ROOT=directory.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.apartment = Apartment.objects.create(
+            title='Квартира з фото', description='Опис квартири для тесту', apartment_type='ST',
+            price=500, square_meters=30, floor=1, address='вулиця Шевченка, 1',
+            image=self.upload('flat.jpg', (800, 600)),
+        )
+
+    def upload(self, name, size, color='teal'):
+        buffer = BytesIO()
+        Image.new('RGB', size, color).save(buffer, 'JPEG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+    def picture(self, apartment):
+        template = Template('{% load apartment_images %}{% apartment_picture apartment sizes="50vw" %}')
+        return template.render(Context({'apartment': apartment}))
+
+    def test_variants_are_written_for_each_width_and_format(self):
+        process_apartment_image(self.apartment.pk)
+        self.apartment.refresh_from_db()
+        manifest = self.apartment.image_variants
+        self.assertEqual((manifest['width'], manifest['height']), (800, 600))
+        self.assertTrue(manifest['placeholder'].startswith('data:image/jpeg;base64,'))
+        formats = [extension for extension, pil_format, quality in VARIANT_FORMATS]
+        self.assertIn('jpg', formats)
+        # Ширина 1280 більша за оригінал, тож варіантів лише два розміри.
+        self.assertEqual(
+            [(variant['width'], variant['format']) for variant in manifest['variants']],
+            [(width, extension) for width in (320, 640) for extension in formats],
+        )
+        for variant in manifest['variants']:
+            with default_storage.open(variant['name']) as stored:
+                image = Image.open(stored)
+                self.assertEqual(image.size, (variant['width'], variant['width'] * 3 // 4), variant['name'])
+
+    def test_picture_lists_variants_in_srcset(self):
+        process_apartment_image(self.apartment.pk)
+        self.apartment.refresh_from_db()
+        html = self.picture(self.apartment)
+        self.assertTrue(html.startswith('<picture>'))
+        self.assertIn(f'{settings.MEDIA_URL}{self.apartment.image_variants["variants"][0]["name"]} 320w', html)
+        self.assertIn('sizes="50vw" width="800" height="600"', html)
+        if any(extension == 'webp' for extension, pil_format, quality in VARIANT_FORMATS):
+            self.assertIn('<source type="image/webp"', html)
+
+    def test_picture_falls_back_to_original_without_variants(self):
+        html = self.picture(self.apartment)
+        self.assertNotIn('<picture>', html)
+        self.assertIn(f'<img src="{self.apartment.image.url}"', html)
+        self.apartment.image = None
+        self.assertEqual(self.picture(self.apartment), '')
+
+    def test_form_clears_variants_only_when_image_changes(self):
+        process_apartment_image(self.apartment.pk)
+        self.apartment.refresh_from_db()
+        data = {
+            field: getattr(self.apartment, field)
+            for field in ('title', 'description', 'apartment_type', 'price', 'square_meters', 'floor', 'address')
+        }
+        form = ApartmentForm(data=dict(data, title='Квартира з новою назвою'), instance=self.apartment)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertNotEqual(form.save().image_variants, {})
+
+        form = ApartmentForm(
+            data=data, files={'image': self.upload('other.jpg', (400, 300), 'navy')}, instance=self.apartment,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.apartment.refresh_from_db()
+        self.assertEqual(self.apartment.image_variants, {})
+
+
+class FavoriteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('guest', password='guest-password')
+        self.apartments = [
+            Apartment.objects.create(
+                title=f'Квартира {number}', description='Опис квартири для тесту', apartment_type='ST',
+                price=500, square_meters=30, floor=1, address=f'вулиця Шевченка, {number}',
+            )
+            for number in range(3)
+        ]
+
+    def toggle(self, apartment, action):
+        return self.client.get(apartment.urls[f'{action}_favorite'])
+
+    def favorites(self):
+        return [apartment.pk for apartment in self.client.get('/apartments/favorites/').context['apartments']]
+
+    def test_session_favorites_add_and_remove(self):
+        first, second, third = self.apartments
+        for apartment in (first, second, first):
+            self.toggle(apartment, 'add')
+        self.assertEqual(self.client.session[FAVORITE_APARTMENTS_KEY], [first.pk, second.pk])
+        self.toggle(first, 'remove')
+        self.toggle(third, 'remove')
+        self.assertEqual(self.client.session[FAVORITE_APARTMENTS_KEY], [second.pk])
+        self.assertEqual(self.favorites(), [second.pk])
+        self.assertFalse(Favorite.objects.exists())
+
+    def test_user_favorites_invalidate_cache_on_toggle(self):
+        first, second, third = self.apartments
+        self.client.force_login(self.user)
+        self.assertEqual(self.favorites(), [])
+        self.assertEqual(cache.get(favorites_cache_key(self.user.pk)), set())
+        self.toggle(first, 'add')
+        self.toggle(first, 'add')
+        self.assertEqual(Favorite.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(self.favorites(), [first.pk])
+        self.toggle(second, 'add')
+        self.assertCountEqual(self.favorites(), [first.pk, second.pk])
+        self.toggle(first, 'remove')
+        self.assertEqual(self.favorites(), [second.pk])
+        self.assertEqual(cache.get(favorites_cache_key(self.user.pk)), {second.pk})
+
+    def test_session_favorites_merge_on_login_without_duplicates(self):
+        first, second, third = self.apartments
+        Favorite.objects.create(user=self.user, apartment=first)
+        self.client.force_login(self.user)
+        self.assertEqual(self.favorites(), [first.pk])
+        self.client.logout()
+
+        for apartment in (first, second):
+            self.toggle(apartment, 'add')
+        response = self.client.post('/accounts/login/', {'username': 'guest', 'password': 'guest-password'})
+        self.assertEqual(response.status_code, 302)
+        self.assertCountEqual(
+            Favorite.objects.filter(user=self.user).values_list('apartment_id', flat=True), [first.pk, second.pk],
+        )
+        self.assertNotIn(FAVORITE_APARTMENTS_KEY, self.client.session)
+        # Кешований до входу набір інвалідовано, тож об'єднання видно одразу.
+        self.assertCountEqual(self.favorites(), [first.pk, second.pk])
+
+
+class StatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('guest', password='guest-password')
+        self.studios = [self.create('ST', price) for price in (100, 300, 200, 900)]
+        self.penthouses = [self.create('PH', price) for price in (500, 700, 600)]
+
+    def create(self, apartment_type, price):
+        return Apartment.objects.create(
+            title=f'Квартира за {price}', description='Опис квартири для тесту', apartment_type=apartment_type,
+            price=price, square_meters=30, floor=1, address='вулиця Шевченка, 1',
+        )
+
+    def by_type(self):
+        return {row['apartment_type']: row for row in type_stats()}
+
+    def test_catalog_and_type_values(self):
+        self.assertEqual(catalog_stats(), {'total': 7, 'available': 7, 'min_price': 100, 'max_price': 900})
+        self.assertEqual(async_to_sync(acatalog_stats)(), catalog_stats())
+        rows = self.by_type()
+        self.assertEqual(list(rows), ['PH', 'ST'])
+        # Медіана парної кількості — середнє двох середніх цін, непарної — середня ціна.
+        self.assertEqual(rows['ST']['median_price'], 250)
+        self.assertEqual(rows['PH']['median_price'], 600)
+        self.assertEqual(
+            (rows['ST']['total'], rows['ST']['available'], rows['ST']['min_price'], rows['ST']['max_price']),
+            (4, 4, 100, 900),
+        )
+        self.assertEqual(rows['PH']['label'], dict(Apartment.TYPE_CHOICES)['PH'])
+
+    def test_booking_that_changes_availability_invalidates_stats(self):
+        self.assertEqual(catalog_stats()['available'], 7)
+        self.assertEqual(self.by_type()['ST']['available'], 4)
+        today = date.today()
+        Booking.objects.create(
+            apartment=self.studios[0], user=self.user, start_date=today, end_date=today + timedelta(days=2),
+            status='confirmed', total_price=200,
+        )
+        self.assertEqual(catalog_stats()['available'], 6)
+        self.assertEqual(self.by_type()['ST']['available'], 3)
+
+    def test_apartment_changes_invalidate_stats(self):
+        self.assertEqual(catalog_stats()['max_price'], 900)
+        self.assertEqual(self.by_type()['PH']['median_price'], 600)
+        self.studios[3].price = 1500
+        self.studios[3].save()
+        self.assertEqual(catalog_stats()['max_price'], 1500)
+        self.penthouses[2].delete()
+        self.create('ST', 400)
+        self.assertEqual(catalog_stats()['total'], 7)
+        rows = self.by_type()
+        self.assertEqual(rows['PH']['median_price'], 600)
+        self.assertEqual((rows['PH']['total'], rows['ST']['total']), (2, 5))
+        self.assertEqual(rows['ST']['median_price'], 300)
+
+
+class BookingAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('guest', password='guest-password')
+        self.apartment = Apartment.objects.create(
+            title='Квартира', description='Опис квартири для тесту', apartment_type='ST',
+            price=500, square_meters=30, floor=1, address='вулиця Шевченка, 1',
+        )
+        start = date.today() + timedelta(days=5)
+        self.booking = Booking.objects.create(
+            apartment=self.apartment, user=self.user, start_date=start,
+            end_date=start + timedelta(days=3), total_price=1500,
+        )
+
+    def totals(self):
+        rows = TypeDailyStats.objects.order_by().values('apartment_type').annotate(
+            booked=Sum('booked_nights'), cancelled=Sum('cancelled_nights'), revenue=Sum('revenue'),
+        )
+        return {row['apartment_type']: (row['booked'], row['cancelled'], row['revenue']) for row in rows}
+
+    def change_type(self, apartment_type):
+        self.apartment.apartment_type = apartment_type
+        self.apartment.save()
+
+    def test_change_is_subtracted_from_the_type_it_was_counted_under(self):
+        self.assertEqual(self.totals(), {'ST': (3, 0, 1500)})
+        self.change_type('PH')
+        self.booking.status = 'cancelled'
+        self.booking.save()
+        self.assertEqual(self.totals(), {'ST': (0, 0, 0), 'PH': (0, 3, 0)})
+
+    def test_delete_is_subtracted_from_the_type_it_was_counted_under(self):
+        self.change_type('PH')
+        self.booking.delete()
+        self.assertEqual(self.totals(), {'ST': (0, 0, 0)})
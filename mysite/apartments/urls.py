@@ -1,17 +1,26 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# В ASGI-розгортанні читаючі view каталогу замінюються асинхронними.
+catalog = async_views if settings.ASYNC_CATALOG else views
 
 urlpatterns = [
-    path('list/', views.apartment_list, name='apartment_list'),
+    path('list/', catalog.apartment_list, name='apartment_list'),
     path('create/', views.apartment_create, name='apartment_create'),
-    path('<int:pk>/', views.apartment_detail, name='apartment_detail'),
+    path('<int:pk>/', catalog.apartment_detail, name='apartment_detail'),
     path('<int:pk>/update/', views.apartment_update, name='apartment_update'),
     path('<int:pk>/delete/', views.apartment_delete, name='apartment_delete'),
     path('<int:pk>/add-to-favorites/', views.add_to_favorites, name='add_to_favorites'),
     path('<int:pk>/remove-from-favorites/', views.remove_from_favorites, name='remove_from_favorites'),
-    path('favorites/', views.favorites_list, name='favorites_list'),
+    path('favorites/', catalog.favorites_list, name='favorites_list'),
     path('<int:pk>/book/', views.booking_create, name='booking_create'),
     path('bookings/', views.booking_list, name='booking_list'),
+    path('bookings/export/', views.booking_export, name='booking_export'),
     path('bookings/<int:pk>/', views.booking_detail, name='booking_detail'),
     path('bookings/<int:pk>/cancel/', views.booking_cancel, name='booking_cancel'),
+    path('analytics/', views.analytics_dashboard, name='analytics_dashboard'),
+    path('api/availability/', catalog.availability_calendar, name='availability_calendar'),
+    path('api/quote/', views.price_quote, name='price_quote'),
+    path('api/session-stats/', views.session_stats_view, name='session_stats'),
 ]
@@ -0,0 +1,49 @@
+from django.core.exceptions import ValidationError
+
+# Правила квартири, спільні для ApartmentForm та імпорту (apartments.bulk).
+
+
+def validate_title(title):
+    if len(title) < 5:
+        raise ValidationError('Назва повинна містити мінімум 5 символів')
+
+
+def validate_price(price):
+    if price <= 0:
+        raise ValidationError('Ціна повинна бути більше 0')
+    if price > 10000000:
+        raise ValidationError('Ціна не може перевищувати 10,000,000$')
+
+
+def validate_square_meters(square_meters):
+    if square_meters < 10:
+        raise ValidationError('Площа повинна бути мінімум 10 м²')
+    if square_meters > 1000:
+        raise ValidationError('Площа не може перевищувати 1000 м²')
+
+
+def validate_floor(floor):
+    if floor < 1:
+        raise ValidationError('Поверх повинен бути мінімум 1')
+    if floor > 100:
+        raise ValidationError('Поверх не може перевищувати 100')
+
+
+def validate_address(address):
+    if len(address) < 10:
+        raise ValidationError('Адреса повинна містити мінімум 10 символів')
+
+
+def validate_description(description):
+    if len(description) < 20:
+        raise ValidationError('Опис повинен містити мінімум 20 символів')
+
+
+APARTMENT_RULES = {
+    'title': validate_title,
+    'description': validate_description,
+    'price': validate_price,
+    'square_meters': validate_square_meters,
+    'floor': validate_floor,
+    'address': validate_address,
+}
@@ -3,32 +3,69 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 from .models import Apartment, Booking
-from .forms import ApartmentForm, BookingForm
+from .forms import ApartmentForm, BookingForm, ApartmentFilterForm, AnalyticsFilterForm
+from .pagination import keyset_page, ranked_page, next_page_query, CURSOR_PARAM
+from .search import search_apartments
+from .stats import catalog_stats, type_stats
+from .cache import cached_last_modified, cached_page, catalog_version, get_apartment_or_404
+from .availability import BookingConflict, create_booking
+from .favorites import add_favorite, get_favorite_ids, remove_favorite
+from .sessions import session_stats
+from .tasks import schedule_image_variants
+from .occupancy import calendar_payload, occupancy_bits, parse_calendar_query
+from .exports import booking_csv_response, filter_bookings
+from .analytics import dashboard
+from .pricing import parse_quote_query, quote, quote_payload
+from .conditional import add_validators, detail_validators, list_validators, not_modified, personal_state
 from datetime import date
 
-FAVORITE_APARTMENTS_KEY = 'favorite_apartments'
-
 def apartment_list(request):
-    apartments = Apartment.objects.all()
-    favorite_ids = request.session.get(FAVORITE_APARTMENTS_KEY, [])
+    filter_form = ApartmentFilterForm(request.GET)
+    queryset = filter_form.filter(Apartment.objects.for_table())
+    query = filter_form.search_query()
+    cursor = request.GET.get(CURSOR_PARAM)
+
+    version = catalog_version()
+    last_modified = cached_last_modified('apartment_list', request, queryset, version)
+    etag, last_modified = list_validators(request, version, last_modified, personal_state(request))
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return add_validators(request, response, etag, last_modified)
+
+    def build_page():
+        if query:
+            return ranked_page(queryset, search_apartments(query, queryset=queryset), cursor)
+        return keyset_page(queryset, cursor)
+
+    apartments, next_cursor = cached_page('apartment_list', request, build_page)
+    stats = catalog_stats()
     context = {
         'apartments': apartments,
-        'total_apartments': apartments.count(),
-        'available_apartments': apartments.filter(is_available=True).count(),
-        'favorite_ids': favorite_ids,
+        'filter_form': filter_form,
+        'next_query': next_page_query(request, next_cursor),
+        'is_first_page': CURSOR_PARAM not in request.GET,
+        'total_apartments': stats['total'],
+        'available_apartments': stats['available'],
+        'type_stats': type_stats(),
     }
-    return render(request, 'apartments/apartment_list.html', context)
+    response = render(request, 'apartments/apartment_list.html', context)
+    return add_validators(request, response, etag, last_modified)
 
 
 def apartment_detail(request, pk):
-    apartment = get_object_or_404(Apartment, pk=pk)
-    favorite_ids = request.session.get(FAVORITE_APARTMENTS_KEY, [])
-    is_favorite = pk in favorite_ids
-    return render(request, 'apartments/apartment_detail.html', {
-        'apartment': apartment,
-        'is_favorite': is_favorite
-    })
+    apartment = get_apartment_or_404(pk)
+    etag, last_modified = detail_validators(apartment, personal_state(request))
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        is_favorite = pk in get_favorite_ids(request)
+        response = render(request, 'apartments/apartment_detail.html', {
+            'apartment': apartment,
+            'is_favorite': is_favorite
+        })
+    return add_validators(request, response, etag, last_modified)
 
 @login_required
 def apartment_create(request):
@@ -40,6 +77,8 @@ def apartment_create(request):
         form = ApartmentForm(request.POST, request.FILES)
         if form.is_valid():
             apartment = form.save()
+            if 'image' in form.changed_data:
+                schedule_image_variants(apartment)
             messages.success(request, f'Квартиру "{apartment.title}" успішно створено!')
             return redirect('apartment_detail', pk=apartment.pk)
         else:
@@ -65,6 +104,8 @@ def apartment_update(request, pk):
         form = ApartmentForm(request.POST, request.FILES, instance=apartment)
         if form.is_valid():
             apartment = form.save()
+            if 'image' in form.changed_data:
+                schedule_image_variants(apartment)
             messages.success(request, f'Квартиру "{apartment.title}" успішно оновлено!')
             return redirect('apartment_detail', pk=apartment.pk)
         else:
@@ -100,11 +141,8 @@ def apartment_delete(request, pk):
 
 def add_to_favorites(request, pk):
     apartment = get_object_or_404(Apartment, pk=pk)
-    favorite_ids = request.session.get(FAVORITE_APARTMENTS_KEY, [])
     
-    if pk not in favorite_ids:
-        favorite_ids.append(pk)
-        request.session[FAVORITE_APARTMENTS_KEY] = favorite_ids
+    if add_favorite(request, apartment):
         messages.success(request, f'Квартиру "{apartment.title}" додано до улюблених!')
     
     return redirect(request.META.get('HTTP_REFERER', 'apartment_list'))
@@ -112,23 +150,18 @@ def add_to_favorites(request, pk):
 
 def remove_from_favorites(request, pk):
     apartment = get_object_or_404(Apartment, pk=pk)
-    favorite_ids = request.session.get(FAVORITE_APARTMENTS_KEY, [])
     
-    if pk in favorite_ids:
-        favorite_ids.remove(pk)
-        request.session[FAVORITE_APARTMENTS_KEY] = favorite_ids
+    if remove_favorite(request, apartment):
         messages.success(request, f'Квартиру "{apartment.title}" видалено з улюблених!')
     
     return redirect(request.META.get('HTTP_REFERER', 'apartment_list'))
 
 
 def favorites_list(request):
-    favorite_ids = request.session.get(FAVORITE_APARTMENTS_KEY, [])
-    apartments = Apartment.objects.filter(pk__in=favorite_ids)
+    apartments = Apartment.objects.for_table().filter(pk__in=get_favorite_ids(request))
     
     context = {
         'apartments': apartments,
-        'favorite_ids': favorite_ids,
     }
     return render(request, 'apartments/favorites_list.html', context)
 
@@ -137,10 +170,6 @@ def favorites_list(request):
 def booking_create(request, pk):
     apartment = get_object_or_404(Apartment, pk=pk)
     
-    if not apartment.is_available:
-        messages.error(request, 'Ця квартира недоступна для бронювання')
-        return redirect('apartment_detail', pk=pk)
-    
     if request.method == 'POST':
         form = BookingForm(request.POST)
         if form.is_valid():
@@ -148,12 +177,16 @@ def booking_create(request, pk):
             booking.apartment = apartment
             booking.user = request.user
             
-            days = (booking.end_date - booking.start_date).days
-            booking.total_price = apartment.price * days
+            booking.total_price = quote(apartment, booking.start_date, booking.end_date).total
             
-            booking.save()
-            messages.success(request, f'Бронювання успішно створено! Загальна вартість: ${booking.total_price}')
-            return redirect('booking_detail', pk=booking.pk)
+            try:
+                create_booking(booking)
+            except BookingConflict as error:
+                form.add_error(None, error)
+                messages.error(request, 'Квартира вже заброньована на обрані дати.')
+            else:
+                messages.success(request, f'Бронювання успішно створено! Загальна вартість: ${booking.total_price}')
+                return redirect('booking_detail', pk=booking.pk)
         else:
             messages.error(request, 'Будь ласка, виправте помилки у формі.')
     else:
@@ -167,7 +200,7 @@ def booking_create(request, pk):
 
 @login_required
 def booking_detail(request, pk):
-    booking = get_object_or_404(Booking, pk=pk)
+    booking = get_object_or_404(Booking.objects.with_related(), pk=pk)
     
     if booking.user != request.user and not request.user.is_staff:
         messages.error(request, 'У вас немає доступу до цього бронювання')
@@ -180,7 +213,7 @@ def booking_detail(request, pk):
 
 @login_required
 def booking_list(request):
-    bookings = Booking.objects.filter(user=request.user).select_related('apartment')
+    bookings = Booking.objects.for_user(request.user)
     
     return render(request, 'apartments/booking_list.html', {
         'bookings': bookings
@@ -189,7 +222,7 @@ def booking_list(request):
 
 @login_required
 def booking_cancel(request, pk):
-    booking = get_object_or_404(Booking, pk=pk)
+    booking = get_object_or_404(Booking.objects.with_related(), pk=pk)
     
     if booking.user != request.user:
         messages.error(request, 'У вас немає доступу до цього бронювання')
@@ -210,6 +243,60 @@ def booking_cancel(request, pk):
     })
 
 
+@require_GET
+def availability_calendar(request):
+    try:
+        apartment_ids, start, end, encoding = parse_calendar_query(request.GET)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    bits = occupancy_bits(apartment_ids, start, end)
+    return JsonResponse(calendar_payload(bits, start, end, encoding))
+
+
+@require_GET
+def price_quote(request):
+    try:
+        apartment_id, start, end = parse_quote_query(request.GET)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    apartment = get_apartment_or_404(apartment_id)
+    result = quote(apartment, start, end, breakdown=request.GET.get('breakdown') == '1')
+    return JsonResponse(quote_payload(apartment, start, end, result))
+
+
+@login_required
+@require_GET
+def session_stats_view(request):
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Доступ заборонено'}, status=403)
+    return JsonResponse(session_stats.snapshot())
+
+
+@login_required
+@require_GET
+def booking_export(request):
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Доступ заборонено'}, status=403)
+    try:
+        bookings = filter_bookings(Booking.objects.all(), request.GET)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    return booking_csv_response(bookings)
+
+
+@login_required
+def analytics_dashboard(request):
+    if not request.user.is_staff:
+        messages.error(request, 'У вас немає прав для перегляду аналітики')
+        return redirect('home')
+
+    form = AnalyticsFilterForm(request.GET or None)
+    start, end = form.window()
+    context = dashboard(start, end)
+    context.update({'form': form, 'start': start, 'end': end})
+    return render(request, 'apartments/analytics_dashboard.html', context)
+
+
 def register(request):
     if request.method == 'POST':
         form = UserCreationForm(request.POST)
@@ -236,7 +323,7 @@ def register(request):
 
 @login_required
 def profile(request):
-    bookings = Booking.objects.filter(user=request.user).select_related('apartment')
+    bookings = Booking.objects.for_user(request.user)
     
     return render(request, 'accounts/profile.html', {
         'bookings': bookings
@@ -0,0 +1,98 @@
+"""Спільні функції бенчмарків: перцентилі, збереження результатів і порівняння з базовою лінією.
+
+Результат — словник {сценарій: {p50, p95, p99, ...}} у секундах. Базова лінія
+зберігається тим самим форматом у JSON, тож її можна комітити поруч зі змінами.
+"""
+import json
+import platform
+import statistics
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+COMPARED = ('p50', 'p95', 'p99')
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(len(ordered) * fraction), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(latencies):
+    return {
+        'samples': len(latencies),
+        'mean': statistics.mean(latencies) if latencies else 0.0,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+    }
+
+
+def save_results(path, kind, results):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'kind': kind,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+
+
+def load_results(path):
+    return json.loads(Path(path).read_text(encoding='utf-8'))['results']
+
+
+def compare(results, baseline, threshold, min_delta=0.0):
+    # Регресія — зростання перцентиля більш ніж на threshold (частка) від базового
+    # і водночас більш ніж на min_delta секунд, щоб шум швидких сценаріїв не заважав.
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in COMPARED:
+            before, after = previous.get(metric, 0.0), current.get(metric, 0.0)
+            change = (after - before) / before if before else 0.0
+            rows.append((name, metric, before, after, change, change > threshold and after - before > min_delta))
+    return rows
+
+
+def print_comparison(rows, threshold, stream=sys.stdout):
+    print(f'\nПорівняння з базовою лінією (поріг +{threshold:.0%}):', file=stream)
+    print(f'{"scenario":<24}{"metric":>8}{"base ms":>10}{"now ms":>10}{"change":>10}', file=stream)
+    for name, metric, before, after, change, regressed in rows:
+        mark = '  REGRESSION' if regressed else ''
+        print(
+            f'{name:<24}{metric:>8}{before * 1000:>10.2f}{after * 1000:>10.2f}{change:>+10.1%}{mark}',
+            file=stream,
+        )
+    return sum(1 for row in rows if row[-1])
+
+
+def report(args, kind, results):
+    # Спільна обробка --json / --save-baseline / --baseline; повертає код виходу.
+    if args.json:
+        save_results(args.json, kind, results)
+    if args.save_baseline:
+        save_results(args.baseline, kind, results)
+        print(f'\nБазову лінію збережено: {args.baseline}')
+        return 0
+    if not Path(args.baseline).exists():
+        return 0
+    rows = compare(results, load_results(args.baseline), args.threshold, args.min_delta / 1000)
+    regressions = print_comparison(rows, args.threshold)
+    return 1 if regressions else 0
+
+
+def add_report_arguments(parser, default_baseline):
+    parser.add_argument('--json', help='Записати результати у JSON-файл')
+    parser.add_argument('--baseline', default=default_baseline, help='Файл базової лінії')
+    parser.add_argument('--save-baseline', action='store_true', help='Зберегти результати як нову базову лінію')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Допустиме зростання перцентилів (частка)')
+    parser.add_argument('--min-delta', type=float, default=1.0, help='Мінімальне зростання в мс, що вважається регресією')
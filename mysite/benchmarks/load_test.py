@@ -0,0 +1,114 @@
+"""HTTP-навантаження для порівняння WSGI та ASGI розгортань.
+
+Приклад:
+
+    gunicorn mysite.wsgi -w 4 -b 127.0.0.1:8001
+    ASYNC_CATALOG=1 uvicorn mysite.asgi:application --workers 1 --port 8002
+    python benchmarks/load_test.py \\
+        wsgi=http://127.0.0.1:8001/apartments/list/ \\
+        asgi=http://127.0.0.1:8002/apartments/list/ \\
+        --concurrency 64 --requests 5000 --slow-clients 500
+
+--slow-clients відкриває N з'єднань, що надсилають заголовки по байту на
+секунду, імітуючи повільних мобільних клієнтів, які тримають воркер.
+
+Без --save-baseline результати порівнюються з benchmarks/baseline_load.json
+(якщо файл існує); код виходу 1 означає регресію перцентилів.
+Весь цикл із запуском серверів — benchmarks/run_load.sh.
+"""
+import argparse
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from common import add_report_arguments, report, summarize
+
+BASELINE = Path(__file__).with_name('baseline_load.json')
+
+
+def fetch(url, timeout):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            ok = response.status < 500
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return time.perf_counter() - started, ok
+
+
+def slow_client(url, stop):
+    parts = urlsplit(url)
+    try:
+        sock = socket.create_connection((parts.hostname, parts.port or 80), timeout=5)
+        sock.sendall(f'GET {parts.path or "/"} HTTP/1.1\r\nHost: {parts.netloc}\r\n'.encode())
+        while not stop.is_set():
+            sock.sendall(b'X')
+            stop.wait(1)
+        sock.close()
+    except OSError:
+        pass
+
+
+def run_target(url, concurrency, requests, timeout, slow_clients):
+    stop = threading.Event()
+    slow_threads = [
+        threading.Thread(target=slow_client, args=(url, stop), daemon=True)
+        for _ in range(slow_clients)
+    ]
+    for thread in slow_threads:
+        thread.start()
+    time.sleep(1 if slow_clients else 0)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: fetch(url, timeout), range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+
+    latencies = [latency for latency, ok in results if ok]
+    return dict(
+        summarize(latencies),
+        requests=requests,
+        errors=sum(1 for latency, ok in results if not ok),
+        rps=len(latencies) / elapsed if elapsed else 0.0,
+    )
+
+
+def parse_target(value):
+    name, separator, url = value.partition('=')
+    if not separator:
+        raise argparse.ArgumentTypeError('ціль має бути у форматі name=url')
+    return name, url
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('targets', nargs='+', type=parse_target, help='name=url')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--slow-clients', type=int, default=0)
+    add_report_arguments(parser, str(BASELINE))
+    args = parser.parse_args()
+
+    print(f'{"target":<10}{"req":>8}{"err":>6}{"rps":>10}{"mean ms":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+    results = {}
+    for name, url in args.targets:
+        result = results[name] = run_target(url, args.concurrency, args.requests, args.timeout, args.slow_clients)
+        print(
+            f'{name:<10}{result["requests"]:>8}{result["errors"]:>6}{result["rps"]:>10.1f}'
+            f'{result["mean"] * 1000:>10.1f}{result["p50"] * 1000:>10.1f}'
+            f'{result["p95"] * 1000:>10.1f}{result["p99"] * 1000:>10.1f}'
+        )
+    return report(args, 'load', results)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
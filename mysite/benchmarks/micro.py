@@ -0,0 +1,144 @@
+"""Мікробенчмарки гарячих сторінок через тестовий клієнт Django, без мережі та сервера.
+
+Спершу згенеруйте дані (краще на окремій копії бази):
+
+    SQLITE_PATH=/tmp/bench.sqlite3 python manage.py migrate
+    SQLITE_PATH=/tmp/bench.sqlite3 python manage.py generate_data --scale 100k
+    SQLITE_PATH=/tmp/bench.sqlite3 python benchmarks/micro.py --save-baseline
+    ... зміни ...
+    SQLITE_PATH=/tmp/bench.sqlite3 python benchmarks/micro.py
+
+Для кожного сценарію виводяться кількість SQL-запитів і перцентилі часу.
+Без --save-baseline результати порівнюються з benchmarks/baseline_micro.json;
+код виходу 1 означає регресію.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import Max  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from apartments.management.commands.generate_data import PREFIX  # noqa: E402
+from apartments.models import Apartment, Booking  # noqa: E402
+from common import add_report_arguments, report, summarize  # noqa: E402
+
+BASELINE = Path(__file__).with_name('baseline_micro.json')
+
+# user: 'anon' або 'user'; cold — очищати кеш перед кожним запитом;
+# atomic — виконувати запит у транзакції з відкатом (запис не накопичується).
+Scenario = namedtuple('Scenario', 'name user method path data cold atomic')
+
+
+def scenario(name, path, data=None, user='anon', method='get', cold=False, atomic=False):
+    return Scenario(name, user, method, path, data or {}, cold, atomic)
+
+
+def build_scenarios(apartment, apartment_ids):
+    today = date.today()
+    last_end = Booking.objects.filter(apartment=apartment).aggregate(last=Max('end_date'))['last'] or today
+    free_start = max(last_end, today) + timedelta(days=1)
+    window = {'start': today.isoformat(), 'end': (today + timedelta(days=90)).isoformat()}
+    return [
+        scenario('home', reverse('home')),
+        scenario('list_warm', reverse('apartment_list')),
+        scenario('list_cold', reverse('apartment_list'), cold=True),
+        scenario('list_filtered', reverse('apartment_list'), {'apartment_type': '2B', 'min_price': 1000, 'max_price': 3000}),
+        scenario('search', reverse('apartment_list'), {'q': 'квартира балконом'}),
+        scenario('detail', apartment.urls['detail']),
+        scenario('favorites', reverse('favorites_list'), user='user'),
+        scenario('booking_list', reverse('booking_list'), user='user'),
+        scenario('availability_api', reverse('availability_calendar'), dict(window, ids=','.join(map(str, apartment_ids)))),
+        scenario('quote_api', reverse('price_quote'), {
+            'apartment': apartment.pk,
+            'start': free_start.isoformat(),
+            'end': (free_start + timedelta(days=9)).isoformat(),
+        }),
+        scenario('booking_create', apartment.urls['book'], {
+            'start_date': free_start.isoformat(),
+            'end_date': (free_start + timedelta(days=3)).isoformat(),
+        }, user='user', method='post', atomic=True),
+    ]
+
+
+def request(client, item):
+    if item.cold:
+        cache.clear()
+    method = getattr(client, item.method)
+    if not item.atomic:
+        started = time.perf_counter()
+        response = method(item.path, item.data)
+        return time.perf_counter() - started, response
+    with transaction.atomic():
+        started = time.perf_counter()
+        response = method(item.path, item.data)
+        elapsed = time.perf_counter() - started
+        transaction.set_rollback(True)
+    return elapsed, response
+
+
+def run(item, client, iterations, warmup):
+    for _ in range(warmup):
+        request(client, item)
+    # Запити рахуються окремим проходом, щоб CaptureQueriesContext не впливав на час.
+    # Рахуємо одразу: request_started наступного запиту очищає журнал з'єднання.
+    with CaptureQueriesContext(connection) as captured:
+        _, response = request(client, item)
+    queries = len(captured)
+    latencies = [request(client, item)[0] for _ in range(iterations)]
+    return dict(summarize(latencies), status=response.status_code, queries=queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--only', nargs='+', metavar='SCENARIO', help='Запустити лише вказані сценарії')
+    add_report_arguments(parser, str(BASELINE))
+    args = parser.parse_args()
+
+    # Вимірюємо як у продакшені: без журналу SQL та налагоджувальних шаблонів.
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['localhost']
+
+    apartments = Apartment.objects.filter(external_id__startswith=PREFIX, is_available=True).order_by('pk')
+    user = User.objects.filter(username__startswith=PREFIX).order_by('pk').first()
+    if not apartments.exists() or user is None:
+        parser.error('Немає тестових даних: спершу виконайте manage.py generate_data')
+    apartment_ids = list(apartments.values_list('pk', flat=True)[:50])
+
+    clients = {'anon': Client(HTTP_HOST='localhost'), 'user': Client(HTTP_HOST='localhost')}
+    clients['user'].force_login(user)
+
+    results = {}
+    print(f'{"scenario":<20}{"status":>7}{"queries":>9}{"mean ms":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+    for item in build_scenarios(apartments.first(), apartment_ids):
+        if args.only and item.name not in args.only:
+            continue
+        result = results[item.name] = run(item, clients[item.user], args.iterations, args.warmup)
+        print(
+            f'{item.name:<20}{result["status"]:>7}{result["queries"]:>9}{result["mean"] * 1000:>10.2f}'
+            f'{result["p50"] * 1000:>10.2f}{result["p95"] * 1000:>10.2f}{result["p99"] * 1000:>10.2f}'
+        )
+    return report(args, 'micro', results)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env bash
+# Навантажувальний тест WSGI (gunicorn) та ASGI (uvicorn) з однаковою кількістю воркерів.
+# Потрібні gunicorn та uvicorn (pip install gunicorn uvicorn) і згенеровані дані:
+#
+#     SQLITE_PATH=/tmp/bench.sqlite3 python manage.py generate_data --scale 100k
+#     SQLITE_WAL=1 SQLITE_PATH=/tmp/bench.sqlite3 benchmarks/run_load.sh --save-baseline
+#     SQLITE_WAL=1 SQLITE_PATH=/tmp/bench.sqlite3 benchmarks/run_load.sh
+#
+# Аргументи передаються у load_test.py (--concurrency, --requests, --baseline, ...).
+# Змінні: WORKERS (4), WSGI_PORT (8001), ASGI_PORT (8002), BENCH_PATH (/apartments/list/).
+set -euo pipefail
+
+cd "$(dirname "$0")/.."
+
+WORKERS="${WORKERS:-4}"
+WSGI_PORT="${WSGI_PORT:-8001}"
+ASGI_PORT="${ASGI_PORT:-8002}"
+BENCH_PATH="${BENCH_PATH:-/apartments/list/}"
+
+pids=()
+cleanup() {
+    for pid in "${pids[@]}"; do
+        kill "$pid" 2>/dev/null || true
+    done
+    wait 2>/dev/null || true
+}
+trap cleanup EXIT
+
+wait_for() {
+    for _ in $(seq 1 50); do
+        if python -c "import urllib.request; urllib.request.urlopen('$1', timeout=1)" 2>/dev/null; then
+            return 0
+        fi
+        sleep 0.2
+    done
+    echo "Сервер $1 не відповідає" >&2
+    return 1
+}
+
+gunicorn mysite.wsgi -w "$WORKERS" -b "127.0.0.1:$WSGI_PORT" --log-level warning &
+pids+=($!)
+ASYNC_CATALOG=1 uvicorn mysite.asgi:application --workers "$WORKERS" --port "$ASGI_PORT" --log-level warning &
+pids+=($!)
+
+wait_for "http://127.0.0.1:$WSGI_PORT$BENCH_PATH"
+wait_for "http://127.0.0.1:$ASGI_PORT$BENCH_PATH"
+
+python benchmarks/load_test.py \
+    "wsgi=http://127.0.0.1:$WSGI_PORT$BENCH_PATH" \
+    "asgi=http://127.0.0.1:$ASGI_PORT$BENCH_PATH" \
+    "$@"
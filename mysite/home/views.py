@@ -1,12 +1,21 @@
 from django.shortcuts import render
 from apartments.models import Apartment
+from apartments.pagination import keyset_page, next_page_query, CURSOR_PARAM
+from apartments.stats import catalog_stats
+from apartments.cache import cached_page
+
+HOME_PAGE_SIZE = 12
 
 
 def home(request):
-    apartments = Apartment.objects.all().order_by('-created_at')
-    favorite_ids = request.session.get('favorite_apartments', [])
+    apartments, next_cursor = cached_page('home', request, lambda: keyset_page(
+        Apartment.objects.all(), request.GET.get(CURSOR_PARAM), page_size=HOME_PAGE_SIZE
+    ))
+    stats = catalog_stats()
     context = {
         'apartments': apartments,
-        'favorite_ids': favorite_ids,
+        'next_query': next_page_query(request, next_cursor),
+        'total_apartments': stats['total'],
+        'available_apartments': stats['available'],
     }
-    return render(request, "Home/index.html", context)
\ No newline at end of file
+    return render(request, "home/index.html", context)
\ No newline at end of file
@@ -1,3 +1,5 @@
+import os
+from decimal import Decimal
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -23,7 +25,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'service.middleware.MetricsMiddleware',
+    'service.middleware.TemplateProfilingMiddleware',
+    'service.middleware.PrimaryPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'apartments.middleware.SessionStatsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -49,15 +55,112 @@ TEMPLATES = [
     },
 ]
 
+# Метрики запитів у форматі Prometheus на /metrics/ (персонал або Bearer METRICS_TOKEN).
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# TEMPLATE_PROFILING=1 вимірює час рендерингу шаблонів і тегів (заголовок Server-Timing).
+TEMPLATE_PROFILING = os.environ.get('TEMPLATE_PROFILING', '0') == '1'
+
 WSGI_APPLICATION = 'mysite.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Асинхронні view каталогу (apartments.async_views) для запуску під ASGI.
+ASYNC_CATALOG = os.environ.get('ASYNC_CATALOG', '0') == '1'
+
+# Профіль бази даних обирається змінною DB_ENGINE: sqlite (за замовчуванням)
+# для одного вузла або postgres для продакшену з кількома воркерами.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'apartshop'),
+            'USER': os.environ.get('POSTGRES_USER', 'apartshop'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', '127.0.0.1'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': 5,
+            },
+        }
+    }
+    # За PgBouncer у режимі transaction серверні курсори не працюють,
+    # а з'єднання тримає сам пулер.
+    if os.environ.get('DB_PGBOUNCER') == '1':
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+    # Репліки для читання каталогу: DB_REPLICA_HOSTS=replica-1,replica-2
+    for number, host in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), start=1):
+        DATABASES[f'replica{number}'] = {
+            **DATABASES['default'],
+            'HOST': host.strip(),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'OPTIONS': {
+                'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+            },
+        }
     }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica')]
+DATABASE_ROUTERS = ['service.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+# Найдовше, скільки живе в кеші значення, прочитане з репліки (межа застарілості).
+REPLICA_REFILL_TIMEOUT = int(os.environ.get('REPLICA_REFILL_TIMEOUT', 300))
+
+# PRAGMA, що виконуються для кожного нового з'єднання SQLite (див. service.db).
+SQLITE_PRAGMAS = {
+    'synchronous': 'normal',
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)) * 1000,
+    'foreign_keys': 'on',
+    'cache_size': -20000,
+    'temp_store': 'memory',
+}
+# WAL зберігається в самому файлі бази, тож вмикається лише явно (SQLITE_WAL=1)
+# для робочої бази, а не для db.sqlite3 з репозиторію.
+if os.environ.get('SQLITE_WAL', '0') == '1':
+    SQLITE_PRAGMAS['journal_mode'] = 'wal'
+
+# Бекенд кешу: locmem (за замовчуванням), file або redis (будь-який
+# Redis-сумісний сервер, напр. локальний redis-server чи valkey).
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+# Типові 300 записів locmem/file замало: версійовані сторінки, об'єкти та
+# фрагменти квартир витісняли б одне одного.
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 20000))
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'apartshop',
+        'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', BASE_DIR / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
 }
 
+SESSION_ENGINE = 'apartments.sessions'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -86,6 +189,34 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# SERVE_MEDIA=1 вмикає роздачу медіа самим Django з заголовками кешування
+# (похідні фото з хешем у шляху — immutable на рік), коли перед застосунком
+# немає nginx/CDN. RELEASE входить в ETag сторінок і має змінюватися з кожною викладкою.
+SERVE_MEDIA = os.environ.get('SERVE_MEDIA', '0') == '1'
+MEDIA_CACHE_SECONDS = int(os.environ.get('MEDIA_CACHE_SECONDS', 60 * 60 * 24))
+RELEASE = os.environ.get('RELEASE', '')
+
+# Фонові задачі виконує `manage.py run_tasks`; у режимі eager вони
+# виконуються одразу в потоці запиту (зручно для розробки й тестів).
+TASKS_ALWAYS_EAGER = os.environ.get('TASKS_ALWAYS_EAGER', '0') == '1'
+
+# Ціноутворення: сезони задаються в адмінці, а множник вихідних (ночі з п'ятниці
+# та суботи) і знижки за тривалість — тут, як пари (мінімум ночей, відсоток).
+PRICING_WEEKEND_DAYS = (4, 5)
+PRICING_WEEKEND_MULTIPLIER = Decimal(os.environ.get('PRICING_WEEKEND_MULTIPLIER', '1.15'))
+PRICING_LONG_STAY_DISCOUNTS = [(7, 5), (28, 15)]
+PRICING_HORIZON_DAYS = 400
+
+# Створення бронювання повторюється, якщо БД зайнята іншим записом (SQLite
+# "database is locked", дедлок чи помилка серіалізації): затримка подвоюється
+# з кожною спробою, з випадковим розкидом, щоб конкуренти не зіткнулися знову.
+BOOKING_LOCK_RETRIES = int(os.environ.get('BOOKING_LOCK_RETRIES', 5))
+BOOKING_LOCK_BACKOFF = float(os.environ.get('BOOKING_LOCK_BACKOFF', 0.05))
+
+# Планувальник `manage.py run_booking_scheduler` скасовує непідтверджені бронювання
+# через стільки годин після створення та завершує підтверджені після дати виїзду.
+BOOKING_PENDING_EXPIRY_HOURS = int(os.environ.get('BOOKING_PENDING_EXPIRY_HOURS', 24))
+
 LOGIN_REDIRECT_URL = 'apartment_list'
 LOGIN_URL = 'login'
 LOGOUT_REDIRECT_URL = 'home'
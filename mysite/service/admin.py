@@ -1,3 +1,20 @@
 from django.contrib import admin
+from .models import Task, TaskResult
 
-# Register your models here.
+
+class TaskResultInline(admin.TabularInline):
+    model = TaskResult
+    extra = 0
+    can_delete = False
+    readonly_fields = ['attempt', 'succeeded', 'value', 'error', 'duration', 'created_at']
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'attempts', 'max_attempts', 'run_after',
+                    'created_at', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name']
+    list_per_page = 20
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+    inlines = [TaskResultInline]
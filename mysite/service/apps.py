@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class MyappConfig(AppConfig):
     name = 'service'
+
+    def ready(self):
+        from . import db  # noqa: F401
+
+        autodiscover_modules('tasks')
@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from service import profiling
+
+
+class Command(BaseCommand):
+    help = 'Профілює рендеринг шаблонів сторінки: час шаблонів та тегів'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Шлях сторінки, наприклад /apartments/list/')
+        parser.add_argument('--repeat', type=int, default=20, help='Кількість запитів')
+        parser.add_argument('--top', type=int, default=15, help='Скільки тегів показати')
+        parser.add_argument('--username', help='Виконувати запити від імені користувача')
+        parser.add_argument('--clear-cache', action='store_true', help='Очищати кеш перед кожним запитом')
+
+    def handle(self, *args, **options):
+        profiling.install()
+        client = Client(HTTP_HOST='localhost')
+        if options['username']:
+            from django.contrib.auth.models import User
+
+            try:
+                client.force_login(User.objects.get(username=options['username']))
+            except User.DoesNotExist:
+                raise CommandError(f"Користувача {options['username']} не знайдено")
+
+        repeat = options['repeat']
+        total = profiling.RenderProfile()
+        for _ in range(repeat):
+            if options['clear_cache']:
+                cache.clear()
+            with profiling.profile_render() as profile:
+                response = client.get(options['path'])
+            if response.status_code != 200:
+                raise CommandError(f'Сторінка повернула статус {response.status_code}')
+            total.merge(profile)
+
+        self.stdout.write(f"Рендеринг: {total.total / repeat * 1000:.2f} мс на запит ({repeat} запитів)")
+        self.stdout.write('Шаблони (включно з вкладеними):')
+        for name, (count, elapsed) in total.top('templates'):
+            self.stdout.write(f'  {elapsed / repeat * 1000:8.2f} мс  x{count // repeat:<5} {name}')
+        self.stdout.write('Теги (власний час):')
+        for name, (count, elapsed) in total.top('tags', options['top']):
+            self.stdout.write(f'  {elapsed / repeat * 1000:8.2f} мс  x{count // repeat:<5} {name}')
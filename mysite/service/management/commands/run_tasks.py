@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from service.queue import claim_batch, execute, requeue_stale
+
+
+def _run(queued):
+    try:
+        return execute(queued)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Запускає воркер фонових задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Кількість потоків-воркерів')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Пауза між опитуваннями черги (с)')
+        parser.add_argument('--stale-after', type=int, default=600,
+                            help='Повернути в чергу задачі, що виконуються довше N секунд')
+        parser.add_argument('--once', action='store_true', help='Обробити доступні задачі та завершитись')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        requeued = requeue_stale(timedelta(seconds=options['stale_after']))
+        if requeued:
+            self.stdout.write(f'Повернуто в чергу {requeued} завислих задач')
+
+        # Ctrl+C чи зупинка контейнера: нові задачі не беруться, а вихід із
+        # пулу чекає завершення тих, що вже виконуються.
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='task-worker') as pool:
+            try:
+                while True:
+                    batch = claim_batch(workers * 2)
+                    if batch:
+                        results = list(pool.map(_run, batch))
+                        self.stdout.write(
+                            f'Виконано задач: {results.count(True)}, з помилкою: {results.count(False)}'
+                        )
+                        continue
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                self.stdout.write('Зупинка воркера')
@@ -0,0 +1,206 @@
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_current = ContextVar('request_metrics', default=None)
+_lock = threading.Lock()
+_installed = False
+_MISSING = object()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self.series = {}
+
+    def inc(self, labels, amount=1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self.series.items()):
+            yield f'{self.name}{_labels(labels)} {value}'
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self):
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket{_labels(labels, [("le", bound)])} {cumulative}'
+            yield f'{self.name}_sum{_labels(labels)} {total}'
+            yield f'{self.name}_count{_labels(labels)} {count}'
+
+
+REQUESTS = Counter('apartshop_http_requests_total', 'Кількість запитів за view, методом і статусом')
+DURATION = Histogram('apartshop_http_request_duration_seconds', 'Повний час обробки запиту', TIME_BUCKETS)
+DB_TIME = Histogram('apartshop_db_duration_seconds', 'Час SQL-запитів за запит', TIME_BUCKETS)
+QUERIES = Histogram('apartshop_db_queries', 'Кількість SQL-запитів за запит', COUNT_BUCKETS)
+TEMPLATE_TIME = Histogram('apartshop_template_render_seconds', 'Час рендерингу шаблонів за запит', TIME_BUCKETS)
+CACHE = Counter('apartshop_cache_requests_total', 'Звернення до кешу за результатом (hit/miss)')
+METRICS = (REQUESTS, DURATION, DB_TIME, QUERIES, TEMPLATE_TIME, CACHE)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'cache_hits', 'cache_misses', 'template_time', 'template_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+
+@contextmanager
+def measure():
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def record(metrics, view, method, status, duration):
+    labels = (('view', view),)
+    # Один замок на весь запит: гістограми оновлюються кількома інкрементами.
+    with _lock:
+        REQUESTS.inc(labels + (('method', method), ('status', status)))
+        DURATION.observe(labels, duration)
+        DB_TIME.observe(labels, metrics.db_time)
+        QUERIES.observe(labels, metrics.queries)
+        TEMPLATE_TIME.observe(labels, metrics.template_time)
+        if metrics.cache_hits:
+            CACHE.inc(labels + (('result', 'hit'),), metrics.cache_hits)
+        if metrics.cache_misses:
+            CACHE.inc(labels + (('result', 'miss'),), metrics.cache_misses)
+
+
+def exposition():
+    lines = []
+    with _lock:
+        for metric in METRICS:
+            lines.append(f'# HELP {metric.name} {metric.description}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += perf_counter() - started
+        metrics.queries += 1
+
+
+def _add_query_wrapper(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _timed_render(original):
+    def render(self, context):
+        metrics = _current.get()
+        # Вкладені шаблони (include, extends) вже враховані зовнішнім.
+        if metrics is None or metrics.template_depth:
+            return original(self, context)
+        metrics.template_depth += 1
+        started = perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            metrics.template_time += perf_counter() - started
+            metrics.template_depth -= 1
+    return render
+
+
+def _counted_get(original):
+    def get(self, key, default=None, version=None):
+        value = original(self, key, _MISSING, version)
+        metrics = _current.get()
+        if value is _MISSING:
+            if metrics is not None:
+                metrics.cache_misses += 1
+            return default
+        if metrics is not None:
+            metrics.cache_hits += 1
+        return value
+    return get
+
+
+def _counted_get_many(original):
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = original(self, keys, version)
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.cache_hits += len(found)
+            metrics.cache_misses += len(keys) - len(found)
+        return found
+    return get_many
+
+
+def install():
+    # Обгортки лише читають контекстну змінну; поза запитом вони нічого не роблять.
+    global _installed
+    if _installed:
+        return
+    connection_created.connect(_add_query_wrapper)
+    for connection in connections.all(initialized_only=True):
+        _add_query_wrapper(None, connection)
+    Template.render = _timed_render(Template.render)
+    backend = type(caches['default'])
+    backend.get = _counted_get(backend.get)
+    # Базовий get_many викликає get, тож окремо рахуємо лише власні реалізації бекендів.
+    if backend.get_many is not BaseCache.get_many:
+        backend.get_many = _counted_get_many(backend.get_many)
+    _installed = True
@@ -0,0 +1,122 @@
+import logging
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics, profiling
+from .routers import use_primary
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'pin_primary'
+
+
+class PrimaryPinMiddleware:
+    # Після власного запису (бронювання, скасування, редагування квартири)
+    # користувач кілька секунд читає з основної бази, поки репліки наздоганяють.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with use_primary(self.should_pin(request)):
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        with use_primary(self.should_pin(request)):
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def should_pin(self, request):
+        return request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 10),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class TemplateProfilingMiddleware:
+    # Вмикається TEMPLATE_PROFILING=1: додає заголовок Server-Timing з часом
+    # рендерингу шаблонів та найдорожчими тегами і пише підсумок у лог.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'TEMPLATE_PROFILING', False):
+            raise MiddlewareNotUsed
+        profiling.install()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with profiling.profile_render() as profile:
+            response = self.get_response(request)
+        return self.process_response(request, response, profile)
+
+    async def __acall__(self, request):
+        with profiling.profile_render() as profile:
+            response = await self.get_response(request)
+        return self.process_response(request, response, profile)
+
+    def process_response(self, request, response, profile):
+        if profile.templates:
+            response['Server-Timing'] = profiling.server_timing(profile)
+            logger.info(
+                '%s: шаблони %.1f мс; %s', request.path, profile.total * 1000,
+                ', '.join(f'{name} {elapsed * 1000:.1f} мс x{count}' for name, (count, elapsed) in profile.top('tags', 5)),
+            )
+        return response
+
+
+class MetricsMiddleware:
+    # Збирає час запиту, SQL, кеш і рендеринг шаблонів за іменем URL
+    # у гістограми процесу; вимикається METRICS_ENABLED=0.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        metrics.install()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = perf_counter()
+        with metrics.measure() as measured:
+            response = self.get_response(request)
+        return self.process_response(request, response, measured, perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        with metrics.measure() as measured:
+            response = await self.get_response(request)
+        return self.process_response(request, response, measured, perf_counter() - started)
+
+    def process_response(self, request, response, measured, duration):
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.record(measured, view, request.method, response.status_code, duration)
+        return response
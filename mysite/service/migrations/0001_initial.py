@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Задача')),
+                ('args', models.JSONField(blank=True, default=list, verbose_name='Аргументи')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='Іменовані аргументи')),
+                ('status', models.CharField(choices=[('pending', 'Очікує'), ('running', 'Виконується'), ('succeeded', 'Виконано'), ('failed', 'Помилка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Спроб')),
+                ('max_attempts', models.PositiveIntegerField(default=3, verbose_name='Максимум спроб')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Виконати після')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата створення')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Початок виконання')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершення')),
+            ],
+            options={
+                'verbose_name': 'Фонова задача',
+                'verbose_name_plural': 'Фонові задачі',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempt', models.PositiveIntegerField(verbose_name='Спроба')),
+                ('succeeded', models.BooleanField(verbose_name='Успішно')),
+                ('value', models.JSONField(blank=True, null=True, verbose_name='Результат')),
+                ('error', models.TextField(blank=True, verbose_name='Помилка')),
+                ('duration', models.FloatField(verbose_name='Тривалість (с)')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата створення')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='service.task', verbose_name='Задача')),
+            ],
+            options={
+                'verbose_name': 'Результат задачі',
+                'verbose_name_plural': 'Результати задач',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'run_after'], name='task_status_run_after_idx'),
+        ),
+    ]
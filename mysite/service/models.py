@@ -1,3 +1,108 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class Task(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Очікує'),
+        ('running', 'Виконується'),
+        ('succeeded', 'Виконано'),
+        ('failed', 'Помилка'),
+    ]
+
+    name = models.CharField(
+        max_length=200,
+        verbose_name='Задача'
+    )
+    args = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Аргументи'
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Іменовані аргументи'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Спроб'
+    )
+    max_attempts = models.PositiveIntegerField(
+        default=3,
+        verbose_name='Максимум спроб'
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Виконати після'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата створення'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Початок виконання'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Завершення'
+    )
+
+    class Meta:
+        verbose_name = 'Фонова задача'
+        verbose_name_plural = 'Фонові задачі'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='task_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class TaskResult(models.Model):
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='results',
+        verbose_name='Задача'
+    )
+    attempt = models.PositiveIntegerField(
+        verbose_name='Спроба'
+    )
+    succeeded = models.BooleanField(
+        verbose_name='Успішно'
+    )
+    value = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name='Результат'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Помилка'
+    )
+    duration = models.FloatField(
+        verbose_name='Тривалість (с)'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата створення'
+    )
+
+    class Meta:
+        verbose_name = 'Результат задачі'
+        verbose_name_plural = 'Результати задач'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.task.name} #{self.task_id}, спроба {self.attempt}"
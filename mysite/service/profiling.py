@@ -0,0 +1,83 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.template.base import Node, Template
+
+_current = ContextVar('render_profile', default=None)
+_installed = False
+
+
+class RenderProfile:
+    # Час шаблонів — включно з вкладеними (extends, include), час тегів — власний,
+    # без дочірніх вузлів, щоб було видно, де саме витрачається CPU.
+    def __init__(self):
+        self.templates = defaultdict(lambda: [0, 0.0])
+        self.tags = defaultdict(lambda: [0, 0.0])
+        self.stack = []
+
+    def record(self, bucket, name, elapsed):
+        entry = bucket[name]
+        entry[0] += 1
+        entry[1] += elapsed
+
+    @property
+    def total(self):
+        return sum(elapsed for count, elapsed in self.tags.values())
+
+    def merge(self, other):
+        for bucket, other_bucket in ((self.templates, other.templates), (self.tags, other.tags)):
+            for name, (count, elapsed) in other_bucket.items():
+                bucket[name][0] += count
+                bucket[name][1] += elapsed
+
+    def top(self, bucket, limit=None):
+        return sorted(getattr(self, bucket).items(), key=lambda item: item[1][1], reverse=True)[:limit]
+
+
+def _timed(original, bucket, name_of):
+    def wrapper(self, context):
+        profile = _current.get()
+        if profile is None:
+            return original(self, context)
+        profile.stack.append(0.0)
+        started = perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            elapsed = perf_counter() - started
+            children = profile.stack.pop()
+            if profile.stack:
+                profile.stack[-1] += elapsed
+            if bucket == 'tags':
+                profile.record(profile.tags, name_of(self), elapsed - children)
+            else:
+                profile.record(profile.templates, name_of(self), elapsed)
+    return wrapper
+
+
+def install():
+    global _installed
+    if _installed:
+        return
+    Node.render_annotated = _timed(Node.render_annotated, 'tags', lambda node: type(node).__name__)
+    Template._render = _timed(Template._render, 'templates', lambda template: template.name or '<string>')
+    _installed = True
+
+
+@contextmanager
+def profile_render():
+    profile = RenderProfile()
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+def server_timing(profile, limit=5):
+    entries = [f'tpl;dur={profile.total * 1000:.1f};desc="templates"']
+    for number, (name, (count, elapsed)) in enumerate(profile.top('tags', limit)):
+        entries.append(f'tag{number};dur={elapsed * 1000:.1f};desc="{name} x{count}"')
+    return ', '.join(entries)
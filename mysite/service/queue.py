@@ -0,0 +1,99 @@
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task, TaskResult
+from .routers import use_primary
+
+RETRY_BASE_DELAY = 10
+
+_registry = {}
+
+
+def task(func=None, *, name=None, max_attempts=3):
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        _registry[task_name] = func
+        func.task_name = task_name
+        func.delay = lambda *args, **kwargs: enqueue(task_name, *args, max_attempts=max_attempts, **kwargs)
+        return func
+
+    if func is not None:
+        return register(func)
+    return register
+
+
+def enqueue(name, *args, max_attempts=3, **kwargs):
+    if name not in _registry:
+        raise KeyError(f'Unknown task: {name}')
+    queued = Task.objects.create(name=name, args=list(args), kwargs=kwargs, max_attempts=max_attempts)
+    if getattr(settings, 'TASKS_ALWAYS_EAGER', False):
+        if claim(queued.pk):
+            execute(Task.objects.get(pk=queued.pk))
+            queued.refresh_from_db()
+    return queued
+
+
+def claim(task_id):
+    # Умовний UPDATE гарантує, що задачу отримає лише один воркер,
+    # навіть якщо кілька процесів бачать її одночасно.
+    return Task.objects.filter(pk=task_id, status='pending').update(
+        status='running',
+        started_at=timezone.now(),
+        attempts=F('attempts') + 1,
+    ) == 1
+
+
+def claim_batch(limit):
+    due = Task.objects.filter(status='pending', run_after__lte=timezone.now()).order_by('run_after')
+    claimed = [task_id for task_id in due.values_list('pk', flat=True)[:limit] if claim(task_id)]
+    return list(Task.objects.filter(pk__in=claimed))
+
+
+def requeue_stale(older_than):
+    return Task.objects.filter(status='running', started_at__lt=timezone.now() - older_than).update(
+        status='pending',
+        run_after=timezone.now(),
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=RETRY_BASE_DELAY * 2 ** (attempts - 1))
+
+
+def execute(queued):
+    started = time.monotonic()
+    try:
+        with use_primary():
+            value = _registry[queued.name](*queued.args, **queued.kwargs)
+    except Exception:
+        duration = time.monotonic() - started
+        TaskResult.objects.create(
+            task=queued,
+            attempt=queued.attempts,
+            succeeded=False,
+            error=traceback.format_exc(),
+            duration=duration,
+        )
+        if queued.attempts >= queued.max_attempts:
+            Task.objects.filter(pk=queued.pk).update(status='failed', finished_at=timezone.now())
+        else:
+            Task.objects.filter(pk=queued.pk).update(
+                status='pending',
+                run_after=timezone.now() + retry_delay(queued.attempts),
+            )
+        return False
+
+    TaskResult.objects.create(
+        task=queued,
+        attempt=queued.attempts,
+        succeeded=True,
+        value=value,
+        duration=time.monotonic() - started,
+    )
+    Task.objects.filter(pk=queued.pk).update(status='succeeded', finished_at=timezone.now())
+    return True
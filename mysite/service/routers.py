@@ -0,0 +1,66 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Моделі каталогу, читання яких можна віддавати реплікам.
+CATALOG_MODELS = {
+    ('apartments', 'apartment'),
+    ('apartments', 'favorite'),
+}
+
+_use_primary = ContextVar('use_primary', default=False)
+RECENT_WRITE_KEY = 'routing:recent_write:{}'
+
+
+@contextmanager
+def use_primary(enabled=True):
+    token = _use_primary.set(enabled)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def note_write(scope):
+    # Протягом REPLICA_PIN_SECONDS після запису кеші цієї області заповнюються
+    # з основної бази: репліки можуть ще не мати змін.
+    if getattr(settings, 'DATABASE_REPLICAS', []):
+        cache.set(RECENT_WRITE_KEY.format(scope), True, settings.REPLICA_PIN_SECONDS)
+
+
+@contextmanager
+def refill(scope, timeout):
+    # Контекст заповнення кешу; повертає TTL для заповненого значення. Поза вікном
+    # після запису читання йде на репліку, а значення з неї живе не довше за
+    # REPLICA_REFILL_TIMEOUT, тож відставання, довше за вікно, обмежене цим строком.
+    replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+    if not replicas or _use_primary.get():
+        yield timeout
+        return
+    if cache.get(RECENT_WRITE_KEY.format(scope)) is not None:
+        with use_primary():
+            yield timeout
+        return
+    yield min(timeout, settings.REPLICA_REFILL_TIMEOUT)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        if not replicas or _use_primary.get():
+            return 'default'
+        if (model._meta.app_label, model._meta.model_name) not in CATALOG_MODELS:
+            return 'default'
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
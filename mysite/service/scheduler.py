@@ -0,0 +1,58 @@
+import math
+import time
+
+
+class TimeWheel:
+    # Хешоване колесо таймерів: slots кошиків по tick секунд. Задача, що настає
+    # далі, ніж один оберт колеса, чекає у своєму кошику потрібну кількість обертів.
+    # Планування та спрацювання — O(1), незалежно від кількості відкладених задач.
+
+    def __init__(self, tick=60.0, slots=60, clock=time.time):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.clock = clock
+        self.position = 0
+        self.last_tick = clock()
+        self.scheduled = {}
+
+    def __len__(self):
+        return len(self.scheduled)
+
+    def schedule(self, name, due, job):
+        # Одна задача з певною назвою: повторне планування лишає ранішій строк.
+        if name in self.scheduled and self.scheduled[name] <= due:
+            return
+        self.scheduled[name] = due
+        ticks = max(math.ceil((due - self.last_tick) / self.tick), 0)
+        slot = (self.position + ticks) % len(self.slots)
+        self.slots[slot].append([ticks // len(self.slots), name, due, job])
+
+    def advance(self):
+        # Прокручує колесо до поточного часу й повертає задачі, строк яких настав.
+        now = self.clock()
+        fired = self._collect(now)
+        while now - self.last_tick >= self.tick:
+            self.last_tick += self.tick
+            self.position = (self.position + 1) % len(self.slots)
+            for entry in self.slots[self.position]:
+                if entry[0] > 0:
+                    entry[0] -= 1
+            fired += self._collect(now)
+        return fired
+
+    def _collect(self, now):
+        keep, fired = [], []
+        for entry in self.slots[self.position]:
+            rounds, name, due, job = entry
+            if self.scheduled.get(name) != due:
+                continue  # замінена ранішим плануванням
+            if rounds > 0 or due > now:
+                keep.append(entry)
+                continue
+            del self.scheduled[name]
+            fired.append((name, job))
+        self.slots[self.position] = keep
+        return fired
+
+    def next_tick_in(self):
+        return max(self.last_tick + self.tick - self.clock(), 0)
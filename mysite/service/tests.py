@@ -1,3 +1,192 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from apartments.cache import apartment_key, bump_catalog_version, get_apartment_or_404
+from apartments.models import Apartment
+
+from .middleware import PIN_COOKIE
+from .models import Task, TaskResult
+from .queue import RETRY_BASE_DELAY, claim, claim_batch, enqueue, execute, task
+from .routers import ReplicaRouter, use_primary
+from .scheduler import TimeWheel
+
+
+@task(name='service.tests.add')
+def add(first, second):
+    return first + second
+
+
+@task(name='service.tests.explode', max_attempts=2)
+def explode():
+    raise ValueError('вибух')
+
+
+class MetricsTests(TestCase):
+    def test_metrics_requires_staff_or_token(self):
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        with override_settings(METRICS_TOKEN='secret'):
+            response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_metrics_are_recorded_per_url_name(self):
+        self.client.get('/apartments/list/')
+        self.client.force_login(User.objects.create_user('staff', password='staff-password', is_staff=True))
+        content = self.client.get('/metrics/').content.decode()
+        self.assertIn('apartshop_http_request_duration_seconds_count{view="apartment_list"}', content)
+        self.assertIn('apartshop_db_queries_bucket{view="apartment_list",le="+Inf"}', content)
+
+
+class TimeWheelTests(SimpleTestCase):
+    def test_jobs_fire_after_due_across_rounds(self):
+        now = [0.0]
+        wheel = TimeWheel(tick=10, slots=6, clock=lambda: now[0])
+        wheel.schedule('soon', 5, 'soon')
+        wheel.schedule('later', 200, 'later')
+        wheel.schedule('later', 150, 'earlier')
+        fired = []
+        for moment in range(0, 300, 3):
+            now[0] = moment
+            fired += [(job, moment) for name, job in wheel.advance()]
+        self.assertEqual(fired, [('soon', 12), ('earlier', 150)])
+        self.assertEqual(len(wheel), 0)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    # Псевдонім replica не налаштований, тож журнал записує рішення маршрутизатора,
+    # а сам запит виконується на default.
+
+    def setUp(self):
+        self.apartment = Apartment.objects.create(
+            title='Квартира', description='Опис квартири для тесту', apartment_type='ST',
+            price=500, square_meters=30, floor=1, address='вулиця Шевченка, 1',
+        )
+        # Створення квартири відкрило вікно після запису; тести починають без нього.
+        cache.clear()
+        self.routed = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            self.routed.append((model._meta.model_name, db_for_read(router, model, **hints)))
+            return 'default'
+
+        patcher = mock.patch.object(ReplicaRouter, 'db_for_read', record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def routed_aliases(self):
+        return {alias for model, alias in self.routed if model == 'apartment'}
+
+    def test_unpinned_reads_go_to_replica(self):
+        router = ReplicaRouter()
+        router.db_for_read(Apartment)
+        router.db_for_read(User)
+        with use_primary():
+            router.db_for_read(Apartment)
+        self.assertEqual(self.routed, [('apartment', 'replica'), ('user', 'default'), ('apartment', 'default')])
+
+    @override_settings(REPLICA_REFILL_TIMEOUT=5)
+    def test_cold_refills_read_from_replica_with_short_ttl(self):
+        now = time.time()
+        with mock.patch('time.time', return_value=now):
+            self.assertEqual(get_apartment_or_404(self.apartment.pk), self.apartment)
+            for url in ('/', '/apartments/list/', self.apartment.urls['detail']):
+                self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.routed_aliases(), {'replica'})
+        # Значення з репліки живе не довше за REPLICA_REFILL_TIMEOUT, а не годину.
+        with mock.patch('time.time', return_value=now + 6):
+            self.assertIsNone(cache.get(apartment_key(self.apartment.pk)))
+
+    def test_refills_after_a_write_read_from_primary(self):
+        bump_catalog_version()
+        self.assertEqual(get_apartment_or_404(self.apartment.pk), self.apartment)
+        self.assertEqual(self.client.get('/apartments/list/').status_code, 200)
+        self.assertEqual(self.routed_aliases(), {'default'})
+
+    def test_pinned_requests_read_from_primary(self):
+        session = self.client.session
+        session['favorite_apartments'] = [self.apartment.pk]
+        session.save()
+        self.client.cookies['sessionid'] = session.session_key
+        self.client.cookies[PIN_COOKIE] = '1'
+        response = self.client.get('/apartments/favorites/')
+        self.assertContains(response, self.apartment.title)
+        self.assertEqual(self.routed_aliases(), {'default'})
+
+
+class TaskQueueTests(TestCase):
+    def test_only_one_worker_claims_a_task(self):
+        queued = add.delay(1, 2)
+        # Обидва воркери побачили ту саму задачу, але умовний UPDATE пропускає лише першого.
+        seen_by_first = list(Task.objects.filter(status='pending').values_list('pk', flat=True))
+        seen_by_second = list(Task.objects.filter(status='pending').values_list('pk', flat=True))
+        self.assertEqual(seen_by_first, seen_by_second)
+        self.assertTrue(claim(seen_by_first[0]))
+        self.assertFalse(claim(seen_by_second[0]))
+        self.assertEqual(claim_batch(10), [])
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('running', 1))
+
+    def test_failed_attempts_back_off_then_fail(self):
+        queued = explode.delay()
+        self.assertTrue(claim(queued.pk))
+        before = timezone.now()
+        self.assertFalse(execute(Task.objects.get(pk=queued.pk)))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'pending')
+        self.assertGreaterEqual(queued.run_after, before + timedelta(seconds=RETRY_BASE_DELAY))
+        self.assertEqual(claim_batch(10), [])
+
+        Task.objects.filter(pk=queued.pk).update(run_after=timezone.now())
+        [claimed] = claim_batch(10)
+        self.assertFalse(execute(claimed))
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('failed', 2))
+        self.assertIsNotNone(queued.finished_at)
+        results = list(TaskResult.objects.filter(task=queued).order_by('attempt'))
+        self.assertEqual([(result.attempt, result.succeeded) for result in results], [(1, False), (2, False)])
+        self.assertIn('ValueError: вибух', results[-1].error)
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(KeyError):
+            enqueue('service.tests.missing')
+
+    @override_settings(TASKS_ALWAYS_EAGER=True)
+    def test_eager_mode_runs_inline(self):
+        queued = add.delay(2, 3)
+        self.assertEqual(queued.status, 'succeeded')
+        self.assertEqual(queued.results.get().value, 5)
+
+
+class RunTasksCommandTests(TransactionTestCase):
+    # Один потік-воркер: основний потік пише в чергу лише між пакетами,
+    # тож SQLite у пам'яті не блокує таблиці.
+
+    def test_once_drains_due_tasks_and_exits(self):
+        added = [add.delay(number, number) for number in range(5)]
+        failing = enqueue('service.tests.explode', max_attempts=1)
+        later = add.delay(0, 0)
+        Task.objects.filter(pk=later.pk).update(run_after=timezone.now() + timedelta(hours=1))
+        stdout = StringIO()
+        call_command('run_tasks', once=True, workers=1, stdout=stdout)
+        statuses = dict(Task.objects.values_list('pk', 'status'))
+        self.assertEqual({statuses[queued.pk] for queued in added}, {'succeeded'})
+        self.assertEqual(statuses[failing.pk], 'failed')
+        self.assertEqual(statuses[later.pk], 'pending')
+        self.assertEqual(
+            sorted(TaskResult.objects.filter(succeeded=True).values_list('value', flat=True)), [0, 2, 4, 6, 8]
+        )
+
+    def test_interrupt_stops_the_worker(self):
+        stdout = StringIO()
+        with mock.patch('service.management.commands.run_tasks.time.sleep', side_effect=KeyboardInterrupt):
+            call_command('run_tasks', workers=1, stdout=stdout)
+        self.assertIn('Зупинка воркера', stdout.getvalue())
@@ -1,3 +1,34 @@
-from django.shortcuts import render
+import re
 
-# Create your views here.
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+from . import metrics
+
+# Похідні фото квартир лежать за хешем вмісту (apartments/derived/<xx>/<sha256>/...),
+# тож файл за таким шляхом ніколи не змінюється.
+HASHED_MEDIA_RE = re.compile(r'^apartments/derived/[0-9a-f]{2}/[0-9a-f]{64}/')
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def serve_media(request, path):
+    # static.serve сам віддає Last-Modified та 304 на If-Modified-Since.
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if HASHED_MEDIA_RE.match(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_SECONDS)
+    return response
+
+
+def metrics_view(request):
+    # Доступ для персоналу або для скрейпера Prometheus з токеном METRICS_TOKEN.
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    header = request.headers.get('Authorization', '')
+    authorized = request.user.is_staff or (token and constant_time_compare(header, f'Bearer {token}'))
+    if not authorized:
+        return HttpResponseForbidden('Доступ заборонено')
+    return HttpResponse(metrics.exposition(), content_type=metrics.CONTENT_TYPE)